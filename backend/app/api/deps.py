@@ -1,15 +1,24 @@
 import uuid
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any, TypeVar
 
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.security import decode_access_token
-from app.db.session import SessionLocal
+from app.crud.user import get_user, get_user_async
+from app.db.session import AsyncSessionLocal, SessionLocal
 from app.models.user import User
+from app.services.user_cache import restore_user, restore_user_async, snapshot_user, user_cache
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+T = TypeVar("T")
+
 
 def get_db():
     db = SessionLocal()
@@ -19,7 +28,42 @@ def get_db():
         db.close()
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+get_session = get_async_db if settings.database_async else get_db
+
+
+async def run_crud(
+    db: Session | AsyncSession,
+    sync_fn: Callable[..., T],
+    async_fn: Callable[..., Awaitable[T]],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    if isinstance(db, AsyncSession):
+        return await async_fn(db, *args, **kwargs)
+    return await run_in_threadpool(sync_fn, db, *args, **kwargs)
+
+
+async def release_connection(db: Session | AsyncSession) -> None:
+    # end the read transaction so a slow await (LLM, GitHub, bcrypt) doesn't hold a pooled connection
+    if isinstance(db, AsyncSession):
+        await db.commit()
+
+
+async def _user_cache_call(fn: Callable[..., T], *args: Any) -> T:
+    # the shared cache is a SQLite file; keep its reads and writes off the event loop
+    if user_cache.shared:
+        return await run_in_threadpool(fn, *args)
+    return fn(*args)
+
+
+async def get_current_user(
+    db: Session | AsyncSession = Depends(get_session), token: str = Depends(oauth2_scheme)
+) -> User:
     subject = decode_access_token(token)
     if not subject:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
@@ -27,7 +71,14 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
         user_id = uuid.UUID(subject)
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token") from exc
-    user = db.query(User).filter(User.id == user_id).first()
+    if settings.user_cache_enabled:
+        cached = await _user_cache_call(user_cache.get, str(user_id))
+        if cached is not None:
+            return await restore_user_async(db, cached) if isinstance(db, AsyncSession) else restore_user(db, cached)
+    user = await run_crud(db, get_user, get_user_async, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    await release_connection(db)
+    if settings.user_cache_enabled:
+        await _user_cache_call(user_cache.set, str(user_id), snapshot_user(user))
     return user
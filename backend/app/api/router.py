@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.routes import auth, code, projects, repo, uml
+from app.api.routes import auth, code, dashboard, projects, repo, stats, uml
 from app.api.routes import auth, code, projects, uml
 from app.api.routes import auth, projects, uml
 from app.api.routes import auth, projects
@@ -11,3 +11,5 @@ api_router.include_router(projects.router)
 api_router.include_router(uml.router)
 api_router.include_router(code.router)
 api_router.include_router(repo.router)
+api_router.include_router(dashboard.router)
+api_router.include_router(stats.router)
@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 
-from app.api.deps import get_db
-from app.core.security import create_access_token, verify_password
-from app.crud.user import create_user, get_user_by_email
+from app.api.deps import get_session, release_connection, run_crud
+from app.core.security import create_access_token, get_password_hash_async, verify_and_update_password_async
+from app.crud.user import (
+    create_user,
+    create_user_async,
+    get_user_by_email,
+    get_user_by_email_async,
+    update_password_hash,
+    update_password_hash_async,
+)
 from app.schemas.token import Token
 from app.schemas.user import UserCreate, UserPublic
 
@@ -12,17 +18,25 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserPublic)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing = get_user_by_email(db, user_in.email)
+async def register(user_in: UserCreate, db=Depends(get_session)):
+    existing = await run_crud(db, get_user_by_email, get_user_by_email_async, user_in.email)
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    return create_user(db, user_in)
+    await release_connection(db)
+    password_hash = await get_password_hash_async(user_in.password)
+    return await run_crud(db, create_user, create_user_async, user_in, password_hash)
 
 
 @router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = get_user_by_email(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.password_hash):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db=Depends(get_session)):
+    user = await run_crud(db, get_user_by_email, get_user_by_email_async, form_data.username)
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    await release_connection(db)
+    verified, new_hash = await verify_and_update_password_async(form_data.password, user.password_hash)
+    if not verified:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        await run_crud(db, update_password_hash, update_password_hash_async, user, new_hash)
     token = create_access_token(str(user.id))
     return Token(access_token=token)
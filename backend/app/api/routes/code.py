@@ -1,19 +1,171 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import ast
 
-from app.api.deps import get_current_user, get_db
-from app.crud.code_session import create_code_session
-from app.schemas.code import CodeAnalyzeRequest, CodeSessionPublic
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+
+from app.api.deps import get_current_user, get_session, release_connection, run_crud
+from app.core.config import settings
+from app.crud.code_analysis import (
+    get_code_analyses,
+    get_code_analyses_async,
+    get_code_analysis,
+    get_code_analysis_async,
+    save_code_analyses,
+    save_code_analyses_async,
+    save_code_analysis,
+    save_code_analysis_async,
+)
+from app.crud.code_session import create_code_session, create_code_session_async
+from app.schemas.code import (
+    CodeAnalyzeRequest,
+    CodeBatchPublic,
+    CodeBatchRequest,
+    CodeCfgPublic,
+    CodeCfgRequest,
+    CodeSessionPublic,
+)
 from app.services.ai_service import analyze_code_quality
-from app.services.code_analysis import analyze_code
+from app.services.analysis_cache import analysis_cache, analysis_key, analyzer_version, normalize_source
+from app.services.code_analysis import analyze_code, function_cfg
+from app.services.code_batch import analyze_files_async, batch_workers, clean_path, project_graph, read_archive
+from app.services.code_metrics import compute_code_metrics
+from app.services.singleflight import SingleFlight
 
 router = APIRouter(prefix="/code", tags=["code"])
 
+_analysis_flight = SingleFlight()
+
+
+def _analyze(code: str) -> tuple[dict, dict]:
+    tree = ast.parse(code)
+    return analyze_code(code, tree), compute_code_metrics(code, tree)
+
+
+async def _compute_graph(code: str) -> dict:
+    execution_graph, metrics = await run_in_threadpool(_analyze, code)
+    execution_graph["ai_metrics"] = await analyze_code_quality(code, metrics)
+    return execution_graph
+
+
+async def _execution_graph(db, key: str, code: str, language: str) -> dict:
+    # memory, then the code_analyses table, then a fresh analysis shared by identical concurrent requests
+    execution_graph = analysis_cache.get(key)
+    if execution_graph is not None:
+        return execution_graph
+    stored = await run_crud(db, get_code_analysis, get_code_analysis_async, key)
+    if stored is None:
+        await release_connection(db)
+        execution_graph = await _analysis_flight.do_async(key, lambda: _compute_graph(code))
+        stored = await run_crud(
+            db, save_code_analysis, save_code_analysis_async, key, analyzer_version(), language, execution_graph
+        )
+    analysis_cache.set(key, stored.execution_graph)
+    return stored.execution_graph
+
 
 @router.post("/analyze", response_model=CodeSessionPublic)
-def analyze(request: CodeAnalyzeRequest, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+async def analyze(request: CodeAnalyzeRequest, db=Depends(get_session), current_user=Depends(get_current_user)):
+    if request.language.lower() != "python":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only python is supported in MVP")
+    code = normalize_source(request.code)
+    key = analysis_key(code, request.language)
+    try:
+        execution_graph = await _execution_graph(db, key, code, request.language)
+    except SyntaxError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid python: {exc.msg}") from exc
+    session = await run_crud(
+        db, create_code_session, create_code_session_async, request.project_id, request.language, key
+    )
+    return CodeSessionPublic(
+        id=session.id,
+        project_id=session.project_id,
+        language=session.language,
+        execution_graph=execution_graph,
+        created_at=session.created_at,
+    )
+
+
+async def _analyze_batch(db, language: str, files: list[tuple[str, str]]) -> CodeBatchPublic:
+    if language.lower() != "python":
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only python is supported in MVP")
+    if not files:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No python files to analyze")
+    if len(files) > settings.code_batch_max_files:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {settings.code_batch_max_files} files per batch"
+        )
+    if sum(len(code) for _, code in files) > settings.code_batch_max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Batch exceeds {settings.code_batch_max_bytes} bytes"
+        )
+    paths = [clean_path(path) for path, _ in files]
+    if len(set(paths)) != len(paths):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Duplicate file paths in batch")
+
+    # batches are AST-only, so they share stored analyses with single files analyzed without enrichment
+    sources = [normalize_source(code) for _, code in files]
+    keys = [analysis_key(code, language, enrichment=False) for code in sources]
+    graphs = {key: graph for key in set(keys) if (graph := analysis_cache.get(key)) is not None}
+    missing = [key for key in dict.fromkeys(keys) if key not in graphs]
+    graphs.update(await run_crud(db, get_code_analyses, get_code_analyses_async, missing))
+    cached = set(graphs)
+    await release_connection(db)
+
+    pending: dict[str, tuple[str, str]] = {}
+    for key, path, code in zip(keys, paths, sources):
+        if key not in graphs:
+            pending.setdefault(key, (path, code))
+    errors: dict[str, str] = {}
+    fresh: dict[str, dict] = {}
+    for key, result in zip(pending, await analyze_files_async(list(pending.values()))):
+        if "error" in result:
+            errors[key] = result["error"]
+        else:
+            fresh[key] = result["execution_graph"]
+    if fresh:
+        await run_crud(
+            db, save_code_analyses, save_code_analyses_async, analyzer_version(enrichment=False), language, fresh
+        )
+    graphs.update(fresh)
+    for key in graphs:
+        analysis_cache.set(key, graphs[key])
+
+    results = [
+        {"path": path, "execution_graph": graphs.get(key), "error": errors.get(key), "cached": key in cached}
+        for key, path in zip(keys, paths)
+    ]
+    graph = await run_in_threadpool(project_graph, results)
+    return CodeBatchPublic(files=results, graph=graph, workers=batch_workers())
+
+
+@router.post("/analyze/batch", response_model=CodeBatchPublic)
+async def analyze_batch(request: CodeBatchRequest, db=Depends(get_session), current_user=Depends(get_current_user)):
+    return await _analyze_batch(db, request.language, [(item.path, item.code) for item in request.files])
+
+
+@router.post("/analyze/batch/zip", response_model=CodeBatchPublic)
+async def analyze_batch_zip(
+    archive: UploadFile = File(...), db=Depends(get_session), current_user=Depends(get_current_user)
+):
+    data = await archive.read(settings.code_batch_max_bytes + 1)
+    if len(data) > settings.code_batch_max_bytes:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=f"Upload exceeds {settings.code_batch_max_bytes} bytes"
+        )
+    try:
+        files = await run_in_threadpool(read_archive, data)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return await _analyze_batch(db, "python", files)
+
+
+@router.post("/cfg", response_model=CodeCfgPublic)
+async def cfg(request: CodeCfgRequest, current_user=Depends(get_current_user)):
     if request.language.lower() != "python":
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Only python is supported in MVP")
-    execution_graph = analyze_code(request.code)
-    execution_graph["ai_metrics"] = analyze_code_quality(request.code)
-    return create_code_session(db, request.project_id, request.language, execution_graph)
+    try:
+        return await run_in_threadpool(function_cfg, request.code, request.function)
+    except SyntaxError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid python: {exc.msg}") from exc
+    except KeyError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Function not found") from exc
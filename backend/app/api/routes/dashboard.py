@@ -1,38 +1,32 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy import func
-from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
-from app.models.code_session import CodeSession
-from app.models.diagram import Diagram
-from app.models.project import Project
-from app.models.repository import Repository
+from app.api.deps import get_current_user, get_session, run_crud
+from app.core.config import settings
+from app.crud.project import list_recent_projects, list_recent_projects_async
+from app.crud.user_counters import (
+    count_user_totals,
+    count_user_totals_async,
+    get_user_counters,
+    get_user_counters_async,
+)
 from app.schemas.dashboard import DashboardSummary
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 
 @router.get("/summary", response_model=DashboardSummary)
-def summary(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    total_projects = db.query(func.count(Project.id)).filter(Project.user_id == current_user.id).scalar() or 0
+async def summary(db=Depends(get_session), current_user=Depends(get_current_user)):
+    if settings.user_counters_enabled:
+        totals = await run_crud(db, get_user_counters, get_user_counters_async, current_user.id)
+    else:
+        totals = await run_crud(db, count_user_totals, count_user_totals_async, current_user.id)
 
-    project_ids = [item[0] for item in db.query(Project.id).filter(Project.user_id == current_user.id).all()]
-    total_diagrams = db.query(func.count(Diagram.id)).filter(Diagram.project_id.in_(project_ids)).scalar() or 0
-    total_code_sessions = db.query(func.count(CodeSession.id)).filter(CodeSession.project_id.in_(project_ids)).scalar() or 0
-    total_repo_analyses = db.query(func.count(Repository.id)).filter(Repository.project_id.in_(project_ids)).scalar() or 0
-
-    recent_projects = (
-        db.query(Project)
-        .filter(Project.user_id == current_user.id)
-        .order_by(Project.created_at.desc())
-        .limit(5)
-        .all()
-    )
+    recent_projects = await run_crud(db, list_recent_projects, list_recent_projects_async, current_user.id)
 
     return DashboardSummary(
-        total_projects=total_projects,
-        total_diagrams=total_diagrams,
-        total_code_sessions=total_code_sessions,
-        total_repo_analyses=total_repo_analyses,
+        total_projects=totals["projects"],
+        total_diagrams=totals["diagrams"],
+        total_code_sessions=totals["code_sessions"],
+        total_repo_analyses=totals["repo_analyses"],
         recent_projects=recent_projects,
     )
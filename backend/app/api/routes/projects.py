@@ -1,27 +1,48 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
-from app.api.deps import get_current_user, get_db
-from app.crud.project import create_project, delete_project, list_projects
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from app.api.deps import get_current_user, get_session, run_crud
+from app.core.config import settings
+from app.crud.project import (
+    create_project,
+    create_project_async,
+    delete_project,
+    delete_project_async,
+    list_projects,
+    list_projects_async,
+)
 from app.schemas.project import ProjectCreate, ProjectPublic
 
 router = APIRouter(prefix="/projects", tags=["projects"])
 
 
 @router.post("/create", response_model=ProjectPublic)
-def create(project_in: ProjectCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    return create_project(db, current_user.id, project_in)
+async def create(project_in: ProjectCreate, db=Depends(get_session), current_user=Depends(get_current_user)):
+    return await run_crud(db, create_project, create_project_async, current_user.id, project_in)
 
 
 @router.get("/list", response_model=list[ProjectPublic])
-def list_all(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    return list_projects(db, current_user.id)
+async def list_all(
+    response: Response,
+    limit: int = Query(settings.page_size_default, ge=1),
+    cursor: str | None = None,
+    db=Depends(get_session),
+    current_user=Depends(get_current_user),
+):
+    try:
+        projects, next_cursor = await run_crud(
+            db, list_projects, list_projects_async, current_user.id, min(limit, settings.page_size_max), cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return projects
 
 
 @router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete(project_id: UUID, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    deleted = delete_project(db, current_user.id, project_id)
+async def delete(project_id: UUID, db=Depends(get_session), current_user=Depends(get_current_user)):
+    deleted = await run_crud(db, delete_project, delete_project_async, current_user.id, project_id)
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Project not found")
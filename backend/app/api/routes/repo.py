@@ -1,32 +1,112 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user, get_db
-from app.crud.repository import create_repository
-from app.schemas.repository import RepoAnalyzeRequest, RepositoryPublic
-from app.services.ai_service import build_repo_intelligence
-from app.services.github import GitHubRepoError, fetch_repo_tree
+from app.api.deps import get_current_user, get_db, get_session, run_crud
+from app.core.config import settings
+from app.crud.repo_job import (
+    count_active_repo_jobs,
+    count_active_repo_jobs_async,
+    create_repo_job,
+    create_repo_job_async,
+    get_repo_job,
+    get_repo_job_async,
+)
+from app.crud.repository import (
+    BrokenDeltaChainError,
+    delta_chain_complete,
+    delta_chain_complete_async,
+    get_repository,
+    get_repository_async,
+    get_repository_for_user,
+)
+from app.schemas.repository import RepoAnalyzeRequest, RepoJobPublic, RepositoryPublic, RepoTreeResponse
+from app.services.github import GitHubRepoError, parse_repo_url
+from app.services.repo_index import get_tree_index
+from app.services.repo_jobs import submit_repo_job
+from app.services.repo_tree import graph_summary
 
 router = APIRouter(prefix="/repo", tags=["repo"])
 
+STALE_ANALYSIS = "Stored analysis is incomplete, analyze the repository again"
+
+
+async def _job_response(db: Session | AsyncSession, job) -> RepoJobPublic:
+    response = RepoJobPublic.model_validate(job)
+    if job.repository_id:
+        repository = await run_crud(db, get_repository, get_repository_async, job.repository_id)
+        if repository:
+            # walking base ids is cheap, it keeps polls from reporting an analysis the tree can't serve
+            if not await run_crud(db, delta_chain_complete, delta_chain_complete_async, repository):
+                raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=STALE_ANALYSIS)
+            public = RepositoryPublic.model_validate(repository)
+            # the tree is paged through /repo/{id}/tree, polls only carry stats and insights
+            public.dependency_graph = graph_summary(repository.dependency_graph)
+            response.repository = public
+    return response
+
 
-@router.post("/analyze", response_model=RepositoryPublic)
-def analyze(request: RepoAnalyzeRequest, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
+@router.post("/analyze", response_model=RepoJobPublic, status_code=status.HTTP_202_ACCEPTED)
+async def analyze(request: RepoAnalyzeRequest, db=Depends(get_session), current_user=Depends(get_current_user)):
     try:
-        dependency_graph = fetch_repo_tree(str(request.repo_url))
+        parse_repo_url(str(request.repo_url))
     except GitHubRepoError as exc:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
-    except Exception as exc:
-        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to fetch repository") from exc
-
-    intelligence = build_repo_intelligence(dependency_graph)
-    dependency_graph["ai_insights"] = intelligence
-
-    return create_repository(
-        db,
-        request.project_id,
-        str(request.repo_url),
-        dependency_graph,
-        dependency_graph.get("commits", []),
+
+    active = await run_crud(db, count_active_repo_jobs, count_active_repo_jobs_async)
+    if active >= settings.repo_job_max_pending:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail="Too many pending analyses")
+
+    job = await run_crud(
+        db, create_repo_job, create_repo_job_async, current_user.id, request.project_id, str(request.repo_url)
+    )
+    submit_repo_job(job.id)
+    return await _job_response(db, job)
+
+
+@router.get("/jobs/{job_id}", response_model=RepoJobPublic)
+async def job_status(job_id: UUID, db=Depends(get_session), current_user=Depends(get_current_user)):
+    job = await run_crud(db, get_repo_job, get_repo_job_async, job_id, current_user.id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return await _job_response(db, job)
+
+
+@router.get("/{repository_id}/tree", response_model=RepoTreeResponse)
+def tree(
+    repository_id: UUID,
+    path: str = "",
+    depth: int = Query(1, ge=1, le=64),
+    glob: str | None = None,
+    ext: list[str] | None = Query(None),
+    limit: int = Query(500, ge=1),
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+):
+    repository = get_repository_for_user(db, repository_id, current_user.id)
+    if not repository:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Repository not found")
+
+    try:
+        index = get_tree_index(db, repository)
+    except BrokenDeltaChainError as exc:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=STALE_ANALYSIS) from exc
+    extensions = {item.lower().lstrip(".") for item in ext} if ext else None
+    path = path.strip("/")
+    try:
+        nodes, truncated = index.query(
+            path, depth, glob, extensions, min(limit, settings.repo_tree_max_nodes)
+        )
+    except KeyError as exc:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Path not found") from exc
+
+    return RepoTreeResponse(
+        repository_id=repository.id,
+        path=path,
+        depth=depth,
+        nodes=nodes,
+        truncated=truncated,
+        **index.summary(path),
     )
-    return create_repository(db, request.project_id, str(request.repo_url), dependency_graph)
@@ -0,0 +1,22 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_user
+from app.services.analysis_cache import analysis_cache
+from app.services.llm_cache import llm_cache
+from app.services.repo_index import tree_index_stats
+from app.services.user_cache import user_cache
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+# sync so the shared user cache's SQLite count runs in the threadpool
+@router.get("/caches")
+def caches(current_user=Depends(get_current_user)) -> dict[str, dict[str, Any]]:
+    return {
+        "user": user_cache.stats(),
+        "llm": llm_cache.stats(),
+        "code_analysis": analysis_cache.stats(),
+        "repo_tree_index": tree_index_stats(),
+    }
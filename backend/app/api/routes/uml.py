@@ -1,32 +1,35 @@
+import json
+from collections.abc import AsyncIterator
 from uuid import UUID
-import base64
 
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 
-from app.api.deps import get_current_user, get_db
-from app.crud.diagram import create_diagram, list_diagrams
-from app.schemas.diagram import DiagramPublic, UMLGenerateRequest
-from app.services.ai_service import generate_mermaid_uml
-from app.services.uml import generate_uml
+from app.api.deps import get_current_user, get_session, run_crud
+from app.core.config import settings
+from app.crud.diagram import (
+    create_diagram,
+    create_diagram_async,
+    get_diagram_for_user,
+    get_diagram_for_user_async,
+    list_diagrams,
+    list_diagrams_async,
+)
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.schemas.diagram import DiagramPublic, DiagramSummary, UMLGenerateRequest
+from app.services.uml import generate_uml, stream_uml
 
 router = APIRouter(prefix="/uml", tags=["uml"])
 
 
 @router.post("/generate", response_model=DiagramPublic)
-def generate(request: UMLGenerateRequest, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    result = generate_mermaid_uml(request.input_text, request.diagram_type)
-    mermaid_code = result.get("mermaid_code", "")
-    encoded = base64.urlsafe_b64encode(mermaid_code.encode("utf-8")).decode("utf-8")
-    diagram_json = {
-        "diagram_type": request.diagram_type,
-        "title": result.get("title", "AI UML"),
-        "mermaid_code": mermaid_code,
-        "image_url": f"https://mermaid.ink/img/{encoded}",
-    }
-    diagram_json = generate_uml(request.input_text, request.diagram_type)
-    return create_diagram(
+async def generate(request: UMLGenerateRequest, db=Depends(get_session), current_user=Depends(get_current_user)):
+    diagram_json = await generate_uml(request.input_text, request.diagram_type)
+    return await run_crud(
         db,
+        create_diagram,
+        create_diagram_async,
         project_id=request.project_id,
         diagram_type=request.diagram_type,
         input_text=request.input_text,
@@ -34,8 +37,79 @@ def generate(request: UMLGenerateRequest, db: Session = Depends(get_db), current
     )
 
 
-@router.get("/list", response_model=list[DiagramPublic])
-def list_for_project(
-    project_id: UUID, db: Session = Depends(get_db), current_user=Depends(get_current_user)
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def _save_diagram(request: UMLGenerateRequest, diagram_json: dict) -> dict:
+    db = SessionLocal()
+    try:
+        diagram = create_diagram(
+            db,
+            project_id=request.project_id,
+            diagram_type=request.diagram_type,
+            input_text=request.input_text,
+            diagram_json=diagram_json,
+        )
+        return DiagramPublic.model_validate(diagram).model_dump(mode="json")
+    finally:
+        db.close()
+
+
+async def _save_diagram_async(request: UMLGenerateRequest, diagram_json: dict) -> dict:
+    if not settings.database_async:
+        return await run_in_threadpool(_save_diagram, request, diagram_json)
+    async with AsyncSessionLocal() as db:
+        diagram = await create_diagram_async(
+            db,
+            project_id=request.project_id,
+            diagram_type=request.diagram_type,
+            input_text=request.input_text,
+            diagram_json=diagram_json,
+        )
+        return DiagramPublic.model_validate(diagram).model_dump(mode="json")
+
+
+async def _stream_events(request: UMLGenerateRequest) -> AsyncIterator[str]:
+    async for event, data in stream_uml(request.input_text, request.diagram_type):
+        if event != "diagram":
+            yield _sse(event, data)
+            continue
+        yield _sse("done", await _save_diagram_async(request, data))
+
+
+@router.post("/generate/stream")
+def generate_stream(request: UMLGenerateRequest, current_user=Depends(get_current_user)):
+    return StreamingResponse(
+        _stream_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/list", response_model=list[DiagramSummary])
+async def list_for_project(
+    project_id: UUID,
+    response: Response,
+    limit: int = Query(settings.page_size_default, ge=1),
+    cursor: str | None = None,
+    db=Depends(get_session),
+    current_user=Depends(get_current_user),
 ):
-    return list_diagrams(db, project_id)
+    try:
+        diagrams, next_cursor = await run_crud(
+            db, list_diagrams, list_diagrams_async, project_id, min(limit, settings.page_size_max), cursor
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return diagrams
+
+
+@router.get("/{diagram_id}", response_model=DiagramPublic)
+async def get_one(diagram_id: UUID, db=Depends(get_session), current_user=Depends(get_current_user)):
+    diagram = await run_crud(db, get_diagram_for_user, get_diagram_for_user_async, diagram_id, current_user.id)
+    if not diagram:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Diagram not found")
+    return diagram
@@ -6,18 +6,65 @@ class Settings(BaseSettings):
 
     app_name: str = "NDEX API"
     database_url: str = "sqlite:///./ndex.db"
+    database_async: bool = True
     jwt_secret_key: str = "change-me"
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
 
     llm_api_url: str | None = None
     llm_api_key: str | None = None
     llm_model: str = "llama-3.1-8b-instant"
     llm_model: str = "gpt-4o-mini"
     llm_timeout_seconds: int = 30
+    llm_pool_max_connections: int = 20
+    llm_pool_max_keepalive_connections: int = 10
+    llm_pool_keepalive_expiry_seconds: float = 30.0
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 512
+    llm_cache_ttl_seconds: int = 86400
+    llm_cache_path: str | None = None
+    code_llm_enrichment: bool = False
+    code_llm_enrichment_timeout_seconds: float = 5.0
+    code_graph_node_budget: int = 400
+    code_analysis_cache_max_entries: int = 256
+    code_batch_max_workers: int = 8
+    code_batch_max_files: int = 500
+    code_batch_max_bytes: int = 20_000_000
+    user_cache_enabled: bool = True
+    user_cache_max_entries: int = 1024
+    user_cache_ttl_seconds: int = 30
+    user_cache_path: str | None = None
 
     github_token: str | None = None
     github_timeout_seconds: int = 20
+    github_max_concurrency: int = 8
+    github_cache_path: str | None = None
+    github_cache_max_mb: int = 64
+    github_cache_max_entry_kb: int = 1024
+    github_max_retries: int = 2
+    github_max_backoff_seconds: int = 60
+    github_tree_concurrency: int = 4
+    github_tree_queue_size: int = 1000
+    github_tree_max_entries: int = 200000
+    github_tree_max_memory_mb: int = 256
+    github_history_days: int = 365
+    github_history_max_pages: int = 1000
+    github_history_concurrency: int = 4
+    github_churn_max_commits: int = 300
+    github_churn_concurrency: int = 8
+    github_churn_rate_reserve: int = 10
+
+    repo_job_workers: int = 4
+    repo_job_max_pending: int = 100
+    repo_job_lease_seconds: int = 60
+    repo_delta_max_chain: int = 10
+    repo_tree_index_cache_mb: int = 256
+    repo_tree_max_nodes: int = 1000
+    page_size_default: int = 50
+    page_size_max: int = 200
+    user_counters_enabled: bool = True
 
 
 settings = Settings()
@@ -0,0 +1,89 @@
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.code_analysis import CodeAnalysis
+
+
+def get_code_analysis(db: Session, key: str) -> CodeAnalysis | None:
+    return db.get(CodeAnalysis, key)
+
+
+def get_code_analyses(db: Session, keys: list[str]) -> dict[str, dict]:
+    if not keys:
+        return {}
+    rows = db.execute(select(CodeAnalysis.key, CodeAnalysis.execution_graph).where(CodeAnalysis.key.in_(keys)))
+    return dict(rows.all())
+
+
+def save_code_analysis(
+    db: Session, key: str, analyzer_version: str, language: str, execution_graph: dict
+) -> CodeAnalysis:
+    # a concurrent request may have stored the same source first; keep its row
+    try:
+        with db.begin_nested():
+            analysis = CodeAnalysis(
+                key=key, analyzer_version=analyzer_version, language=language, execution_graph=execution_graph
+            )
+            db.add(analysis)
+    except IntegrityError:
+        analysis = db.get(CodeAnalysis, key)
+    db.commit()
+    return analysis
+
+
+async def get_code_analysis_async(db: AsyncSession, key: str) -> CodeAnalysis | None:
+    return await db.get(CodeAnalysis, key)
+
+
+async def get_code_analyses_async(db: AsyncSession, keys: list[str]) -> dict[str, dict]:
+    if not keys:
+        return {}
+    rows = await db.execute(select(CodeAnalysis.key, CodeAnalysis.execution_graph).where(CodeAnalysis.key.in_(keys)))
+    return dict(rows.all())
+
+
+async def save_code_analysis_async(
+    db: AsyncSession, key: str, analyzer_version: str, language: str, execution_graph: dict
+) -> CodeAnalysis:
+    try:
+        async with db.begin_nested():
+            analysis = CodeAnalysis(
+                key=key, analyzer_version=analyzer_version, language=language, execution_graph=execution_graph
+            )
+            db.add(analysis)
+    except IntegrityError:
+        analysis = await db.get(CodeAnalysis, key)
+    await db.commit()
+    return analysis
+
+
+def save_code_analyses(db: Session, analyzer_version: str, language: str, graphs: dict[str, dict]) -> None:
+    for key, execution_graph in graphs.items():
+        try:
+            with db.begin_nested():
+                db.add(
+                    CodeAnalysis(
+                        key=key, analyzer_version=analyzer_version, language=language, execution_graph=execution_graph
+                    )
+                )
+        except IntegrityError:
+            continue
+    db.commit()
+
+
+async def save_code_analyses_async(
+    db: AsyncSession, analyzer_version: str, language: str, graphs: dict[str, dict]
+) -> None:
+    for key, execution_graph in graphs.items():
+        try:
+            async with db.begin_nested():
+                db.add(
+                    CodeAnalysis(
+                        key=key, analyzer_version=analyzer_version, language=language, execution_graph=execution_graph
+                    )
+                )
+        except IntegrityError:
+            continue
+    await db.commit()
@@ -1,15 +1,31 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.crud.user_counters import bump_user_counters, bump_user_counters_async
 from app.models.code_session import CodeSession
 
 
-def create_code_session(db: Session, project_id, language: str, execution_graph: dict) -> CodeSession:
+def create_code_session(db: Session, project_id, language: str, analysis_key: str) -> CodeSession:
     session = CodeSession(
         project_id=project_id,
         language=language,
-        execution_graph=execution_graph,
+        analysis_key=analysis_key,
     )
     db.add(session)
+    bump_user_counters(db, project_id=project_id, code_sessions=1)
     db.commit()
     db.refresh(session)
     return session
+
+
+async def create_code_session_async(db: AsyncSession, project_id, language: str, analysis_key: str) -> CodeSession:
+    session = CodeSession(
+        project_id=project_id,
+        language=language,
+        analysis_key=analysis_key,
+    )
+    db.add(session)
+    await bump_user_counters_async(db, project_id=project_id, code_sessions=1)
+    await db.commit()
+    await db.refresh(session)
+    return session
@@ -1,6 +1,11 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only
 
+from app.crud.pagination import keyset_page, keyset_page_async
+from app.crud.user_counters import bump_user_counters, bump_user_counters_async
 from app.models.diagram import Diagram
+from app.models.project import Project
 
 
 def create_diagram(db: Session, project_id, diagram_type: str, input_text: str, diagram_json: dict) -> Diagram:
@@ -11,15 +16,59 @@ def create_diagram(db: Session, project_id, diagram_type: str, input_text: str,
         diagram_json=diagram_json,
     )
     db.add(diagram)
+    bump_user_counters(db, project_id=project_id, diagrams=1)
     db.commit()
     db.refresh(diagram)
     return diagram
 
 
-def list_diagrams(db: Session, project_id):
-    return (
+def list_diagrams(db: Session, project_id, limit: int = 50, cursor: str | None = None):
+    query = (
         db.query(Diagram)
+        .options(load_only(Diagram.id, Diagram.project_id, Diagram.type, Diagram.created_at))
         .filter(Diagram.project_id == project_id)
-        .order_by(Diagram.created_at.desc())
-        .all()
     )
+    return keyset_page(query, Diagram, limit, cursor)
+
+
+def get_diagram_for_user(db: Session, diagram_id, user_id) -> Diagram | None:
+    return (
+        db.query(Diagram)
+        .join(Project, Project.id == Diagram.project_id)
+        .filter(Diagram.id == diagram_id, Project.user_id == user_id)
+        .first()
+    )
+
+
+async def create_diagram_async(
+    db: AsyncSession, project_id, diagram_type: str, input_text: str, diagram_json: dict
+) -> Diagram:
+    diagram = Diagram(
+        project_id=project_id,
+        type=diagram_type,
+        input_text=input_text,
+        diagram_json=diagram_json,
+    )
+    db.add(diagram)
+    await bump_user_counters_async(db, project_id=project_id, diagrams=1)
+    await db.commit()
+    await db.refresh(diagram)
+    return diagram
+
+
+async def list_diagrams_async(db: AsyncSession, project_id, limit: int = 50, cursor: str | None = None):
+    statement = (
+        select(Diagram)
+        .options(load_only(Diagram.id, Diagram.project_id, Diagram.type, Diagram.created_at))
+        .where(Diagram.project_id == project_id)
+    )
+    return await keyset_page_async(db, statement, Diagram, limit, cursor)
+
+
+async def get_diagram_for_user_async(db: AsyncSession, diagram_id, user_id) -> Diagram | None:
+    result = await db.execute(
+        select(Diagram)
+        .join(Project, Project.id == Diagram.project_id)
+        .where(Diagram.id == diagram_id, Project.user_id == user_id)
+    )
+    return result.scalars().first()
@@ -0,0 +1,51 @@
+import base64
+import binascii
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query
+
+
+def encode_cursor(row) -> str:
+    raw = f"{row.created_at.isoformat()}|{row.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, row_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def _after_cursor(model, cursor: str):
+    created_at, row_id = decode_cursor(cursor)
+    # compare against the stored value of the anchor row so the bound datetime's
+    # formatting never matters; the encoded timestamp covers a deleted anchor
+    anchor = func.coalesce(select(model.created_at).where(model.id == row_id).scalar_subquery(), created_at)
+    return or_(model.created_at < anchor, and_(model.created_at == anchor, model.id < row_id))
+
+
+def _split_page(rows: list, limit: int) -> tuple[list, str | None]:
+    next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def keyset_page(query: Query, model, limit: int, cursor: str | None = None) -> tuple[list, str | None]:
+    if cursor:
+        query = query.filter(_after_cursor(model, cursor))
+    rows = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    return _split_page(rows, limit)
+
+
+async def keyset_page_async(
+    db: AsyncSession, statement: Select, model, limit: int, cursor: str | None = None
+) -> tuple[list, str | None]:
+    if cursor:
+        statement = statement.where(_after_cursor(model, cursor))
+    result = await db.execute(statement.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1))
+    return _split_page(list(result.scalars().all()), limit)
@@ -1,5 +1,14 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.crud.pagination import keyset_page, keyset_page_async
+from app.crud.user_counters import (
+    bump_user_counters,
+    bump_user_counters_async,
+    count_project_totals,
+    count_project_totals_async,
+)
 from app.models.project import Project
 from app.schemas.project import ProjectCreate
 
@@ -7,19 +16,69 @@ from app.schemas.project import ProjectCreate
 def create_project(db: Session, user_id, project_in: ProjectCreate) -> Project:
     project = Project(user_id=user_id, name=project_in.name)
     db.add(project)
+    bump_user_counters(db, user_id=user_id, projects=1)
     db.commit()
     db.refresh(project)
     return project
 
 
-def list_projects(db: Session, user_id):
-    return db.query(Project).filter(Project.user_id == user_id).order_by(Project.created_at.desc()).all()
+def list_projects(db: Session, user_id, limit: int = 50, cursor: str | None = None):
+    return keyset_page(db.query(Project).filter(Project.user_id == user_id), Project, limit, cursor)
+
+
+def list_recent_projects(db: Session, user_id, limit: int = 5) -> list[Project]:
+    return (
+        db.query(Project)
+        .filter(Project.user_id == user_id)
+        .order_by(Project.created_at.desc(), Project.id.desc())
+        .limit(limit)
+        .all()
+    )
 
 
 def delete_project(db: Session, user_id, project_id) -> bool:
     project = db.query(Project).filter(Project.user_id == user_id, Project.id == project_id).first()
     if not project:
         return False
+    totals = count_project_totals(db, project_id)
     db.delete(project)
+    bump_user_counters(db, user_id=user_id, projects=-1, **{field: -count for field, count in totals.items()})
     db.commit()
     return True
+
+
+async def create_project_async(db: AsyncSession, user_id, project_in: ProjectCreate) -> Project:
+    project = Project(user_id=user_id, name=project_in.name)
+    db.add(project)
+    await bump_user_counters_async(db, user_id=user_id, projects=1)
+    await db.commit()
+    await db.refresh(project)
+    return project
+
+
+async def list_projects_async(db: AsyncSession, user_id, limit: int = 50, cursor: str | None = None):
+    return await keyset_page_async(db, select(Project).where(Project.user_id == user_id), Project, limit, cursor)
+
+
+async def list_recent_projects_async(db: AsyncSession, user_id, limit: int = 5) -> list[Project]:
+    result = await db.execute(
+        select(Project)
+        .where(Project.user_id == user_id)
+        .order_by(Project.created_at.desc(), Project.id.desc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def delete_project_async(db: AsyncSession, user_id, project_id) -> bool:
+    result = await db.execute(select(Project).where(Project.user_id == user_id, Project.id == project_id))
+    project = result.scalars().first()
+    if not project:
+        return False
+    totals = await count_project_totals_async(db, project_id)
+    await db.delete(project)
+    await bump_user_counters_async(
+        db, user_id=user_id, projects=-1, **{field: -count for field, count in totals.items()}
+    )
+    await db.commit()
+    return True
@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.repo_job import RepoJob
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _stale_filter(lease_seconds: int):
+    return RepoJob.status == "running", or_(
+        RepoJob.heartbeat_at.is_(None), RepoJob.heartbeat_at < _now() - timedelta(seconds=lease_seconds)
+    )
+
+
+def create_repo_job(db: Session, user_id, project_id, repo_url: str) -> RepoJob:
+    job = RepoJob(user_id=user_id, project_id=project_id, repo_url=repo_url, status="queued", progress=0)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def get_repo_job(db: Session, job_id, user_id=None) -> RepoJob | None:
+    query = db.query(RepoJob).filter(RepoJob.id == job_id)
+    if user_id is not None:
+        query = query.filter(RepoJob.user_id == user_id)
+    return query.first()
+
+
+def update_repo_job(db: Session, job: RepoJob, **fields) -> RepoJob:
+    for key, value in fields.items():
+        setattr(job, key, value)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_repo_job(db: Session, job_id, worker_id: str) -> bool:
+    claimed = (
+        db.query(RepoJob)
+        .filter(RepoJob.id == job_id, RepoJob.status == "queued")
+        .update(
+            {RepoJob.status: "running", RepoJob.worker_id: worker_id, RepoJob.heartbeat_at: _now()},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return claimed == 1
+
+
+def heartbeat_repo_jobs(db: Session, worker_id: str) -> int:
+    renewed = (
+        db.query(RepoJob)
+        .filter(RepoJob.status == "running", RepoJob.worker_id == worker_id)
+        .update({RepoJob.heartbeat_at: _now()}, synchronize_session=False)
+    )
+    db.commit()
+    return renewed
+
+
+def requeue_stale_repo_jobs(db: Session, lease_seconds: int) -> list:
+    stale = [row[0] for row in db.query(RepoJob.id).filter(*_stale_filter(lease_seconds)).all()]
+    if stale:
+        # the filter is repeated so a job renewed in between keeps its owner
+        db.query(RepoJob).filter(RepoJob.id.in_(stale), *_stale_filter(lease_seconds)).update(
+            {RepoJob.status: "queued", RepoJob.stage: None, RepoJob.worker_id: None, RepoJob.heartbeat_at: None},
+            synchronize_session=False,
+        )
+    db.commit()
+    return stale
+
+
+def count_active_repo_jobs(db: Session) -> int:
+    return db.query(RepoJob).filter(RepoJob.status.in_(ACTIVE_STATUSES)).count()
+
+
+def list_queued_repo_jobs(db: Session) -> list[RepoJob]:
+    return (
+        db.query(RepoJob)
+        .filter(RepoJob.status == "queued")
+        .order_by(RepoJob.created_at.asc())
+        .all()
+    )
+
+
+async def create_repo_job_async(db: AsyncSession, user_id, project_id, repo_url: str) -> RepoJob:
+    job = RepoJob(user_id=user_id, project_id=project_id, repo_url=repo_url, status="queued", progress=0)
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def get_repo_job_async(db: AsyncSession, job_id, user_id=None) -> RepoJob | None:
+    statement = select(RepoJob).where(RepoJob.id == job_id)
+    if user_id is not None:
+        statement = statement.where(RepoJob.user_id == user_id)
+    return (await db.execute(statement)).scalars().first()
+
+
+async def update_repo_job_async(db: AsyncSession, job: RepoJob, **fields) -> RepoJob:
+    for key, value in fields.items():
+        setattr(job, key, value)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def claim_repo_job_async(db: AsyncSession, job_id, worker_id: str) -> bool:
+    result = await db.execute(
+        update(RepoJob)
+        .where(RepoJob.id == job_id, RepoJob.status == "queued")
+        .values(status="running", worker_id=worker_id, heartbeat_at=_now()),
+        execution_options={"synchronize_session": False},
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def heartbeat_repo_jobs_async(db: AsyncSession, worker_id: str) -> int:
+    result = await db.execute(
+        update(RepoJob)
+        .where(RepoJob.status == "running", RepoJob.worker_id == worker_id)
+        .values(heartbeat_at=_now()),
+        execution_options={"synchronize_session": False},
+    )
+    await db.commit()
+    return result.rowcount
+
+
+async def requeue_stale_repo_jobs_async(db: AsyncSession, lease_seconds: int) -> list:
+    stale = list((await db.execute(select(RepoJob.id).where(*_stale_filter(lease_seconds)))).scalars().all())
+    if stale:
+        await db.execute(
+            update(RepoJob)
+            .where(RepoJob.id.in_(stale), *_stale_filter(lease_seconds))
+            .values(status="queued", stage=None, worker_id=None, heartbeat_at=None),
+            execution_options={"synchronize_session": False},
+        )
+    await db.commit()
+    return stale
+
+
+async def count_active_repo_jobs_async(db: AsyncSession) -> int:
+    result = await db.execute(select(func.count(RepoJob.id)).where(RepoJob.status.in_(ACTIVE_STATUSES)))
+    return result.scalar() or 0
+
+
+async def list_queued_repo_jobs_async(db: AsyncSession) -> list[RepoJob]:
+    result = await db.execute(select(RepoJob).where(RepoJob.status == "queued").order_by(RepoJob.created_at.asc()))
+    return list(result.scalars().all())
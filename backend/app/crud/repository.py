@@ -1,22 +1,179 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.crud.user_counters import bump_user_counters, bump_user_counters_async
+from app.models.project import Project
 from app.models.repository import Repository
+from app.services.repo_delta import apply_delta
+from app.services.repo_tree import graph_entries
 
 
-def create_repository(
-    db: Session,
+class BrokenDeltaChainError(LookupError):
+    pass
+
+
+def _new_repository(
     project_id,
     repo_url: str,
     dependency_graph: dict,
     commits: list[dict],
+    head_sha: str | None,
+    tree_sha: str | None,
+    base_repository_id,
 ) -> Repository:
-    repository = Repository(
+    return Repository(
         project_id=project_id,
         repo_url=repo_url,
         dependency_graph=dependency_graph,
         commits=commits,
+        head_sha=head_sha,
+        tree_sha=tree_sha,
+        base_repository_id=base_repository_id,
+    )
+
+
+def create_repository(
+    db: Session,
+    project_id,
+    repo_url: str,
+    dependency_graph: dict,
+    commits: list[dict],
+    head_sha: str | None = None,
+    tree_sha: str | None = None,
+    base_repository_id=None,
+) -> Repository:
+    repository = _new_repository(
+        project_id, repo_url, dependency_graph, commits, head_sha, tree_sha, base_repository_id
     )
     db.add(repository)
+    bump_user_counters(db, project_id=project_id, repo_analyses=1)
     db.commit()
     db.refresh(repository)
     return repository
+
+
+def get_repository(db: Session, repository_id) -> Repository | None:
+    return db.query(Repository).filter(Repository.id == repository_id).first()
+
+
+def get_repository_for_user(db: Session, repository_id, user_id) -> Repository | None:
+    return (
+        db.query(Repository)
+        .join(Project, Project.id == Repository.project_id)
+        .filter(Repository.id == repository_id, Project.user_id == user_id)
+        .first()
+    )
+
+
+def get_latest_repository(db: Session, project_id, repo_url: str) -> Repository | None:
+    return (
+        db.query(Repository)
+        .filter(Repository.project_id == project_id, Repository.repo_url == repo_url)
+        .order_by(Repository.created_at.desc())
+        .first()
+    )
+
+
+def _has_base(repository: Repository) -> bool:
+    return repository.base_repository_id is not None and "delta" in repository.dependency_graph
+
+
+def _materialize(chain: list[Repository]) -> dict:
+    entries = graph_entries(chain[-1].dependency_graph)
+    for item in reversed(chain[:-1]):
+        entries = apply_delta(entries, item.dependency_graph["delta"])
+
+    graph = {
+        key: value
+        for key, value in chain[0].dependency_graph.items()
+        if key not in {"delta", "delta_depth", "tree"}
+    }
+    graph["entries"] = entries
+    return graph
+
+
+def delta_chain_complete(db: Session, repository: Repository) -> bool:
+    base_id = repository.base_repository_id if _has_base(repository) else None
+    while base_id is not None:
+        row = db.execute(select(Repository.base_repository_id).where(Repository.id == base_id)).first()
+        if row is None:
+            return False
+        base_id = row[0]
+    return True
+
+
+def load_dependency_graph(db: Session, repository: Repository) -> dict:
+    chain = [repository]
+    while _has_base(chain[-1]):
+        base = get_repository(db, chain[-1].base_repository_id)
+        if base is None:
+            # a delta without its base can only produce a partial tree
+            raise BrokenDeltaChainError(chain[-1].base_repository_id)
+        chain.append(base)
+    return _materialize(chain)
+
+
+async def create_repository_async(
+    db: AsyncSession,
+    project_id,
+    repo_url: str,
+    dependency_graph: dict,
+    commits: list[dict],
+    head_sha: str | None = None,
+    tree_sha: str | None = None,
+    base_repository_id=None,
+) -> Repository:
+    repository = _new_repository(
+        project_id, repo_url, dependency_graph, commits, head_sha, tree_sha, base_repository_id
+    )
+    db.add(repository)
+    await bump_user_counters_async(db, project_id=project_id, repo_analyses=1)
+    await db.commit()
+    await db.refresh(repository)
+    return repository
+
+
+async def get_repository_async(db: AsyncSession, repository_id) -> Repository | None:
+    return await db.get(Repository, repository_id)
+
+
+async def get_repository_for_user_async(db: AsyncSession, repository_id, user_id) -> Repository | None:
+    result = await db.execute(
+        select(Repository)
+        .join(Project, Project.id == Repository.project_id)
+        .where(Repository.id == repository_id, Project.user_id == user_id)
+    )
+    return result.scalars().first()
+
+
+async def get_latest_repository_async(db: AsyncSession, project_id, repo_url: str) -> Repository | None:
+    result = await db.execute(
+        select(Repository)
+        .where(Repository.project_id == project_id, Repository.repo_url == repo_url)
+        .order_by(Repository.created_at.desc())
+        .limit(1)
+    )
+    return result.scalars().first()
+
+
+async def delta_chain_complete_async(db: AsyncSession, repository: Repository) -> bool:
+    base_id = repository.base_repository_id if _has_base(repository) else None
+    while base_id is not None:
+        row = (
+            await db.execute(select(Repository.base_repository_id).where(Repository.id == base_id))
+        ).first()
+        if row is None:
+            return False
+        base_id = row[0]
+    return True
+
+
+async def load_dependency_graph_async(db: AsyncSession, repository: Repository) -> dict:
+    chain = [repository]
+    while _has_base(chain[-1]):
+        base = await get_repository_async(db, chain[-1].base_repository_id)
+        if base is None:
+            raise BrokenDeltaChainError(chain[-1].base_repository_id)
+        chain.append(base)
+    return _materialize(chain)
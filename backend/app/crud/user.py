@@ -1,3 +1,5 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.security import get_password_hash
@@ -5,13 +7,47 @@ from app.models.user import User
 from app.schemas.user import UserCreate
 
 
+def get_user(db: Session, user_id) -> User | None:
+    return db.query(User).filter(User.id == user_id).first()
+
+
 def get_user_by_email(db: Session, email: str) -> User | None:
     return db.query(User).filter(User.email == email).first()
 
 
-def create_user(db: Session, user_in: UserCreate) -> User:
-    user = User(email=user_in.email, password_hash=get_password_hash(user_in.password))
+def create_user(db: Session, user_in: UserCreate, password_hash: str | None = None) -> User:
+    user = User(email=user_in.email, password_hash=password_hash or get_password_hash(user_in.password))
     db.add(user)
     db.commit()
     db.refresh(user)
     return user
+
+
+def update_password_hash(db: Session, user: User, password_hash: str) -> User:
+    user.password_hash = password_hash
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+async def get_user_async(db: AsyncSession, user_id) -> User | None:
+    return await db.get(User, user_id)
+
+
+async def get_user_by_email_async(db: AsyncSession, email: str) -> User | None:
+    return (await db.execute(select(User).where(User.email == email))).scalars().first()
+
+
+async def create_user_async(db: AsyncSession, user_in: UserCreate, password_hash: str) -> User:
+    user = User(email=user_in.email, password_hash=password_hash)
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+async def update_password_hash_async(db: AsyncSession, user: User, password_hash: str) -> User:
+    user.password_hash = password_hash
+    await db.commit()
+    await db.refresh(user)
+    return user
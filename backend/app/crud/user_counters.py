@@ -0,0 +1,142 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.code_session import CodeSession
+from app.models.diagram import Diagram
+from app.models.project import Project
+from app.models.repository import Repository
+from app.models.user_counters import UserCounters
+
+COUNTER_FIELDS = ("projects", "diagrams", "code_sessions", "repo_analyses")
+
+
+def _owned_count(model, user_id):
+    return (
+        select(func.count(model.id))
+        .join(Project, Project.id == model.project_id)
+        .where(Project.user_id == user_id)
+        .scalar_subquery()
+    )
+
+
+def _user_totals_statement(user_id):
+    return select(
+        select(func.count(Project.id)).where(Project.user_id == user_id).scalar_subquery(),
+        _owned_count(Diagram, user_id),
+        _owned_count(CodeSession, user_id),
+        _owned_count(Repository, user_id),
+    )
+
+
+def _project_totals_statement(project_id):
+    return select(
+        select(func.count(Diagram.id)).where(Diagram.project_id == project_id).scalar_subquery(),
+        select(func.count(CodeSession.id)).where(CodeSession.project_id == project_id).scalar_subquery(),
+        select(func.count(Repository.id)).where(Repository.project_id == project_id).scalar_subquery(),
+    )
+
+
+def _bump_statement(owner, values: dict):
+    return update(UserCounters).where(UserCounters.user_id == owner).values(**values)
+
+
+def _bump_values(deltas: dict[str, int]) -> dict:
+    return {field: getattr(UserCounters, field) + delta for field, delta in deltas.items() if delta}
+
+
+def count_user_totals(db: Session, user_id) -> dict[str, int]:
+    row = db.execute(_user_totals_statement(user_id)).one()
+    return dict(zip(COUNTER_FIELDS, (value or 0 for value in row)))
+
+
+def count_project_totals(db: Session, project_id) -> dict[str, int]:
+    row = db.execute(_project_totals_statement(project_id)).one()
+    return dict(zip(COUNTER_FIELDS[1:], (value or 0 for value in row)))
+
+
+def _backfill(db: Session, user_id) -> UserCounters | None:
+    # counts include rows still pending in this transaction, so no delta is applied on top
+    try:
+        with db.begin_nested():
+            counters = UserCounters(user_id=user_id, **count_user_totals(db, user_id))
+            db.add(counters)
+        return counters
+    except IntegrityError:
+        return None
+
+
+def get_user_counters(db: Session, user_id) -> dict[str, int]:
+    counters = db.get(UserCounters, user_id)
+    if counters is None:
+        counters = _backfill(db, user_id) or db.get(UserCounters, user_id)
+        db.commit()
+    return {field: getattr(counters, field) for field in COUNTER_FIELDS}
+
+
+def bump_user_counters(db: Session, user_id=None, project_id=None, **deltas: int) -> None:
+    # maintained even while USER_COUNTERS_ENABLED is off, so rows are still correct when reads switch back
+    values = _bump_values(deltas)
+    if not values:
+        return
+    db.flush()
+    owner = user_id
+    if owner is None:
+        owner = select(Project.user_id).where(Project.id == project_id).scalar_subquery()
+    result = db.execute(_bump_statement(owner, values), execution_options={"synchronize_session": False})
+    if result.rowcount:
+        return
+    if user_id is None:
+        user_id = db.execute(select(Project.user_id).where(Project.id == project_id)).scalar()
+        if user_id is None:
+            return
+    if _backfill(db, user_id) is None:
+        db.execute(_bump_statement(user_id, values), execution_options={"synchronize_session": False})
+
+
+async def count_user_totals_async(db: AsyncSession, user_id) -> dict[str, int]:
+    row = (await db.execute(_user_totals_statement(user_id))).one()
+    return dict(zip(COUNTER_FIELDS, (value or 0 for value in row)))
+
+
+async def count_project_totals_async(db: AsyncSession, project_id) -> dict[str, int]:
+    row = (await db.execute(_project_totals_statement(project_id))).one()
+    return dict(zip(COUNTER_FIELDS[1:], (value or 0 for value in row)))
+
+
+async def _backfill_async(db: AsyncSession, user_id) -> UserCounters | None:
+    try:
+        async with db.begin_nested():
+            counters = UserCounters(user_id=user_id, **await count_user_totals_async(db, user_id))
+            db.add(counters)
+        return counters
+    except IntegrityError:
+        return None
+
+
+async def get_user_counters_async(db: AsyncSession, user_id) -> dict[str, int]:
+    counters = await db.get(UserCounters, user_id)
+    if counters is None:
+        counters = await _backfill_async(db, user_id) or await db.get(UserCounters, user_id)
+        await db.commit()
+    return {field: getattr(counters, field) for field in COUNTER_FIELDS}
+
+
+async def bump_user_counters_async(db: AsyncSession, user_id=None, project_id=None, **deltas: int) -> None:
+    values = _bump_values(deltas)
+    if not values:
+        return
+    await db.flush()
+    owner = user_id
+    if owner is None:
+        owner = select(Project.user_id).where(Project.id == project_id).scalar_subquery()
+    result = await db.execute(_bump_statement(owner, values), execution_options={"synchronize_session": False})
+    if result.rowcount:
+        return
+    if user_id is None:
+        user_id = (await db.execute(select(Project.user_id).where(Project.id == project_id))).scalar()
+        if user_id is None:
+            return
+    if await _backfill_async(db, user_id) is None:
+        await db.execute(_bump_statement(user_id, values), execution_options={"synchronize_session": False})
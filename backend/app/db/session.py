@@ -1,5 +1,7 @@
-from sqlalchemy import create_engine
+from sqlalchemy import URL, create_engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
@@ -26,3 +28,34 @@ except OperationalError:
         engine = _build_engine(fallback_url)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# async drivers for the sync URLs accepted above
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_url(url) -> URL:
+    url = make_url(url)
+    url = url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername))
+    if url.drivername == "postgresql+asyncpg" and "sslmode" in url.query:
+        # asyncpg spells libpq's sslmode as ssl
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": url.query["sslmode"]})
+    return url
+
+
+async_engine: AsyncEngine | None = None
+AsyncSessionLocal: async_sessionmaker[AsyncSession] | None = None
+if settings.database_async:
+    # aiosqlite defaults to NullPool (a thread per connect); sqlite has one writer, so one pooled
+    # connection queues writes instead of spinning on "database is locked"
+    async_pool = (
+        {"poolclass": AsyncAdaptedQueuePool, "pool_size": 1, "max_overflow": 0}
+        if engine.dialect.name == "sqlite"
+        else {}
+    )
+    async_engine = create_async_engine(async_database_url(engine.url), **async_pool)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def close_async_engine() -> None:
+    if async_engine is not None:
+        await async_engine.dispose()
@@ -4,9 +4,27 @@ from sqlalchemy import inspect, text
 
 from app.api.router import api_router
 from app.core.config import settings
+from app.core.security import close_hash_pool, open_hash_pool
 from app.db.base import Base
-from app.db.session import engine
-from app.models import code_session, diagram, project, repository, user  # noqa: F401
+from app.db.session import close_async_engine, engine
+from app.models import (  # noqa: F401
+    code_analysis,
+    code_session,
+    diagram,
+    project,
+    repo_job,
+    repository,
+    user,
+    user_counters,
+)
+from app.services.code_batch import close_batch_pool, open_batch_pool
+from app.services.llm_client import (
+    close_async_llm_client,
+    close_llm_client,
+    open_async_llm_client,
+    open_llm_client,
+)
+from app.services.repo_jobs import start_repo_workers, stop_repo_workers
 
 app = FastAPI(title=settings.app_name)
 
@@ -16,21 +34,69 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
+# table -> column -> (sqlite type, other dialects type)
+ADDED_COLUMNS = {
+    "repositories": {
+        "commits": ("TEXT", "JSON"),
+        "head_sha": ("VARCHAR(40)", "VARCHAR(40)"),
+        "tree_sha": ("VARCHAR(40)", "VARCHAR(40)"),
+        "base_repository_id": ("CHAR(32)", "UUID"),
+    },
+    "code_sessions": {
+        "analysis_key": ("VARCHAR(64)", "VARCHAR(64)"),
+    },
+    "repo_jobs": {
+        "worker_id": ("VARCHAR(64)", "VARCHAR(64)"),
+        "heartbeat_at": ("DATETIME", "TIMESTAMP WITH TIME ZONE"),
+    },
+}
+
+
+def _add_missing_columns():
+    inspector = inspect(engine)
+    tables = inspector.get_table_names()
+    for table, added in ADDED_COLUMNS.items():
+        if table not in tables:
+            continue
+        columns = {col["name"] for col in inspector.get_columns(table)}
+        with engine.begin() as conn:
+            for column, (sqlite_type, default_type) in added.items():
+                if column in columns:
+                    continue
+                column_type = sqlite_type if engine.dialect.name == "sqlite" else default_type
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+
+
+def _create_missing_indexes():
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
 @app.on_event("startup")
 def on_startup():
     Base.metadata.create_all(bind=engine)
-    inspector = inspect(engine)
-    if "repositories" in inspector.get_table_names():
-        columns = {col["name"] for col in inspector.get_columns("repositories")}
-        if "commits" not in columns:
-            with engine.begin() as conn:
-                if engine.dialect.name == "sqlite":
-                    conn.execute(text("ALTER TABLE repositories ADD COLUMN commits TEXT"))
-                else:
-                    conn.execute(text("ALTER TABLE repositories ADD COLUMN commits JSON"))
+    _add_missing_columns()
+    _create_missing_indexes()
+    open_llm_client()
+    open_async_llm_client()
+    open_hash_pool()
+    open_batch_pool()
+    start_repo_workers()
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    stop_repo_workers()
+    close_hash_pool()
+    close_batch_pool()
+    close_llm_client()
+    await close_async_llm_client()
+    await close_async_engine()
 
 
 app.include_router(api_router)
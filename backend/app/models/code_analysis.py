@@ -0,0 +1,17 @@
+from sqlalchemy import DateTime, String
+from sqlalchemy.dialects.postgresql import JSON
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+# one row per distinct (normalized source, analyzer version); sessions reference it by key
+class CodeAnalysis(Base):
+    __tablename__ = "code_analyses"
+
+    key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    analyzer_version: Mapped[str] = mapped_column(String(64), nullable=False)
+    language: Mapped[str] = mapped_column(String(50), default="python")
+    execution_graph: Mapped[dict] = mapped_column(JSON, nullable=False)
+    created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
@@ -14,5 +14,7 @@ class CodeSession(Base):
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     project_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("projects.id"), index=True)
     language: Mapped[str] = mapped_column(String(50), default="python")
-    execution_graph: Mapped[dict] = mapped_column(JSON, nullable=False)
+    # new sessions keep the graph in code_analyses; the column stays for rows written before that
+    execution_graph: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    analysis_key: Mapped[str | None] = mapped_column(String(64), ForeignKey("code_analyses.key"), index=True)
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
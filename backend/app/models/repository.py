@@ -16,4 +16,9 @@ class Repository(Base):
     repo_url: Mapped[str] = mapped_column(Text, nullable=False)
     dependency_graph: Mapped[dict] = mapped_column(JSON, nullable=False)
     commits: Mapped[dict] = mapped_column(JSON, nullable=False)
+    head_sha: Mapped[str | None] = mapped_column(String(40), nullable=True)
+    tree_sha: Mapped[str | None] = mapped_column(String(40), nullable=True)
+    base_repository_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("repositories.id"), nullable=True
+    )
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
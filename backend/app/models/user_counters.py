@@ -0,0 +1,21 @@
+import uuid
+
+from sqlalchemy import DateTime, ForeignKey, Integer
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.db.base import Base
+
+
+class UserCounters(Base):
+    __tablename__ = "user_counters"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    projects: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    diagrams: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    code_sessions: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    repo_analyses: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
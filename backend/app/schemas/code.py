@@ -10,6 +10,43 @@ class CodeAnalyzeRequest(BaseModel):
     code: str
 
 
+class CodeBatchFile(BaseModel):
+    path: str
+    code: str
+
+
+class CodeBatchRequest(BaseModel):
+    language: str = "python"
+    files: list[CodeBatchFile]
+
+
+class CodeBatchResult(BaseModel):
+    path: str
+    execution_graph: dict | None = None
+    error: str | None = None
+    cached: bool = False
+
+
+class CodeBatchPublic(BaseModel):
+    files: list[CodeBatchResult]
+    graph: dict
+    workers: int
+
+
+class CodeCfgRequest(BaseModel):
+    language: str = "python"
+    code: str
+    function: str
+
+
+class CodeCfgPublic(BaseModel):
+    function: str
+    nodes: list[dict]
+    edges: list[dict]
+    steps: list[dict]
+    truncated: bool
+
+
 class CodeSessionPublic(BaseModel):
     id: UUID
     project_id: UUID
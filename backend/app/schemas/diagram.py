@@ -10,6 +10,16 @@ class UMLGenerateRequest(BaseModel):
     diagram_type: str = "class"
 
 
+class DiagramSummary(BaseModel):
+    id: UUID
+    project_id: UUID
+    type: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
 class DiagramPublic(BaseModel):
     id: UUID
     project_id: UUID
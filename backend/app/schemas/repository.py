@@ -15,7 +15,45 @@ class RepositoryPublic(BaseModel):
     repo_url: str
     dependency_graph: dict
     commits: list[dict]
+    head_sha: str | None = None
+    tree_sha: str | None = None
     created_at: datetime
 
     class Config:
         from_attributes = True
+
+
+class RepoJobPublic(BaseModel):
+    id: UUID
+    project_id: UUID
+    repo_url: str
+    status: str
+    stage: str | None = None
+    progress: int
+    error: str | None = None
+    repository_id: UUID | None = None
+    repository: RepositoryPublic | None = None
+    created_at: datetime
+    updated_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class RepoTreeNode(BaseModel):
+    path: str
+    name: str
+    type: str
+    size: int
+    total_size: int
+    file_count: int
+
+
+class RepoTreeResponse(BaseModel):
+    repository_id: UUID
+    path: str
+    depth: int
+    total_size: int
+    file_count: int
+    nodes: list[RepoTreeNode]
+    truncated: bool
@@ -1,3 +1,4 @@
+import asyncio
 import json
 from collections import Counter
 from typing import Any
@@ -5,12 +6,16 @@ from typing import Any
 import httpx
 
 from app.core.config import settings
+from app.services.commit_history import CommitAggregates
+from app.services.llm_client import (
+    discard_llm_response,
+    discard_llm_response_async,
+    post_llm,
+    post_llm_async,
+)
 
 
-def _call_llm_json(system_prompt: str, user_prompt: str, fallback: dict[str, Any]) -> dict[str, Any]:
-    if not settings.llm_api_url or not settings.llm_api_key:
-        return fallback
-
+def _llm_request(system_prompt: str, user_prompt: str) -> tuple[dict[str, Any], dict[str, str]]:
     payload = {
         "model": settings.llm_model,
         "messages": [
@@ -23,64 +28,93 @@ def _call_llm_json(system_prompt: str, user_prompt: str, fallback: dict[str, Any
         "Authorization": f"Bearer {settings.llm_api_key}",
         "Content-Type": "application/json",
     }
+    return payload, headers
 
+
+def _parse_llm_json(data: Any) -> dict[str, Any] | None:
     try:
-        with httpx.Client(timeout=settings.llm_timeout_seconds) as client:
-            response = client.post(settings.llm_api_url, json=payload, headers=headers)
-        response.raise_for_status()
-        data = response.json()
         content = data.get("choices", [{}])[0].get("message", {}).get("content")
-        if not content:
-            return fallback
-        parsed = json.loads(content)
-        if isinstance(parsed, dict):
-            return parsed
+        parsed = json.loads(content) if content else None
+    except (json.JSONDecodeError, KeyError, IndexError, TypeError, AttributeError):
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+def _call_llm_json(system_prompt: str, user_prompt: str, fallback: dict[str, Any]) -> dict[str, Any]:
+    if not settings.llm_api_url or not settings.llm_api_key:
+        return fallback
+
+    payload, headers = _llm_request(system_prompt, user_prompt)
+    try:
+        data = post_llm(payload, headers)
+    except (httpx.HTTPError, json.JSONDecodeError):
         return fallback
-    except (httpx.HTTPError, json.JSONDecodeError, KeyError, IndexError, TypeError):
+    parsed = _parse_llm_json(data)
+    if parsed is None:
+        discard_llm_response(payload)
         return fallback
+    return parsed
 
 
-def generate_mermaid_uml(input_text: str, diagram_type: str) -> dict[str, Any]:
-    fallback = {
-        "mermaid_code": f"classDiagram\nclass Main\nMain : {input_text[:40] or 'Generated from input'}",
-        "title": "Fallback UML",
-    }
-    system_prompt = (
-        "You are an expert software architect. Output strict JSON only with keys: "
-        "mermaid_code (string), title (string). Use valid Mermaid syntax based on diagram type."
-    )
-    user_prompt = f"Diagram type: {diagram_type}\nInput: {input_text}"
-    result = _call_llm_json(system_prompt, user_prompt, fallback)
-    if "mermaid_code" not in result:
+async def _call_llm_json_async(system_prompt: str, user_prompt: str, fallback: dict[str, Any]) -> dict[str, Any]:
+    if not settings.llm_api_url or not settings.llm_api_key:
         return fallback
-    return result
 
+    payload, headers = _llm_request(system_prompt, user_prompt)
+    try:
+        data = await post_llm_async(payload, headers)
+    except (httpx.HTTPError, json.JSONDecodeError):
+        return fallback
+    parsed = _parse_llm_json(data)
+    if parsed is None:
+        await discard_llm_response_async(payload)
+        return fallback
+    return parsed
+
+
+# the numbers always come from the AST; the LLM can only add review notes
+async def analyze_code_quality(code: str, metrics: dict[str, Any]) -> dict[str, Any]:
+    if not settings.code_llm_enrichment:
+        return metrics
 
-def analyze_code_quality(code: str) -> dict[str, Any]:
-    fallback = {
-        "maintainability_index": 65,
-        "hotspots": ["Complex function logic"],
-        "technical_debt": ["Add docstrings and tests"],
-        "infographic": [
-            {"label": "Maintainability", "value": "65/100", "tone": "medium"},
-            {"label": "Hotspots", "value": "1 detected", "tone": "warning"},
-        ],
-    }
     system_prompt = (
-        "You are a senior code quality analyst. Return strict JSON only with keys: "
-        "maintainability_index (0-100 integer), hotspots (array of strings), technical_debt (array of strings), "
-        "infographic (array of {label,value,tone})."
+        "You are a senior code quality analyst. Static metrics are already computed; do not restate them. "
+        "Return strict JSON only with keys: technical_debt (array of short strings), summary (string)."
+    )
+    user_prompt = (
+        f"Metrics: {json.dumps({key: metrics[key] for key in ('maintainability_index', 'complexity', 'hotspots')})}\n"
+        f"Analyze this code:\n{code}"
     )
-    user_prompt = f"Analyze this code:\n{code}"
-    return _call_llm_json(system_prompt, user_prompt, fallback)
+    try:
+        review = await asyncio.wait_for(
+            _call_llm_json_async(system_prompt, user_prompt, {}), settings.code_llm_enrichment_timeout_seconds
+        )
+    except asyncio.TimeoutError:
+        return metrics
+
+    notes = review.get("technical_debt")
+    notes = [str(note) for note in notes] if isinstance(notes, list) else []
+    extra = [note for note in notes if note not in metrics["technical_debt"]]
+    summary = review.get("summary")
+    if not extra and not isinstance(summary, str):
+        return metrics
+
+    enriched = {**metrics, "technical_debt": [*metrics["technical_debt"], *extra], "source": "ast+llm"}
+    if isinstance(summary, str):
+        enriched["summary"] = summary
+    return enriched
 
 
 def build_repo_intelligence(repo_data: dict[str, Any]) -> dict[str, Any]:
     commits = repo_data.get("commits", [])
     contributors = repo_data.get("contributors", [])
 
-    date_counts = Counter((c.get("date") or "")[:10] for c in commits if c.get("date"))
-    commit_frequency = [{"date": k, "count": v} for k, v in sorted(date_counts.items())]
+    history = repo_data.get("history")
+    if history:
+        commit_frequency = CommitAggregates(history).commit_frequency()
+    else:
+        date_counts = Counter((c.get("date") or "")[:10] for c in commits if c.get("date"))
+        commit_frequency = [{"date": k, "count": v} for k, v in sorted(date_counts.items())]
     contributor_influence = [
         {"name": c.get("login", "unknown"), "contributions": c.get("contributions", 0)} for c in contributors
     ]
@@ -0,0 +1,79 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from app.core.config import settings
+
+# bump whenever code_analysis or code_metrics change their output, so stored graphs are not reused
+ANALYZER_VERSION = "cfg-3"
+
+
+def normalize_source(code: str) -> str:
+    # line endings and trailing whitespace never change the graph or the metrics
+    lines = [line.rstrip() for line in code.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def analyzer_version(enrichment: bool | None = None) -> str:
+    # settings that shape the stored graph are part of the version
+    if enrichment is None:
+        enrichment = settings.code_llm_enrichment and bool(settings.llm_api_url)
+    return f"{ANALYZER_VERSION}:{settings.code_graph_node_budget}:{'llm' if enrichment else 'ast'}"
+
+
+def analysis_key(code: str, language: str, enrichment: bool | None = None) -> str:
+    material = {"version": analyzer_version(enrichment), "language": language.lower(), "code": code}
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+# in-process LRU in front of the code_analyses table; entries never go stale because the key is the content
+class AnalysisCache:
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+analysis_cache = AnalysisCache(max_entries=settings.code_analysis_cache_max_entries)
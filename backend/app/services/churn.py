@@ -0,0 +1,71 @@
+import heapq
+from typing import Any
+
+from app.services.repo_tree import encode_entries, node_paths
+
+
+def compact_commit_files(files: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    compact = []
+    for item in files:
+        entry = {
+            "filename": item.get("filename"),
+            "status": item.get("status"),
+            "additions": item.get("additions", 0),
+            "deletions": item.get("deletions", 0),
+        }
+        if item.get("previous_filename"):
+            entry["previous_filename"] = item["previous_filename"]
+        compact.append(entry)
+    return compact
+
+
+class ChurnCounters:
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        data = data or {}
+        self.commits: int = data.get("commits", 0)
+        # path -> [changes, additions, deletions]
+        self.files: dict[str, list[int]] = {path: list(counts) for path, counts in data.get("files", {}).items()}
+
+    def fold(self, files: list[dict[str, Any]]) -> None:
+        self.commits += 1
+        for item in files:
+            path = item.get("filename")
+            if not path:
+                continue
+            previous = item.get("previous_filename")
+            if previous and previous in self.files:
+                carried = self.files.pop(previous)
+                counts = self.files.setdefault(path, [0, 0, 0])
+                for i, value in enumerate(carried):
+                    counts[i] += value
+            if item.get("status") == "removed":
+                self.files.pop(path, None)
+                continue
+            counts = self.files.setdefault(path, [0, 0, 0])
+            counts[0] += 1
+            counts[1] += item.get("additions") or 0
+            counts[2] += item.get("deletions") or 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"commits": self.commits, "files": self.files}
+
+
+def join_churn(
+    churn: dict[str, Any], dependency_graph: dict[str, Any], top: int = 20
+) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    tree = dependency_graph.get("tree") or encode_entries(dependency_graph.get("entries", []))
+    counts = churn.get("files", {})
+    kept: dict[str, list[int]] = {}
+    ranked: list[tuple[int, int, str, int]] = []
+    for path, type_code, size in zip(node_paths(tree), tree["types"], tree["sizes"]):
+        if type_code != "b" or path not in counts:
+            continue
+        changes, additions, deletions = counts[path]
+        kept[path] = counts[path]
+        ranked.append((changes, additions + deletions, path, size or 0))
+
+    hotspots = [
+        {"path": path, "changes": changes, "lines_changed": lines, "size": size}
+        for changes, lines, path, size in heapq.nlargest(top, ranked)
+    ]
+    return {**churn, "files": kept}, hotspots
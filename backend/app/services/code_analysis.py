@@ -1,73 +1,420 @@
 import ast
+import math
 from typing import Any
 
+from app.core.config import settings
 
-class _StepCollector(ast.NodeVisitor):
-    def __init__(self) -> None:
-        self.steps: list[dict[str, Any]] = []
+LABEL_LENGTH = 48
+
+# statements that never split a basic block
+SIMPLE_STATEMENTS = (
+    ast.Assign,
+    ast.AugAssign,
+    ast.AnnAssign,
+    ast.Expr,
+    ast.Import,
+    ast.ImportFrom,
+    ast.Pass,
+    ast.Delete,
+    ast.Global,
+    ast.Nonlocal,
+    ast.Assert,
+    ast.FunctionDef,
+    ast.AsyncFunctionDef,
+    ast.ClassDef,
+)
+TERMINATORS = (ast.Return, ast.Raise, ast.Break, ast.Continue)
+SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+
+
+def _label(node: ast.AST) -> str:
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        text = f"def {node.name}"
+    elif isinstance(node, ast.ClassDef):
+        text = f"class {node.name}"
+    else:
+        text = ast.unparse(node).splitlines()[0]
+    return text if len(text) <= LABEL_LENGTH else f"{text[: LABEL_LENGTH - 3]}..."
+
+
+def _called_names(node: ast.AST) -> list[str]:
+    names = []
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, ast.Call):
+            if isinstance(current.func, ast.Name):
+                names.append(current.func.id)
+            elif isinstance(current.func, ast.Attribute):
+                names.append(current.func.attr)
+        # nested definitions get their own CFG
+        pending.extend(child for child in ast.iter_child_nodes(current) if not isinstance(child, SCOPES))
+    return names
+
+
+# basic blocks and branch/loop edges for one function, or the module body when node is None
+class _CfgBuilder:
+    def __init__(self, prefix: str, name: str, node: ast.AST | None, body: list[ast.stmt]) -> None:
+        self.prefix = prefix
+        self.name = name
+        self.lineno = getattr(node, "lineno", 1)
+        self.nodes: list[dict[str, Any]] = []
         self.edges: list[dict[str, str]] = []
-        self.nodes: list[dict[str, str]] = []
-        self._last_node_id: str | None = None
-        self._counter = 0
-
-    def _new_node(self, label: str, node_type: str) -> str:
-        self._counter += 1
-        node_id = f"n{self._counter}"
-        self.nodes.append({"id": node_id, "label": label, "type": node_type})
-        if self._last_node_id:
-            self.edges.append({"from": self._last_node_id, "to": node_id})
-        self._last_node_id = node_id
+        self.calls: list[tuple[str, str]] = []
+        self._loops: list[dict[str, Any]] = []
+        # try statements with a finally clause that enclose the statement being built, innermost last
+        self._finally: list[list[tuple[list[tuple[str, str | None]], type]]] = []
+
+        label = "module" if node is None else _label(node)
+        self.entry = self._node("function", label, self.lineno, node_id=prefix)
+        # the exit id is needed by return edges; the node itself goes last so steps read top to bottom
+        self.exit = f"{prefix}x"
+        self._link(self._statements(body, [(self.entry, None)]), self.exit)
+        end_lineno = getattr(node, "end_lineno", None) or (body[-1].end_lineno if body else self.lineno)
+        self._node("exit", f"exit {name}", end_lineno, node_id=self.exit)
+
+    def _node(self, node_type: str, label: str, lineno: int, node_id: str | None = None) -> str:
+        node_id = node_id or f"{self.prefix}b{len(self.nodes)}"
+        self.nodes.append({"id": node_id, "label": label, "type": node_type, "lineno": lineno, "statements": 0})
         return node_id
 
-    def _add_step(self, description: str, node_id: str | None) -> None:
-        self.steps.append({"description": description, "node_id": node_id})
-
-    def visit_Assign(self, node: ast.Assign) -> Any:
-        target_names = [self._format_target(target) for target in node.targets]
-        label = f"assign {', '.join(target_names)}"
-        node_id = self._new_node(label, "assign")
-        self._add_step(f"Assign to {', '.join(target_names)}", node_id)
-        self.generic_visit(node)
-
-    def visit_Call(self, node: ast.Call) -> Any:
-        func_name = self._format_call(node.func)
-        label = f"call {func_name}"
-        node_id = self._new_node(label, "call")
-        self._add_step(f"Call {func_name}", node_id)
-        self.generic_visit(node)
-
-    def visit_FunctionDef(self, node: ast.FunctionDef) -> Any:
-        label = f"def {node.name}"
-        node_id = self._new_node(label, "function")
-        self._add_step(f"Define function {node.name}", node_id)
-        self.generic_visit(node)
-
-    def visit_Return(self, node: ast.Return) -> Any:
-        node_id = self._new_node("return", "return")
-        self._add_step("Return from function", node_id)
-        self.generic_visit(node)
-
-    def _format_target(self, target: ast.AST) -> str:
-        if isinstance(target, ast.Name):
-            return target.id
-        if isinstance(target, ast.Attribute):
-            return f"{self._format_target(target.value)}.{target.attr}"
-        return target.__class__.__name__
-
-    def _format_call(self, func: ast.AST) -> str:
-        if isinstance(func, ast.Name):
-            return func.id
-        if isinstance(func, ast.Attribute):
-            return f"{self._format_call(func.value)}.{func.attr}"
-        return func.__class__.__name__
-
-
-def analyze_code(code: str) -> dict[str, Any]:
-    tree = ast.parse(code)
-    collector = _StepCollector()
-    collector.visit(tree)
+    def _link(self, sources: list[tuple[str, str | None]], target: str) -> None:
+        for source, kind in sources:
+            edge = {"from": source, "to": target}
+            if kind:
+                edge["kind"] = kind
+            self.edges.append(edge)
+
+    def _scan(self, node_id: str, node: ast.AST) -> None:
+        self.calls.extend((node_id, name) for name in _called_names(node))
+
+    def _statements(self, body: list[ast.stmt], preds: list[tuple[str, str | None]]) -> list[tuple[str, str | None]]:
+        block: dict[str, Any] | None = None
+        for statement in body:
+            if not isinstance(statement, SIMPLE_STATEMENTS + TERMINATORS):
+                block = None
+                preds = self._compound(statement, preds)
+                continue
+
+            if block is None:
+                block_id = self._node("block", _label(statement), statement.lineno)
+                self._link(preds, block_id)
+                block = self.nodes[-1]
+                preds = [(block_id, None)]
+            elif block["statements"] == 1:
+                block["label"] = f"{block['label']} ..."
+            block["statements"] += 1
+            if not isinstance(statement, SCOPES):
+                self._scan(block["id"], statement)
+
+            if isinstance(statement, TERMINATORS):
+                self._terminate(statement, block["id"])
+                block = None
+                preds = []
+        return preds
+
+    def _terminate(self, statement: ast.stmt, block_id: str) -> None:
+        self._jump([(block_id, None)], type(statement))
+
+    def _jump(self, sources: list[tuple[str, str | None]], terminator: type) -> None:
+        kind = terminator.__name__.lower()
+        sources = [(source, kind) for source, _ in sources]
+        if terminator in (ast.Return, ast.Raise):
+            through_finally = bool(self._finally)
+        elif self._loops:
+            # break/continue only pass through finally clauses opened inside the loop
+            through_finally = len(self._finally) > self._loops[-1]["finally_depth"]
+        else:
+            return
+        if through_finally:
+            self._finally[-1].append((sources, terminator))
+        elif terminator in (ast.Return, ast.Raise):
+            self._link(sources, self.exit)
+        elif terminator is ast.Break:
+            self._loops[-1]["breaks"].extend(sources)
+        else:
+            self._link(sources, self._loops[-1]["header"])
+
+    def _compound(self, statement: ast.stmt, preds: list[tuple[str, str | None]]) -> list[tuple[str, str | None]]:
+        if isinstance(statement, ast.If):
+            branch = self._node("branch", f"if {_label(statement.test)}"[:LABEL_LENGTH], statement.lineno)
+            self._link(preds, branch)
+            self._scan(branch, statement.test)
+            exits = self._statements(statement.body, [(branch, "true")])
+            if statement.orelse:
+                return exits + self._statements(statement.orelse, [(branch, "false")])
+            return exits + [(branch, "false")]
+
+        if isinstance(statement, (ast.For, ast.AsyncFor, ast.While)):
+            if isinstance(statement, ast.While):
+                label, header_expr = f"while {ast.unparse(statement.test)}", statement.test
+            else:
+                label = f"for {ast.unparse(statement.target)} in {ast.unparse(statement.iter)}"
+                header_expr = statement.iter
+            header = self._node("loop", label[:LABEL_LENGTH], statement.lineno)
+            self._link(preds, header)
+            self._scan(header, header_expr)
+            self._loops.append({"header": header, "breaks": [], "finally_depth": len(self._finally)})
+            body_exits = self._statements(statement.body, [(header, "true")])
+            self._link([(source, kind or "loop") for source, kind in body_exits], header)
+            loop = self._loops.pop()
+            exits = self._statements(statement.orelse, [(header, "false")]) if statement.orelse else [(header, "false")]
+            return exits + loop["breaks"]
+
+        if isinstance(statement, (ast.Try, getattr(ast, "TryStar", ast.Try))):
+            entry = self._node("try", "try", statement.lineno)
+            self._link(preds, entry)
+            if statement.finalbody:
+                self._finally.append([])
+            exits = self._statements(statement.body, [(entry, None)])
+            if statement.orelse:
+                exits = self._statements(statement.orelse, exits)
+            for handler in statement.handlers:
+                label = f"except {ast.unparse(handler.type)}" if handler.type else "except"
+                handler_id = self._node("except", label[:LABEL_LENGTH], handler.lineno)
+                self._link([(entry, "exception")], handler_id)
+                exits += self._statements(handler.body, [(handler_id, None)])
+            if statement.finalbody:
+                pending = self._finally.pop()
+                final = self._node("finally", "finally", statement.finalbody[0].lineno)
+                self._link(exits, final)
+                for sources, _ in pending:
+                    self._link(sources, final)
+                final_exits = self._statements(statement.finalbody, [(final, None)])
+                # after the finally body each jump continues to where it was going
+                for terminator in dict.fromkeys(terminator for _, terminator in pending):
+                    self._jump(final_exits, terminator)
+                return final_exits if exits else []
+            return exits
+
+        if isinstance(statement, (ast.With, ast.AsyncWith)):
+            label = "with " + ", ".join(ast.unparse(item) for item in statement.items)
+            block = self._node("with", label[:LABEL_LENGTH], statement.lineno)
+            self._link(preds, block)
+            for item in statement.items:
+                self._scan(block, item.context_expr)
+            return self._statements(statement.body, [(block, None)])
+
+        if isinstance(statement, getattr(ast, "Match", ())):
+            branch = self._node("branch", f"match {ast.unparse(statement.subject)}"[:LABEL_LENGTH], statement.lineno)
+            self._link(preds, branch)
+            exits = []
+            for case in statement.cases:
+                exits += self._statements(case.body, [(branch, f"case {ast.unparse(case.pattern)}")])
+            return exits + [(branch, "no match")]
+
+        # anything unknown is kept as an opaque block
+        block = self._node("block", _label(statement), statement.lineno)
+        self._link(preds, block)
+        return [(block, None)]
+
+
+def _functions(tree: ast.Module) -> list[tuple[str, ast.AST]]:
+    found = []
+
+    def walk(node: ast.AST, scope: list[str]) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                found.append((".".join([*scope, child.name]), child))
+                walk(child, [*scope, child.name])
+            elif isinstance(child, ast.ClassDef):
+                walk(child, [*scope, child.name])
+            elif not isinstance(child, ast.Lambda):
+                walk(child, scope)
+
+    walk(tree, [])
+    return found
+
+
+def _dotted(node: ast.AST) -> str | None:
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    return ".".join([node.id, *reversed(parts)])
+
+
+# what other files can see of this one: its imports, top-level definitions and call targets
+def module_summary(tree: ast.Module) -> dict[str, Any]:
+    imports, calls = [], set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend(
+                {"module": alias.name, "name": None, "alias": alias.asname, "level": 0} for alias in node.names
+            )
+        elif isinstance(node, ast.ImportFrom):
+            imports.extend(
+                {"module": node.module or "", "name": alias.name, "alias": alias.asname, "level": node.level}
+                for alias in node.names
+                if alias.name != "*"
+            )
+        elif isinstance(node, ast.Call):
+            dotted = _dotted(node.func)
+            if dotted:
+                calls.add(dotted)
+    definitions = [
+        node.name for node in tree.body if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    ]
+    return {"imports": imports, "definitions": definitions, "calls": sorted(calls)}
+
+
+def _builders(tree: ast.Module) -> list[_CfgBuilder]:
+    return [_CfgBuilder("f0", "<module>", None, tree.body)] + [
+        _CfgBuilder(f"f{index}", name, node, node.body)
+        for index, (name, node) in enumerate(_functions(tree), start=1)
+    ]
+
+
+def _step(node: dict[str, Any]) -> dict[str, Any]:
+    if node["type"] == "exit":
+        description = node["label"].capitalize()
+    elif node["type"] == "collapsed":
+        description = f"Line {node['lineno']}: {node['label']} ({node['blocks']} blocks, collapsed)"
+    else:
+        description = f"Line {node['lineno']}: {node['label']}"
+    return {"description": description, "node_id": node["id"]}
+
+
+def _call_edges(builders: list[_CfgBuilder], visible: dict[str, str]) -> list[dict[str, str]]:
+    by_name: dict[str, str] = {}
+    for builder in builders[1:]:
+        by_name.setdefault(builder.name.rsplit(".", 1)[-1], builder.entry)
+    entries = set(by_name.values())
+
+    edges, seen = [], set()
+    for builder in builders:
+        for block_id, name in builder.calls:
+            target = visible.get(by_name.get(name))
+            source = visible.get(block_id)
+            if target is None or source is None or (source, target) in seen:
+                continue
+            if source == target and target not in entries:
+                # calls between functions of one collapsed group stay hidden
+                continue
+            seen.add((source, target))
+            edges.append({"from": source, "to": target, "kind": "call"})
+    return edges
+
+
+def _groups(builders: list[_CfgBuilder], budget: int) -> list[list[int]]:
+    # functions are grouped by their top-level class or function, then neighbouring groups are merged
+    # into source-order sections until the overview fits the budget
+    scopes: dict[str, list[int]] = {}
+    for index, builder in enumerate(builders[1:], start=1):
+        scopes.setdefault(builder.name.split(".", 1)[0], []).append(index)
+    groups = [[0], *scopes.values()]
+    if len(groups) <= budget:
+        return groups
+    size = math.ceil((len(groups) - 1) / max(budget - 1, 1))
+    return [[0]] + [
+        [index for group in groups[start : start + size] for index in group] for start in range(1, len(groups), size)
+    ]
+
+
+def _group_node(node_id: str, members: list[_CfgBuilder]) -> dict[str, Any]:
+    first, last = members[0].name.split(".", 1)[0], members[-1].name.split(".", 1)[0]
+    return {
+        "id": node_id,
+        "label": first if first == last else f"{first} .. {last}",
+        "type": "collapsed",
+        "lineno": members[0].lineno,
+        "blocks": sum(len(builder.nodes) for builder in members),
+        "expandable": False,
+        "functions": [builder.name for builder in members],
+    }
+
+
+def _truncate(nodes: list[dict[str, Any]], edges: list[dict[str, str]], budget: int):
+    kept = nodes[:budget]
+    ids = {node["id"] for node in kept}
+    return kept, [edge for edge in edges if edge["from"] in ids and edge["to"] in ids], len(nodes) > budget
+
+
+def analyze_code(code: str, tree: ast.Module | None = None, node_budget: int | None = None) -> dict[str, Any]:
+    if tree is None:
+        tree = ast.parse(code)
+    budget = node_budget or settings.code_graph_node_budget
+    builders = _builders(tree)
+
+    # every function starts as one collapsed node; expand in source order while the budget allows
+    used = len(builders)
+    expanded = set()
+    for index, builder in enumerate(builders):
+        if used + len(builder.nodes) - 1 <= budget:
+            expanded.add(index)
+            used += len(builder.nodes) - 1
+
+    nodes: list[dict[str, Any]] = []
+    edges: list[dict[str, str]] = []
+    visible: dict[str, str] = {}
+    functions = []
+    grouped: dict[int, str] = {}
+    group_nodes: dict[int, dict[str, Any]] = {}
+    if len(builders) > budget:
+        # too many functions for one node each: collapse whole classes and module sections instead
+        for number, group in enumerate(_groups(builders, budget)):
+            if len(group) > 1:
+                group_nodes[group[0]] = _group_node(f"g{number}", [builders[index] for index in group])
+                grouped.update({index: f"g{number}" for index in group})
+
+    for index, builder in enumerate(builders):
+        if index in grouped:
+            if index in group_nodes:
+                nodes.append(group_nodes[index])
+            visible.update({node["id"]: grouped[index] for node in builder.nodes})
+        elif index in expanded:
+            nodes.extend(builder.nodes)
+            edges.extend(builder.edges)
+            visible.update({node["id"]: node["id"] for node in builder.nodes})
+        else:
+            nodes.append(
+                {
+                    "id": builder.entry,
+                    "label": builder.name,
+                    "type": "collapsed",
+                    "lineno": builder.lineno,
+                    "blocks": len(builder.nodes),
+                    "expandable": True,
+                    "function": builder.name,
+                }
+            )
+            visible.update({node["id"]: builder.entry for node in builder.nodes})
+        functions.append(
+            {
+                "name": builder.name,
+                "lineno": builder.lineno,
+                "node_id": grouped.get(index, builder.entry),
+                "blocks": len(builder.nodes),
+                "expanded": index in expanded,
+            }
+        )
+    edges.extend(_call_edges(builders, visible))
+    nodes, edges, truncated = _truncate(nodes, edges, budget)
+
+    return {
+        "nodes": nodes,
+        "edges": edges,
+        "steps": [_step(node) for node in nodes],
+        "functions": functions,
+        "node_budget": budget,
+        "collapsed": len(expanded) < len(builders),
+        "truncated": truncated,
+        "module": module_summary(tree),
+    }
+
+
+def function_cfg(code: str, name: str, node_budget: int | None = None) -> dict[str, Any]:
+    builders = _builders(ast.parse(code))
+    builder = next((item for item in builders if item.name == name), None)
+    if builder is None:
+        raise KeyError(name)
+    nodes, edges, truncated = _truncate(builder.nodes, builder.edges, node_budget or settings.code_graph_node_budget)
     return {
-        "nodes": collector.nodes,
-        "edges": collector.edges,
-        "steps": collector.steps,
+        "function": name,
+        "nodes": nodes,
+        "edges": edges,
+        "steps": [_step(node) for node in nodes],
+        "truncated": truncated,
     }
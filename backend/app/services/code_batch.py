@@ -0,0 +1,199 @@
+import ast
+import asyncio
+import io
+import math
+import os
+import posixpath
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from app.core.config import settings
+from app.services.code_analysis import analyze_code
+from app.services.code_metrics import compute_code_metrics
+
+# tasks per worker, so one slow file doesn't leave the other workers idle
+CHUNKS_PER_WORKER = 4
+
+_batch_pool: ProcessPoolExecutor | None = None
+_batch_pool_lock = threading.Lock()
+
+
+def batch_workers() -> int:
+    return max(1, min(settings.code_batch_max_workers, os.cpu_count() or 1))
+
+
+def _get_batch_pool() -> ProcessPoolExecutor:
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is None:
+            _batch_pool = ProcessPoolExecutor(max_workers=batch_workers())
+        return _batch_pool
+
+
+def open_batch_pool() -> None:
+    _get_batch_pool()
+
+
+def close_batch_pool() -> None:
+    global _batch_pool
+    with _batch_pool_lock:
+        pool, _batch_pool = _batch_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def analyze_files(files: list[tuple[str, str]]) -> list[dict[str, Any]]:
+    # runs in a pool worker; syntax errors are reported per file instead of failing the chunk
+    results = []
+    for path, code in files:
+        try:
+            tree = ast.parse(code, filename=path)
+        except SyntaxError as exc:
+            results.append({"path": path, "error": f"Invalid python: {exc.msg} (line {exc.lineno})"})
+            continue
+        execution_graph = analyze_code(code, tree)
+        execution_graph["ai_metrics"] = compute_code_metrics(code, tree)
+        results.append({"path": path, "execution_graph": execution_graph})
+    return results
+
+
+async def analyze_files_async(files: list[tuple[str, str]]) -> list[dict[str, Any]]:
+    if not files:
+        return []
+    size = math.ceil(len(files) / (batch_workers() * CHUNKS_PER_WORKER))
+    loop = asyncio.get_running_loop()
+    pool = _get_batch_pool()
+    chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(pool, analyze_files, files[start : start + size])
+            for start in range(0, len(files), size)
+        )
+    )
+    return [result for chunk in chunks for result in chunk]
+
+
+def clean_path(path: str) -> str:
+    return posixpath.normpath(path.replace("\\", "/")).lstrip("/")
+
+
+def read_archive(data: bytes) -> list[tuple[str, str]]:
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile as exc:
+        raise ValueError("Upload is not a zip archive") from exc
+    with archive:
+        entries = [
+            info
+            for info in archive.infolist()
+            if not info.is_dir() and info.filename.endswith(".py") and not info.filename.startswith("__MACOSX/")
+        ]
+        if len(entries) > settings.code_batch_max_files:
+            raise ValueError(f"Archive has more than {settings.code_batch_max_files} python files")
+        # declared sizes are checked before anything is inflated
+        if sum(info.file_size for info in entries) > settings.code_batch_max_bytes:
+            raise ValueError(f"Archive expands to more than {settings.code_batch_max_bytes} bytes")
+        files = []
+        for info in entries:
+            try:
+                data = archive.read(info)
+            except (zipfile.BadZipFile, zlib.error, RuntimeError, NotImplementedError) as exc:
+                # corrupt or CRC-failing members, encrypted members and unsupported compression methods
+                raise ValueError(f"{info.filename} cannot be extracted") from exc
+            try:
+                code = data.decode("utf-8-sig")
+            except UnicodeDecodeError as exc:
+                raise ValueError(f"{info.filename} is not UTF-8") from exc
+            files.append((clean_path(info.filename), code))
+    return files
+
+
+def _module_name(path: str) -> str:
+    parts = path.removesuffix(".py").split("/")
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def _module_index(paths: list[str]) -> dict[str, str]:
+    # archives often carry a top-level or src/ directory, so every dotted suffix of a path may name its module
+    candidates: dict[str, set[str]] = {}
+    for path in paths:
+        parts = _module_name(path).split(".")
+        for start in range(len(parts)):
+            candidates.setdefault(".".join(parts[start:]), set()).add(path)
+    return {name: next(iter(found)) for name, found in candidates.items() if len(found) == 1 and name}
+
+
+def _bindings(path: str, imports: list[dict[str, Any]], modules: dict[str, str]) -> dict[str, tuple[str, str | None]]:
+    package = _module_name(path).split(".")
+    if not path.endswith("__init__.py"):
+        package = package[:-1]
+
+    bindings: dict[str, tuple[str, str | None]] = {}
+    for item in imports:
+        module = item["module"]
+        if item["level"]:
+            base = package[: len(package) - item["level"] + 1] if item["level"] <= len(package) + 1 else []
+            module = ".".join([*base, module] if module else base)
+
+        if item["name"] is None:
+            # import a.b.c binds "a.b.c" (or its alias) to the longest prefix that is in the batch
+            parts = module.split(".")
+            for end in range(len(parts), 0, -1):
+                target = modules.get(".".join(parts[:end]))
+                if target:
+                    bindings[item["alias"] or ".".join(parts[:end])] = (target, None)
+                    break
+            continue
+
+        local = item["alias"] or item["name"]
+        submodule = modules.get(f"{module}.{item['name']}" if module else item["name"])
+        if submodule:
+            bindings[local] = (submodule, None)
+        elif module in modules:
+            bindings[local] = (modules[module], item["name"])
+    return bindings
+
+
+def project_graph(results: list[dict[str, Any]]) -> dict[str, Any]:
+    analyzed = [item for item in results if item.get("execution_graph")]
+    modules = _module_index([item["path"] for item in analyzed])
+    definitions = {item["path"]: set(item["execution_graph"]["module"]["definitions"]) for item in analyzed}
+
+    nodes = [
+        {
+            "id": item["path"],
+            "label": _module_name(item["path"]) or item["path"],
+            "type": "module" if item.get("execution_graph") else "error",
+            "functions": len(item["execution_graph"]["functions"]) - 1 if item.get("execution_graph") else 0,
+        }
+        for item in results
+    ]
+    edges: list[dict[str, Any]] = []
+    for item in analyzed:
+        summary = item["execution_graph"]["module"]
+        bindings = _bindings(item["path"], summary["imports"], modules)
+
+        for target in sorted({target for target, _ in bindings.values() if target != item["path"]}):
+            edges.append({"from": item["path"], "to": target, "kind": "import"})
+
+        called: dict[str, set[str]] = {}
+        for call in summary["calls"]:
+            parts = call.split(".")
+            for end in range(len(parts), 0, -1):
+                binding = bindings.get(".".join(parts[:end]))
+                if binding is None:
+                    continue
+                target, symbol = binding
+                # Cls.method() on an imported class counts as a call into the class's module
+                name = symbol or (parts[end] if end < len(parts) else None)
+                if target != item["path"] and name in definitions[target]:
+                    called.setdefault(target, set()).add(name)
+                break
+        for target, names in sorted(called.items()):
+            edges.append({"from": item["path"], "to": target, "kind": "call", "names": sorted(names)})
+
+    return {"nodes": nodes, "edges": edges}
@@ -0,0 +1,339 @@
+import ast
+import math
+from collections import Counter
+from typing import Any
+
+COMPLEXITY_LIMIT = 10
+FUNCTION_LOC_LIMIT = 50
+NESTING_LIMIT = 4
+HOTSPOT_COUNT = 5
+LOW_MAINTAINABILITY = 30
+
+
+def _new_frame(name: str, node: ast.AST | None = None) -> dict[str, Any]:
+    is_function = isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))
+    return {
+        "name": name,
+        "lineno": getattr(node, "lineno", 1),
+        "end_lineno": getattr(node, "end_lineno", None) or getattr(node, "lineno", 1),
+        "complexity": 1,
+        "nesting": 0,
+        "docstring": is_function and ast.get_docstring(node) is not None,
+        "operators": Counter(),
+        "operands": Counter(),
+    }
+
+
+# complexity, nesting and Halstead counts for the module and each function in one walk
+class _MetricsVisitor(ast.NodeVisitor):
+    def __init__(self) -> None:
+        self.module = _new_frame("<module>")
+        self.functions: list[dict[str, Any]] = []
+        self._frames = [self.module]
+        self._scopes: list[str] = []
+        self._depth = 0
+
+    @property
+    def _frame(self) -> dict[str, Any]:
+        return self._frames[-1]
+
+    def _branch(self, count: int = 1) -> None:
+        self._frame["complexity"] += count
+
+    def _operator(self, token: str) -> None:
+        self._frame["operators"][token] += 1
+        if self._frame is not self.module:
+            self.module["operators"][token] += 1
+
+    def _operand(self, token: str) -> None:
+        self._frame["operands"][token] += 1
+        if self._frame is not self.module:
+            self.module["operands"][token] += 1
+
+    def _nested(self, nodes: list[ast.AST]) -> None:
+        self._depth += 1
+        self._frame["nesting"] = max(self._frame["nesting"], self._depth)
+        for node in nodes:
+            self.visit(node)
+        self._depth -= 1
+
+    def _visit_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> None:
+        for decorator in node.decorator_list:
+            self.visit(decorator)
+        self.visit(node.args)
+        if node.returns:
+            self.visit(node.returns)
+
+        frame = _new_frame(".".join([*self._scopes, node.name]), node)
+        self._frames.append(frame)
+        self._scopes.append(node.name)
+        depth, self._depth = self._depth, 0
+        for statement in node.body:
+            self.visit(statement)
+        self._depth = depth
+        self._scopes.pop()
+        self._frames.pop()
+        self.functions.append(frame)
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> None:
+        for item in [*node.decorator_list, *node.bases, *node.keywords]:
+            self.visit(item)
+        self._scopes.append(node.name)
+        for statement in node.body:
+            self.visit(statement)
+        self._scopes.pop()
+
+    def visit_If(self, node: ast.If) -> None:
+        self._branch()
+        self._operator("if")
+        self.visit(node.test)
+        self._nested(node.body)
+        if len(node.orelse) == 1 and isinstance(node.orelse[0], ast.If):
+            # elif stays at the same depth
+            self.visit(node.orelse[0])
+        elif node.orelse:
+            self._nested(node.orelse)
+
+    def _visit_loop(self, node: ast.For | ast.AsyncFor | ast.While) -> None:
+        self._branch()
+        self._operator(node.__class__.__name__.lower())
+        for child in (node.test,) if isinstance(node, ast.While) else (node.target, node.iter):
+            self.visit(child)
+        self._nested(node.body)
+        if node.orelse:
+            self._nested(node.orelse)
+
+    visit_For = _visit_loop
+    visit_AsyncFor = _visit_loop
+    visit_While = _visit_loop
+
+    def _visit_with(self, node: ast.With | ast.AsyncWith) -> None:
+        self._operator("with")
+        for item in node.items:
+            self.visit(item)
+        self._nested(node.body)
+
+    visit_With = _visit_with
+    visit_AsyncWith = _visit_with
+
+    def visit_Try(self, node: ast.Try) -> None:
+        self._operator("try")
+        self._nested(node.body)
+        for handler in node.handlers:
+            self._branch()
+            self._operator("except")
+            if handler.type:
+                self.visit(handler.type)
+            self._nested(handler.body)
+        for block in (node.orelse, node.finalbody):
+            if block:
+                self._nested(block)
+
+    visit_TryStar = visit_Try
+
+    def visit_match_case(self, node: ast.AST) -> None:
+        self._branch()
+        self._operator("case")
+        self.generic_visit(node)
+
+    def visit_IfExp(self, node: ast.IfExp) -> None:
+        self._branch()
+        self._operator("ifexp")
+        self.generic_visit(node)
+
+    def visit_comprehension(self, node: ast.comprehension) -> None:
+        self._branch(1 + len(node.ifs))
+        self._operator("for")
+        self.generic_visit(node)
+
+    def visit_BoolOp(self, node: ast.BoolOp) -> None:
+        self._branch(len(node.values) - 1)
+        self._operator(node.op.__class__.__name__)
+        self.generic_visit(node)
+
+    def visit_BinOp(self, node: ast.BinOp) -> None:
+        self._operator(node.op.__class__.__name__)
+        self.generic_visit(node)
+
+    def visit_UnaryOp(self, node: ast.UnaryOp) -> None:
+        self._operator(node.op.__class__.__name__)
+        self.generic_visit(node)
+
+    def visit_Compare(self, node: ast.Compare) -> None:
+        for op in node.ops:
+            self._operator(op.__class__.__name__)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node: ast.AugAssign) -> None:
+        self._operator(f"{node.op.__class__.__name__}=")
+        self.generic_visit(node)
+
+    def visit_Assign(self, node: ast.Assign) -> None:
+        self._operator("=")
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        self._operator("()")
+        self.generic_visit(node)
+
+    def visit_Subscript(self, node: ast.Subscript) -> None:
+        self._operator("[]")
+        self.generic_visit(node)
+
+    def visit_Attribute(self, node: ast.Attribute) -> None:
+        self._operator(".")
+        self._operand(node.attr)
+        self.generic_visit(node)
+
+    def visit_Return(self, node: ast.Return) -> None:
+        self._operator("return")
+        self.generic_visit(node)
+
+    def visit_Name(self, node: ast.Name) -> None:
+        self._operand(node.id)
+
+    def visit_arg(self, node: ast.arg) -> None:
+        self._operand(node.arg)
+        self.generic_visit(node)
+
+    def visit_Constant(self, node: ast.Constant) -> None:
+        self._operand(repr(node.value)[:64])
+
+
+def _halstead(operators: Counter, operands: Counter) -> dict[str, float]:
+    vocabulary = len(operators) + len(operands)
+    length = sum(operators.values()) + sum(operands.values())
+    volume = length * math.log2(vocabulary) if vocabulary > 1 else 0.0
+    difficulty = (len(operators) / 2) * (sum(operands.values()) / len(operands)) if operands else 0.0
+    return {
+        "vocabulary": vocabulary,
+        "length": length,
+        "volume": round(volume, 2),
+        "difficulty": round(difficulty, 2),
+    }
+
+
+def _line_counts(lines: list[str]) -> dict[str, int]:
+    blank = sum(1 for line in lines if not line.strip())
+    comments = sum(1 for line in lines if line.strip().startswith("#"))
+    return {"total": len(lines), "sloc": len(lines) - blank - comments, "comments": comments, "blank": blank}
+
+
+def maintainability_index(volume: float, complexity: int, sloc: int) -> int:
+    # SEI formula rescaled to 0-100 as in Visual Studio
+    raw = 171 - 5.2 * math.log(max(volume, 1.0)) - 0.23 * complexity - 16.2 * math.log(max(sloc, 1))
+    return max(0, min(100, round(raw * 100 / 171)))
+
+
+def _tone(index: int) -> str:
+    if index >= 60:
+        return "good"
+    if index >= LOW_MAINTAINABILITY:
+        return "medium"
+    return "warning"
+
+
+def _function_summary(frame: dict[str, Any], code_lines: list[bool]) -> dict[str, Any]:
+    volume = _halstead(frame["operators"], frame["operands"])["volume"]
+    sloc = sum(code_lines[frame["lineno"] - 1 : frame["end_lineno"]])
+    return {
+        "name": frame["name"],
+        "lineno": frame["lineno"],
+        "loc": frame["end_lineno"] - frame["lineno"] + 1,
+        "sloc": sloc,
+        "complexity": frame["complexity"],
+        "nesting": frame["nesting"],
+        "halstead_volume": volume,
+        "maintainability_index": maintainability_index(volume, frame["complexity"], sloc),
+        "docstring": frame["docstring"],
+    }
+
+
+def _over_half_limit(item: dict[str, Any]) -> bool:
+    return item["complexity"] > COMPLEXITY_LIMIT // 2 or item["loc"] > FUNCTION_LOC_LIMIT // 2
+
+
+def _hotspots(functions: list[dict[str, Any]]) -> list[str]:
+    ranked = sorted(functions, key=lambda item: (item["loc"], item["complexity"]), reverse=True)
+    return [
+        f"{item['name']} (line {item['lineno']}): {item['loc']} lines, "
+        f"complexity {item['complexity']}, nesting {item['nesting']}"
+        for item in ranked[:HOTSPOT_COUNT]
+    ]
+
+
+def _technical_debt(functions: list[dict[str, Any]], index: int, lines: dict[str, int]) -> list[str]:
+    debt = []
+    for item in functions:
+        if item["complexity"] > COMPLEXITY_LIMIT:
+            debt.append(f"Split {item['name']}: cyclomatic complexity {item['complexity']} > {COMPLEXITY_LIMIT}")
+        if item["nesting"] > NESTING_LIMIT:
+            debt.append(f"Flatten {item['name']}: nesting depth {item['nesting']} > {NESTING_LIMIT}")
+        if item["loc"] > FUNCTION_LOC_LIMIT:
+            debt.append(f"Shorten {item['name']}: {item['loc']} lines > {FUNCTION_LOC_LIMIT}")
+    undocumented = sum(1 for item in functions if not item["docstring"])
+    if undocumented:
+        debt.append(f"Add docstrings to {undocumented} of {len(functions)} functions")
+    if lines["sloc"] > 20 and not lines["comments"]:
+        debt.append("No comments in a module of more than 20 source lines")
+    if index < LOW_MAINTAINABILITY:
+        debt.append(f"Maintainability index {index}/100 is low")
+    return debt
+
+
+def compute_code_metrics(code: str, tree: ast.Module | None = None) -> dict[str, Any]:
+    visitor = _MetricsVisitor()
+    visitor.visit(tree if tree is not None else ast.parse(code))
+
+    source_lines = code.splitlines()
+    code_lines = [bool(line.strip()) and not line.strip().startswith("#") for line in source_lines]
+    functions = sorted(
+        (_function_summary(frame, code_lines) for frame in visitor.functions), key=lambda item: item["lineno"]
+    )
+    lines = _line_counts(source_lines)
+    halstead = _halstead(visitor.module["operators"], visitor.module["operands"])
+    complexities = [item["complexity"] for item in functions]
+    # decision points across the module plus one entry point per function
+    total_complexity = visitor.module["complexity"] + sum(complexities) - len(complexities)
+    # the formula is calibrated per unit, so whole files get the SLOC-weighted mean of their functions
+    weight = sum(item["sloc"] for item in functions)
+    if weight:
+        index = round(sum(item["maintainability_index"] * item["sloc"] for item in functions) / weight)
+    else:
+        index = maintainability_index(halstead["volume"], total_complexity, lines["sloc"])
+    max_nesting = max([visitor.module["nesting"], *(item["nesting"] for item in functions)])
+    hotspots = _hotspots(functions)
+    average = round(sum(complexities) / len(complexities), 2) if complexities else float(total_complexity)
+
+    return {
+        "maintainability_index": index,
+        "hotspots": hotspots,
+        "technical_debt": _technical_debt(functions, index, lines),
+        "infographic": [
+            {"label": "Maintainability", "value": f"{index}/100", "tone": _tone(index)},
+            {
+                "label": "Avg complexity",
+                "value": str(average),
+                "tone": "warning" if average > COMPLEXITY_LIMIT else "good",
+            },
+            {"label": "Source lines", "value": str(lines["sloc"]), "tone": "medium"},
+            {
+                "label": "Hotspots",
+                "value": f"{len(hotspots)} detected",
+                "tone": "warning" if any(_over_half_limit(item) for item in functions) else "good",
+            },
+        ],
+        "source": "ast",
+        "loc": lines,
+        "complexity": {
+            "total": total_complexity,
+            "average": average,
+            "max": max(complexities, default=total_complexity),
+        },
+        "halstead": halstead,
+        "max_nesting": max_nesting,
+        "functions": functions,
+    }
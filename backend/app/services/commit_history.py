@@ -0,0 +1,49 @@
+from collections import Counter
+from datetime import datetime
+from typing import Any
+
+
+class CommitAggregates:
+    def __init__(self, data: dict[str, Any] | None = None) -> None:
+        data = data or {}
+        self.total: int = data.get("total", 0)
+        self.per_day: Counter = Counter(data.get("per_day", {}))
+        self.per_author: Counter = Counter(data.get("per_author", {}))
+        self.weekday_hour: list[list[int]] = data.get("weekday_hour") or [[0] * 24 for _ in range(7)]
+        self.first_date: str | None = data.get("first_date")
+        self.last_date: str | None = data.get("last_date")
+        self.cursor: dict[str, str] | None = data.get("cursor")
+
+    def fold(self, item: dict[str, Any]) -> None:
+        commit = item.get("commit", {})
+        author = commit.get("author") or {}
+        date = author.get("date")
+        if not date:
+            return
+        try:
+            moment = datetime.fromisoformat(date.replace("Z", "+00:00"))
+        except ValueError:
+            return
+
+        self.total += 1
+        self.per_day[date[:10]] += 1
+        self.per_author[author.get("name") or "unknown"] += 1
+        self.weekday_hour[moment.weekday()][moment.hour] += 1
+        if self.first_date is None or date < self.first_date:
+            self.first_date = date
+        if self.last_date is None or date > self.last_date:
+            self.last_date = date
+
+    def commit_frequency(self) -> list[dict[str, Any]]:
+        return [{"date": day, "count": count} for day, count in sorted(self.per_day.items())]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "total": self.total,
+            "per_day": dict(sorted(self.per_day.items())),
+            "per_author": dict(self.per_author.most_common()),
+            "weekday_hour": self.weekday_hour,
+            "first_date": self.first_date,
+            "last_date": self.last_date,
+            "cursor": self.cursor,
+        }
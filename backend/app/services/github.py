@@ -1,17 +1,189 @@
 from __future__ import annotations
 
-from urllib.parse import urlparse
+import asyncio
+import copy
+import hashlib
+import heapq
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from urllib.parse import parse_qs, urlparse
 
 import httpx
 
 from app.core.config import settings
+from app.services.churn import ChurnCounters, compact_commit_files
+from app.services.commit_history import CommitAggregates
+from app.services.repo_tree import TreeBuilder
+from app.services.singleflight import SingleFlight
+
+GITHUB_API_URL = "https://api.github.com"
+LAST_PAGE_RE = re.compile(r'<([^>]+)>;\s*rel="last"')
+# rough per-entry footprint in TreeBuilder columns, excluding the interned name
+ENTRY_OVERHEAD_BYTES = 120
+
+_repo_flight = SingleFlight()
+_host_slots: dict[str, threading.BoundedSemaphore] = {}
+_host_slots_lock = threading.Lock()
 
 
 class GitHubRepoError(ValueError):
     pass
 
 
-def _parse_repo_url(repo_url: str) -> tuple[str, str]:
+class GitHubHTTPCache:
+    def __init__(
+        self, path: str | None = None, max_bytes: int | None = None, max_entry_bytes: int | None = None
+    ) -> None:
+        self._lock = threading.Lock()
+        self.max_bytes = settings.github_cache_max_mb * 1024 * 1024 if max_bytes is None else max_bytes
+        self.max_entry_bytes = settings.github_cache_max_entry_kb * 1024 if max_entry_bytes is None else max_entry_bytes
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS github_http_cache ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body TEXT NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS github_commit_files (sha TEXT PRIMARY KEY, files TEXT NOT NULL)"
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(github_http_cache)")}
+        if "link" not in columns:
+            self._db.execute("ALTER TABLE github_http_cache ADD COLUMN link TEXT")
+        # size and used_at drive the LRU byte budget; older cache files get them on open
+        for table, value in (("github_http_cache", "body"), ("github_commit_files", "files")):
+            columns = {row[1] for row in self._db.execute(f"PRAGMA table_info({table})")}
+            if "size" not in columns:
+                self._db.execute(f"ALTER TABLE {table} ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+                self._db.execute(f"ALTER TABLE {table} ADD COLUMN used_at REAL NOT NULL DEFAULT 0")
+                self._db.execute(f"UPDATE {table} SET size = length({value})")
+            self._db.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_used_at ON {table} (used_at)")
+        self._db.commit()
+        self.revalidated = 0
+        self.misses = 0
+        self.commit_hits = 0
+        self.evictions = 0
+        self.skipped = 0
+
+    def _evict(self) -> None:
+        # least recently used first, across responses and commit file lists
+        total = self._db.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM github_http_cache) + "
+            "(SELECT COALESCE(SUM(size), 0) FROM github_commit_files)"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            "SELECT 'github_http_cache', 'url', url, size, used_at FROM github_http_cache UNION ALL "
+            "SELECT 'github_commit_files', 'sha', sha, size, used_at FROM github_commit_files ORDER BY used_at"
+        ).fetchall()
+        for table, column, key, size, _ in rows:
+            if total <= self.max_bytes:
+                break
+            self._db.execute(f"DELETE FROM {table} WHERE {column} = ?", (key,))
+            total -= size
+            self.evictions += 1
+
+    def get(self, url: str) -> tuple[str | None, str | None, str, str | None] | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, body, link FROM github_http_cache WHERE url = ?", (url,)
+            ).fetchone()
+            if row is not None:
+                self._db.execute("UPDATE github_http_cache SET used_at = ? WHERE url = ?", (time.time(), url))
+                self._db.commit()
+        return row
+
+    def set(
+        self, url: str, etag: str | None, last_modified: str | None, body: str, link: str | None = None
+    ) -> None:
+        # large bodies (full recursive trees) would push everything else out, so they are not cached
+        if len(body) > self.max_entry_bytes:
+            self.skipped += 1
+            return
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO github_http_cache "
+                "(url, etag, last_modified, body, link, fetched_at, size, used_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, link, now, len(body), now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def get_commit(self, sha: str) -> list[dict] | None:
+        with self._lock:
+            row = self._db.execute("SELECT files FROM github_commit_files WHERE sha = ?", (sha,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE github_commit_files SET used_at = ? WHERE sha = ?", (time.time(), sha))
+            self._db.commit()
+        self.commit_hits += 1
+        return json.loads(row[0])
+
+    def set_commit(self, sha: str, files: list[dict]) -> None:
+        value = json.dumps(files)
+        if len(value) > self.max_entry_bytes:
+            self.skipped += 1
+            return
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO github_commit_files (sha, files, size, used_at) VALUES (?, ?, ?, ?)",
+                (sha, value, len(value), time.time()),
+            )
+            self._evict()
+            self._db.commit()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            entries, entry_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM github_http_cache"
+            ).fetchone()
+            commits, commit_bytes = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM github_commit_files"
+            ).fetchone()
+            return {
+                "entries": entries,
+                "commits": commits,
+                "bytes": entry_bytes + commit_bytes,
+                "max_bytes": self.max_bytes,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "commit_hits": self.commit_hits,
+                "evictions": self.evictions,
+                "skipped": self.skipped,
+            }
+
+
+class _RateLimit:
+    def __init__(self) -> None:
+        self.remaining: int | None = None
+        self.reset_at: float | None = None
+
+    def update(self, response: httpx.Response) -> None:
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset_at = response.headers.get("X-RateLimit-Reset")
+        if remaining is not None and remaining.isdigit():
+            self.remaining = int(remaining)
+        if reset_at is not None and reset_at.isdigit():
+            self.reset_at = float(reset_at)
+
+    def wait_seconds(self) -> float:
+        if self.remaining is None or self.remaining > 0 or self.reset_at is None:
+            return 0.0
+        return max(self.reset_at - time.time(), 0.0)
+
+
+http_cache = GitHubHTTPCache(settings.github_cache_path)
+rate_limit = _RateLimit()
+
+
+def parse_repo_url(repo_url: str) -> tuple[str, str]:
     parsed = urlparse(repo_url)
     if parsed.netloc not in {"github.com", "www.github.com"}:
         raise GitHubRepoError("Only GitHub URLs are supported")
@@ -29,17 +201,125 @@ def _build_headers() -> dict[str, str]:
     return headers
 
 
-def _get_default_branch(client: httpx.Client, owner: str, repo: str) -> str:
-    response = client.get(f"https://api.github.com/repos/{owner}/{repo}")
-    response.raise_for_status()
-    data = response.json()
-    return data.get("default_branch", "main")
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlparse(url).netloc
+    with _host_slots_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(settings.github_max_concurrency)
+        return _host_slots[host]
+
+
+class _SlotWaiter:
+    # hands a slot acquired in a worker thread back to a coroutine that may have been cancelled meanwhile
+    def __init__(self, slot: threading.BoundedSemaphore) -> None:
+        self.slot = slot
+        self._lock = threading.Lock()
+        self._acquired = False
+        self._abandoned = False
+
+    def acquire(self) -> None:
+        self.slot.acquire()
+        with self._lock:
+            if self._abandoned:
+                self.slot.release()
+            self._acquired = True
+
+    def abandon(self) -> None:
+        with self._lock:
+            self._abandoned = True
+            if self._acquired:
+                self.slot.release()
+
+
+@asynccontextmanager
+async def _host_limit(url: str) -> AsyncIterator[None]:
+    # each repo job runs its own event loop, so the limit is a process-wide semaphore waited on in a thread
+    waiter = _SlotWaiter(_host_slot(url))
+    try:
+        await asyncio.to_thread(waiter.acquire)
+    except asyncio.CancelledError:
+        waiter.abandon()
+        raise
+    try:
+        yield
+    finally:
+        waiter.slot.release()
 
 
-def _get_repo_metadata(client: httpx.Client, owner: str, repo: str) -> dict:
-    response = client.get(f"https://api.github.com/repos/{owner}/{repo}")
+def _retry_delay(response: httpx.Response) -> float | None:
+    if response.status_code not in {403, 429}:
+        return None
+    retry_after = response.headers.get("Retry-After")
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        return rate_limit.wait_seconds() or 1.0
+    return None
+
+
+async def _wait_for_rate_limit(seconds: float) -> None:
+    if seconds > settings.github_max_backoff_seconds:
+        raise GitHubRepoError("GitHub API rate limit exceeded, try again later")
+    await asyncio.sleep(seconds)
+
+
+async def _get(
+    client: httpx.AsyncClient, url: str, params: dict | None = None, cache: bool = True
+) -> tuple[Any, str | None]:
+    cache_url = str(httpx.URL(url, params=params))
+    cached = http_cache.get(cache_url) if cache else None
+    headers = {}
+    if cached:
+        etag, last_modified, _, _ = cached
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    for attempt in range(settings.github_max_retries + 1):
+        pause = rate_limit.wait_seconds()
+        if pause:
+            await _wait_for_rate_limit(pause)
+
+        async with _host_limit(url):
+            response = await client.get(url, params=params, headers=headers)
+        rate_limit.update(response)
+
+        if response.status_code == 304 and cached:
+            http_cache.revalidated += 1
+            return json.loads(cached[2]), cached[3]
+
+        delay = _retry_delay(response)
+        if delay is None or attempt == settings.github_max_retries:
+            break
+        await _wait_for_rate_limit(delay)
+
     response.raise_for_status()
-    data = response.json()
+    http_cache.misses += 1
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    link = response.headers.get("Link")
+    if cache and (etag or last_modified):
+        http_cache.set(cache_url, etag, last_modified, response.text, link)
+    return response.json(), link
+
+
+async def _get_json(client: httpx.AsyncClient, url: str, params: dict | None = None, cache: bool = True) -> Any:
+    data, _ = await _get(client, url, params, cache)
+    return data
+
+
+def _last_page(link: str | None) -> int:
+    if not link:
+        return 1
+    match = LAST_PAGE_RE.search(link)
+    if not match:
+        return 1
+    page = parse_qs(urlparse(match.group(1)).query).get("page", ["1"])[0]
+    return int(page) if page.isdigit() else 1
+
+
+def _repo_metadata(data: dict) -> dict:
     return {
         "full_name": data.get("full_name"),
         "size": data.get("size"),
@@ -49,11 +329,123 @@ def _get_repo_metadata(client: httpx.Client, owner: str, repo: str) -> dict:
     }
 
 
-def _fetch_commits(client: httpx.Client, owner: str, repo: str) -> list[dict]:
-    response = client.get(f"https://api.github.com/repos/{owner}/{repo}/commits", params={"per_page": 10})
-    response.raise_for_status()
+async def _fetch_head(client: httpx.AsyncClient, owner: str, repo: str) -> dict:
+    repo_data = await _get_json(client, f"{GITHUB_API_URL}/repos/{owner}/{repo}")
+    branch = repo_data.get("default_branch", "main")
+    branch_data = await _get_json(client, f"{GITHUB_API_URL}/repos/{owner}/{repo}/branches/{branch}")
+    commit = branch_data.get("commit", {})
+    return {
+        "repo": f"{owner}/{repo}",
+        "branch": branch,
+        "head_sha": commit.get("sha"),
+        "tree_sha": commit.get("commit", {}).get("tree", {}).get("sha"),
+        "metadata": _repo_metadata(repo_data),
+    }
+
+
+async def _fetch_tree(
+    client: httpx.AsyncClient, owner: str, repo: str, tree_ref: str, recursive: bool = True
+) -> dict:
+    return await _get_json(
+        client,
+        f"{GITHUB_API_URL}/repos/{owner}/{repo}/git/trees/{tree_ref}",
+        params={"recursive": 1} if recursive else None,
+    )
+
+
+async def _walk_truncated_tree(
+    client: httpx.AsyncClient, owner: str, repo: str, tree_sha: str
+) -> AsyncIterator[dict]:
+    output: asyncio.Queue = asyncio.Queue(maxsize=settings.github_tree_queue_size)
+    work: asyncio.Queue = asyncio.Queue()
+    errors: list[BaseException] = []
+    done = object()
+    await work.put(("", tree_sha, False))
+
+    async def worker() -> None:
+        while True:
+            prefix, sha, recursive = await work.get()
+            try:
+                data = await _fetch_tree(client, owner, repo, sha, recursive)
+                if recursive and data.get("truncated"):
+                    await work.put((prefix, sha, False))
+                    continue
+                for item in data.get("tree", []):
+                    path = f"{prefix}{item.get('path')}"
+                    await output.put({**item, "path": path})
+                    if not recursive and item.get("type") == "tree":
+                        await work.put((f"{path}/", item["sha"], True))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                work.task_done()
+
+    async def coordinator() -> None:
+        await work.join()
+        await output.put(done)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(settings.github_tree_concurrency)]
+    tasks.append(asyncio.create_task(coordinator()))
+    try:
+        while True:
+            item = await output.get()
+            if item is done:
+                break
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def _iter_tree(client: httpx.AsyncClient, owner: str, repo: str, tree_ref: str) -> AsyncIterator[dict]:
+    data = await _fetch_tree(client, owner, repo, tree_ref)
+    if not data.get("truncated"):
+        for item in data.get("tree", []):
+            yield item
+        return
+
+    # only the root SHA is needed; holding the truncated payload would keep the largest response alive for the walk
+    root_sha = data.get("sha") or tree_ref
+    del data
+    async for item in _walk_truncated_tree(client, owner, repo, root_sha):
+        yield item
+
+
+async def _iter_entries(client: httpx.AsyncClient, owner: str, repo: str, tree_ref: str) -> AsyncIterator[dict]:
+    async for item in _iter_tree(client, owner, repo, tree_ref):
+        if item.get("path"):
+            yield {
+                "path": item.get("path"),
+                "type": item.get("type"),
+                "size": item.get("size", 0),
+            }
+
+
+async def _collect_entries(client: httpx.AsyncClient, owner: str, repo: str, tree_ref: str) -> dict:
+    builder = TreeBuilder()
+    budget = settings.github_tree_max_memory_mb * 1024 * 1024
+    used = 0
+    truncated = False
+    stream = _iter_entries(client, owner, repo, tree_ref)
+    try:
+        async for entry in stream:
+            used += ENTRY_OVERHEAD_BYTES + len(entry["path"].rpartition("/")[2])
+            if len(builder) >= settings.github_tree_max_entries or used > budget:
+                truncated = True
+                break
+            builder.add(entry["path"], entry["type"], entry["size"])
+    finally:
+        await stream.aclose()
+    return {"tree": builder.encode(), "entry_count": len(builder), "truncated": truncated}
+
+
+async def _fetch_commits(client: httpx.AsyncClient, owner: str, repo: str) -> list[dict]:
+    data = await _get_json(client, f"{GITHUB_API_URL}/repos/{owner}/{repo}/commits", params={"per_page": 10})
     commits = []
-    for item in response.json():
+    for item in data:
         commit = item.get("commit", {})
         author = commit.get("author", {})
         commits.append(
@@ -68,11 +460,163 @@ def _fetch_commits(client: httpx.Client, owner: str, repo: str) -> list[dict]:
     return commits
 
 
-def _fetch_contributors(client: httpx.Client, owner: str, repo: str) -> list[dict]:
-    response = client.get(f"https://api.github.com/repos/{owner}/{repo}/contributors", params={"per_page": 20})
-    response.raise_for_status()
+def _head_cursor(items: list[dict]) -> dict[str, str] | None:
+    # the branch head, i.e. the first commit of the newest-first listing
+    if not items or not items[0].get("sha"):
+        return None
+    date = ((items[0].get("commit") or {}).get("author") or {}).get("date")
+    return {"sha": items[0]["sha"], "date": date}
+
+
+def _fold_commit(aggregates: CommitAggregates, new_commits: list[tuple[str, str]], item: dict) -> None:
+    aggregates.fold(item)
+    date = ((item.get("commit") or {}).get("author") or {}).get("date")
+    if not date or not item.get("sha"):
+        return
+    # min-heap of the newest commits churn will look at, so memory stays flat however long the history is
+    entry = (date, item["sha"])
+    if len(new_commits) < settings.github_churn_max_commits:
+        heapq.heappush(new_commits, entry)
+    elif new_commits and entry > new_commits[0]:
+        heapq.heapreplace(new_commits, entry)
+
+
+async def _fetch_new_history(
+    client: httpx.AsyncClient, owner: str, repo: str, branch: str, previous: dict
+) -> tuple[dict, list[tuple[str, str]]] | None:
+    # since= compares committer dates inclusively, so it would return commits that were already folded;
+    # page newest-first instead and stop at the stored head
+    aggregates = CommitAggregates(previous)
+    cursor_sha = previous["cursor"]["sha"]
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/commits"
+    new_commits: list[tuple[str, str]] = []
+    head = None
+    for page in range(1, settings.github_history_max_pages + 1):
+        items, link = await _get(client, url, {"sha": branch, "per_page": 100, "page": page})
+        head = head or _head_cursor(items)
+        for item in items:
+            if item.get("sha") == cursor_sha:
+                aggregates.cursor = head or previous["cursor"]
+                history = aggregates.to_dict()
+                history["since"] = previous.get("since")
+                history["truncated"] = previous.get("truncated", False)
+                history["incremental"] = True
+                return history, new_commits
+            _fold_commit(aggregates, new_commits, item)
+        if page >= _last_page(link):
+            break
+    return None
+
+
+async def _fetch_history(
+    client: httpx.AsyncClient, owner: str, repo: str, branch: str, previous: dict | None = None
+) -> tuple[dict, list[tuple[str, str]]]:
+    if previous and previous.get("cursor"):
+        result = await _fetch_new_history(client, owner, repo, branch, previous)
+        if result is not None:
+            return result
+        # the stored head is no longer on the branch (force push); rebuild from scratch
+
+    aggregates = CommitAggregates()
+    url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/commits"
+    params: dict[str, Any] = {"sha": branch, "per_page": 100}
+    if settings.github_history_days > 0:
+        since = datetime.now(timezone.utc) - timedelta(days=settings.github_history_days)
+        params["since"] = since.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    new_commits: list[tuple[str, str]] = []
+
+    def fold_page(items: list[dict]) -> None:
+        for item in items:
+            _fold_commit(aggregates, new_commits, item)
+
+    first, link = await _get(client, url, {**params, "page": 1})
+    aggregates.cursor = _head_cursor(first)
+    fold_page(first)
+    available = _last_page(link)
+    last_page = min(available, settings.github_history_max_pages)
+    pages = iter(range(2, last_page + 1))
+
+    async def worker() -> None:
+        for page in pages:
+            data, _ = await _get(client, url, {**params, "page": page})
+            fold_page(data)
+
+    await asyncio.gather(*(worker() for _ in range(settings.github_history_concurrency)))
+
+    history = aggregates.to_dict()
+    history["since"] = params.get("since")
+    history["truncated"] = available > last_page
+    history["incremental"] = False
+    return history, new_commits
+
+
+async def _fetch_commit_files(client: httpx.AsyncClient, owner: str, repo: str, sha: str) -> list[dict] | None:
+    cached = http_cache.get_commit(sha)
+    if cached is not None:
+        return cached
+    if rate_limit.remaining is not None and rate_limit.remaining <= settings.github_churn_rate_reserve:
+        return None
+    data = await _get_json(client, f"{GITHUB_API_URL}/repos/{owner}/{repo}/commits/{sha}", cache=False)
+    files = compact_commit_files(data.get("files") or [])
+    http_cache.set_commit(sha, files)
+    return files
+
+
+async def _fetch_churn(
+    client: httpx.AsyncClient,
+    owner: str,
+    repo: str,
+    commits: list[tuple[str, str]],
+    previous: dict | None = None,
+    total: int | None = None,
+) -> dict:
+    churn = ChurnCounters(previous)
+    selected = sorted(commits, reverse=True)[: settings.github_churn_max_commits]
+    pending = iter(selected)
+    results: dict[str, list[dict] | None] = {}
+
+    async def worker() -> None:
+        for _, sha in pending:
+            try:
+                results[sha] = await _fetch_commit_files(client, owner, repo, sha)
+            except (GitHubRepoError, httpx.HTTPError):
+                results[sha] = None
+
+    await asyncio.gather(*(worker() for _ in range(settings.github_churn_concurrency)))
+
+    skipped = 0
+    for _, sha in reversed(selected):
+        files = results.get(sha)
+        if files is None:
+            skipped += 1
+            continue
+        churn.fold(files)
+
+    data = churn.to_dict()
+    data["skipped"] = skipped + (len(commits) if total is None else total) - len(selected)
+    return data
+
+
+async def _fetch_activity(
+    client: httpx.AsyncClient, owner: str, repo: str, branch: str, previous: dict | None = None
+) -> tuple[dict, dict]:
+    previous = previous or {}
+    history, new_commits = await _fetch_history(client, owner, repo, branch, previous.get("history"))
+    # a rebuilt history re-reports every commit, so churn starts over with it
+    previous_churn = previous.get("churn") if history["incremental"] else None
+    # new_commits only keeps the newest ones; the history total tells how many were folded
+    folded = history["total"] - ((previous.get("history") or {}).get("total", 0) if history["incremental"] else 0)
+    churn = await _fetch_churn(client, owner, repo, new_commits, previous_churn, folded)
+    return history, churn
+
+
+async def _fetch_contributors(client: httpx.AsyncClient, owner: str, repo: str) -> list[dict]:
+    data = await _get_json(
+        client, f"{GITHUB_API_URL}/repos/{owner}/{repo}/contributors", params={"per_page": 20}
+    )
     contributors = []
-    for item in response.json():
+    for item in data:
         contributors.append(
             {
                 "login": item.get("login"),
@@ -82,35 +626,72 @@ def _fetch_contributors(client: httpx.Client, owner: str, repo: str) -> list[dic
     return contributors
 
 
-def fetch_repo_tree(repo_url: str) -> dict:
-    owner, repo = _parse_repo_url(repo_url)
-    headers = _build_headers()
-
-    with httpx.Client(headers=headers, timeout=settings.github_timeout_seconds) as client:
-        metadata = _get_repo_metadata(client, owner, repo)
-        branch = _get_default_branch(client, owner, repo)
-        tree_url = f"https://api.github.com/repos/{owner}/{repo}/git/trees/{branch}?recursive=1"
-        response = client.get(tree_url)
-        response.raise_for_status()
-        tree_data = response.json()
-        commits = _fetch_commits(client, owner, repo)
-        contributors = _fetch_contributors(client, owner, repo)
-
-    entries = [
-        {
-            "path": item.get("path"),
-            "type": item.get("type"),
-            "size": item.get("size", 0),
-        }
-        for item in tree_data.get("tree", [])
-        if item.get("path")
-    ]
+def _build_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.github_max_concurrency,
+        max_keepalive_connections=settings.github_max_concurrency,
+    )
+    return httpx.AsyncClient(headers=_build_headers(), timeout=settings.github_timeout_seconds, limits=limits)
+
+
+async def _fetch_repo_head(owner: str, repo: str) -> dict:
+    async with _build_client() as client:
+        return await _fetch_head(client, owner, repo)
+
+
+async def _fetch_repo_tree(
+    owner: str, repo: str, head: dict | None = None, previous: dict | None = None
+) -> dict:
+    async with _build_client() as client:
+        if head is None:
+            head = await _fetch_head(client, owner, repo)
+        tree, commits, contributors, (history, churn) = await asyncio.gather(
+            _collect_entries(client, owner, repo, head["tree_sha"] or head["branch"]),
+            _fetch_commits(client, owner, repo),
+            _fetch_contributors(client, owner, repo),
+            _fetch_activity(client, owner, repo, head["branch"], previous),
+        )
 
     return {
-        "repo": f"{owner}/{repo}",
-        "branch": branch,
-        "entries": entries,
+        **head,
+        "tree": tree["tree"],
+        "entry_count": tree["entry_count"],
+        "truncated": tree["truncated"],
         "commits": commits,
         "contributors": contributors,
-        "metadata": metadata,
+        "history": history,
+        "churn": churn,
     }
+
+
+def fetch_repo_head(repo_url: str) -> dict:
+    owner, repo = parse_repo_url(repo_url)
+    head = _repo_flight.do(("head", owner.lower(), repo.lower()), lambda: asyncio.run(_fetch_repo_head(owner, repo)))
+    return copy.deepcopy(head)
+
+
+def _state_digest(previous: dict | None) -> str | None:
+    # history and churn are folded onto the caller's previous analysis, so only identical states may share a fetch
+    if not previous:
+        return None
+    state = {"history": previous.get("history"), "churn": previous.get("churn")}
+    return hashlib.sha256(json.dumps(state, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _tree_key(owner: str, repo: str, head: dict | None, previous: dict | None) -> tuple:
+    return (
+        "tree",
+        owner.lower(),
+        repo.lower(),
+        head.get("head_sha") if head else None,
+        head.get("tree_sha") if head else None,
+        _state_digest(previous),
+    )
+
+
+def fetch_repo_tree(repo_url: str, head: dict | None = None, previous: dict | None = None) -> dict:
+    owner, repo = parse_repo_url(repo_url)
+    key = _tree_key(owner, repo, head, previous)
+    result = _repo_flight.do(key, lambda: asyncio.run(_fetch_repo_tree(owner, repo, head, previous)))
+    # every waiter gets its own copy; run_repo_job adds stats, churn and insights in place
+    return copy.deepcopy(result)
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import threading
+from collections.abc import AsyncIterator, Callable
+from typing import Any, TypeVar
+
+import httpx
+
+from app.core.config import settings
+from app.services.llm_cache import cache_key, llm_cache
+from app.services.singleflight import SingleFlight
+
+_client: httpx.Client | None = None
+_async_client: httpx.AsyncClient | None = None
+_client_lock = threading.Lock()
+_llm_flight = SingleFlight()
+
+T = TypeVar("T")
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.llm_pool_max_connections,
+        max_keepalive_connections=settings.llm_pool_max_keepalive_connections,
+        keepalive_expiry=settings.llm_pool_keepalive_expiry_seconds,
+    )
+
+
+def _build_client() -> httpx.Client:
+    return httpx.Client(timeout=settings.llm_timeout_seconds, limits=_limits())
+
+
+def open_llm_client() -> httpx.Client:
+    global _client
+    with _client_lock:
+        if _client is None or _client.is_closed:
+            _client = _build_client()
+        return _client
+
+
+def get_llm_client() -> httpx.Client:
+    client = _client
+    if client is None or client.is_closed:
+        return open_llm_client()
+    return client
+
+
+def close_llm_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+
+
+def open_async_llm_client() -> httpx.AsyncClient:
+    global _async_client
+    with _client_lock:
+        if _async_client is None or _async_client.is_closed:
+            _async_client = httpx.AsyncClient(timeout=settings.llm_timeout_seconds, limits=_limits())
+        return _async_client
+
+
+def get_async_llm_client() -> httpx.AsyncClient:
+    client = _async_client
+    if client is None or client.is_closed:
+        return open_async_llm_client()
+    return client
+
+
+async def close_async_llm_client() -> None:
+    global _async_client
+    with _client_lock:
+        client, _async_client = _async_client, None
+    if client is not None:
+        await client.aclose()
+
+
+async def _cache_call(fn: Callable[..., T], *args: Any) -> T:
+    # with LLM_CACHE_PATH set the cache reads and writes SQLite; keep that off the event loop
+    if llm_cache.persistent:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
+
+
+# callers that cannot use a reply drop it, so a malformed completion is not replayed for the cache TTL
+def discard_llm_response(payload: dict[str, Any]) -> None:
+    llm_cache.discard(cache_key(payload))
+
+
+async def discard_llm_response_async(payload: dict[str, Any]) -> None:
+    await _cache_call(llm_cache.discard, cache_key(payload))
+
+
+def _send(payload: dict[str, Any], headers: dict[str, str], key: str) -> Any:
+    client = get_llm_client()
+    response = client.post(settings.llm_api_url, json=payload, headers=headers)
+    response.raise_for_status()
+    data = response.json()
+    if settings.llm_cache_enabled and isinstance(data, dict):
+        llm_cache.set(key, data)
+    return data
+
+
+def post_llm(payload: dict[str, Any], headers: dict[str, str]) -> Any:
+    key = cache_key(payload)
+    if settings.llm_cache_enabled:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    return _llm_flight.do(key, lambda: _send(payload, headers, key))
+
+
+async def _send_async(payload: dict[str, Any], headers: dict[str, str], key: str) -> Any:
+    response = await get_async_llm_client().post(settings.llm_api_url, json=payload, headers=headers)
+    response.raise_for_status()
+    data = response.json()
+    if settings.llm_cache_enabled and isinstance(data, dict):
+        await _cache_call(llm_cache.set, key, data)
+    return data
+
+
+async def post_llm_async(payload: dict[str, Any], headers: dict[str, str]) -> Any:
+    key = cache_key(payload)
+    if settings.llm_cache_enabled:
+        cached = await _cache_call(llm_cache.get, key)
+        if cached is not None:
+            return cached
+
+    return await _llm_flight.do_async(key, lambda: _send_async(payload, headers, key))
+
+
+def _cached_content(data: dict[str, Any]) -> str | None:
+    choices = data.get("choices")
+    if isinstance(choices, list) and choices:
+        return choices[0].get("message", {}).get("content")
+    return None
+
+
+def _stream_delta(line: str) -> str | None:
+    if not line.startswith("data:"):
+        return None
+    chunk = line[5:].strip()
+    if chunk == "[DONE]":
+        return None
+    try:
+        data = json.loads(chunk)
+    except json.JSONDecodeError:
+        return None
+    choices = data.get("choices") or []
+    return choices[0].get("delta", {}).get("content") if choices else None
+
+
+async def stream_llm(payload: dict[str, Any], headers: dict[str, str]) -> AsyncIterator[str]:
+    key = cache_key(payload)
+    if settings.llm_cache_enabled:
+        cached = await _cache_call(llm_cache.get, key)
+        content = _cached_content(cached) if cached is not None else None
+        if content:
+            yield content
+            return
+
+    parts: list[str] = []
+    client = get_async_llm_client()
+    async with client.stream(
+        "POST", settings.llm_api_url, json={**payload, "stream": True}, headers=headers
+    ) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if line.strip() == "data: [DONE]":
+                break
+            delta = _stream_delta(line)
+            if delta:
+                parts.append(delta)
+                yield delta
+
+    if settings.llm_cache_enabled and parts:
+        await _cache_call(
+            llm_cache.set, key, {"choices": [{"message": {"role": "assistant", "content": "".join(parts)}}]}
+        )
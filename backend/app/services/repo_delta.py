@@ -0,0 +1,41 @@
+from typing import Any
+
+from app.services.repo_tree import graph_entries
+
+
+def diff_entries(old: list[dict[str, Any]], new: list[dict[str, Any]]) -> dict[str, Any]:
+    old_by_path = {entry["path"]: entry for entry in old}
+    new_paths = set()
+    added = []
+    modified = []
+    for entry in new:
+        path = entry["path"]
+        new_paths.add(path)
+        previous = old_by_path.get(path)
+        if previous is None:
+            added.append(entry)
+        elif previous != entry:
+            modified.append(entry)
+    removed = [path for path in old_by_path if path not in new_paths]
+    return {"added": added, "modified": modified, "removed": removed}
+
+
+def apply_delta(entries: list[dict[str, Any]], delta: dict[str, Any]) -> list[dict[str, Any]]:
+    by_path = {entry["path"]: entry for entry in entries}
+    for path in delta.get("removed", []):
+        by_path.pop(path, None)
+    for entry in delta.get("modified", []):
+        by_path[entry["path"]] = entry
+    for entry in delta.get("added", []):
+        by_path[entry["path"]] = entry
+    return [by_path[path] for path in sorted(by_path)]
+
+
+def encode_delta(
+    dependency_graph: dict[str, Any], base_entries: list[dict[str, Any]], base_id, depth: int
+) -> dict[str, Any]:
+    entries = graph_entries(dependency_graph)
+    encoded = {key: value for key, value in dependency_graph.items() if key not in {"entries", "tree"}}
+    encoded["delta"] = {"base_id": str(base_id), **diff_entries(base_entries, entries)}
+    encoded["delta_depth"] = depth
+    return encoded
@@ -0,0 +1,58 @@
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.crud.repository import load_dependency_graph
+from app.models.repository import Repository
+from app.services.repo_tree import TreeIndex, encode_entries
+
+_indexes: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+_stats = {"bytes": 0, "hits": 0, "misses": 0, "evictions": 0, "skipped": 0}
+
+
+def build_tree_index(db: Session, repository: Repository) -> TreeIndex:
+    graph = repository.dependency_graph
+    if "tree" in graph and "delta" not in graph:
+        return TreeIndex(graph["tree"])
+    return TreeIndex(encode_entries(load_dependency_graph(db, repository)["entries"]))
+
+
+def get_tree_index(db: Session, repository: Repository) -> TreeIndex:
+    with _lock:
+        index = _indexes.get(repository.id)
+        if index is not None:
+            _indexes.move_to_end(repository.id)
+            _stats["hits"] += 1
+            return index
+        _stats["misses"] += 1
+
+    index = build_tree_index(db, repository)
+    max_bytes = settings.repo_tree_index_cache_mb * 1024 * 1024
+    with _lock:
+        if index.nbytes > max_bytes:
+            # a single huge tree would flush every other index, serve it uncached
+            _stats["skipped"] += 1
+            return index
+        previous = _indexes.pop(repository.id, None)
+        if previous is not None:
+            _stats["bytes"] -= previous.nbytes
+        _indexes[repository.id] = index
+        _stats["bytes"] += index.nbytes
+        while _stats["bytes"] > max_bytes:
+            _, evicted = _indexes.popitem(last=False)
+            _stats["bytes"] -= evicted.nbytes
+            _stats["evictions"] += 1
+    return index
+
+
+def tree_index_stats() -> dict[str, Any]:
+    with _lock:
+        return {
+            **_stats,
+            "entries": len(_indexes),
+            "max_bytes": settings.repo_tree_index_cache_mb * 1024 * 1024,
+        }
@@ -0,0 +1,167 @@
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import settings
+from app.crud.repo_job import (
+    claim_repo_job,
+    get_repo_job,
+    heartbeat_repo_jobs,
+    list_queued_repo_jobs,
+    requeue_stale_repo_jobs,
+    update_repo_job,
+)
+from app.crud.repository import (
+    create_repository,
+    delta_chain_complete,
+    get_latest_repository,
+    load_dependency_graph,
+)
+from app.db.session import SessionLocal
+from app.services.ai_service import build_repo_intelligence
+from app.services.churn import join_churn
+from app.services.github import GitHubRepoError, fetch_repo_head, fetch_repo_tree
+from app.services.repo_delta import encode_delta
+from app.services.repo_index import get_tree_index
+from app.services.repo_stats import compute_tree_stats
+
+logger = logging.getLogger(__name__)
+
+# identifies this process's lease on the jobs it runs; several app workers share the jobs table
+WORKER_ID = f"{socket.gethostname()[:32]}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_heartbeat: threading.Thread | None = None
+_heartbeat_stop = threading.Event()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.repo_job_workers, thread_name_prefix="repo-job")
+        return _executor
+
+
+def _reclaim_stale_jobs(include_queued: bool = False) -> None:
+    # only jobs whose owner stopped renewing its lease are taken back; claiming them is still atomic
+    db = SessionLocal()
+    try:
+        pending = requeue_stale_repo_jobs(db, settings.repo_job_lease_seconds)
+        if include_queued:
+            pending = [job.id for job in list_queued_repo_jobs(db)]
+    finally:
+        db.close()
+    for job_id in pending:
+        submit_repo_job(job_id)
+
+
+def _heartbeat_loop() -> None:
+    while not _heartbeat_stop.wait(settings.repo_job_lease_seconds / 4):
+        db = SessionLocal()
+        try:
+            heartbeat_repo_jobs(db, WORKER_ID)
+        except Exception:
+            logger.exception("Repository job heartbeat failed")
+        finally:
+            db.close()
+        try:
+            _reclaim_stale_jobs()
+        except Exception:
+            logger.exception("Reclaiming stale repository jobs failed")
+
+
+def start_repo_workers() -> None:
+    global _heartbeat
+    _get_executor()
+    _reclaim_stale_jobs(include_queued=True)
+    _heartbeat_stop.clear()
+    _heartbeat = threading.Thread(target=_heartbeat_loop, name="repo-job-heartbeat", daemon=True)
+    _heartbeat.start()
+
+
+def stop_repo_workers() -> None:
+    global _executor, _heartbeat
+    _heartbeat_stop.set()
+    _heartbeat = None
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def submit_repo_job(job_id) -> None:
+    _get_executor().submit(run_repo_job, job_id)
+
+
+def run_repo_job(job_id) -> None:
+    db = SessionLocal()
+    try:
+        if not claim_repo_job(db, job_id, WORKER_ID):
+            return
+
+        job = get_repo_job(db, job_id)
+        update_repo_job(db, job, stage="fetching", progress=10, error=None)
+        previous = get_latest_repository(db, job.project_id, job.repo_url)
+        if previous is not None and not delta_chain_complete(db, previous):
+            # the stored tree cannot be rebuilt, so analyse from scratch and store a full graph
+            logger.warning("Repository %s has a broken delta chain, refetching", previous.id)
+            previous = None
+        try:
+            head = fetch_repo_head(job.repo_url)
+            if previous is not None and previous.tree_sha and previous.tree_sha == head["tree_sha"]:
+                update_repo_job(db, job, status="completed", stage=None, progress=100, repository_id=previous.id)
+                return
+            dependency_graph = fetch_repo_tree(
+                job.repo_url, head, previous.dependency_graph if previous is not None else None
+            )
+        except GitHubRepoError as exc:
+            update_repo_job(db, job, status="failed", stage=None, error=str(exc))
+            return
+        except Exception:
+            logger.exception("Repository fetch failed for job %s", job_id)
+            update_repo_job(db, job, status="failed", stage=None, error="Failed to fetch repository")
+            return
+
+        update_repo_job(db, job, stage="analyzing", progress=60)
+        dependency_graph["stats"] = compute_tree_stats(dependency_graph)
+        if dependency_graph.get("churn"):
+            dependency_graph["churn"], dependency_graph["hotspots"] = join_churn(
+                dependency_graph["churn"], dependency_graph
+            )
+        dependency_graph["ai_insights"] = build_repo_intelligence(dependency_graph)
+
+        update_repo_job(db, job, stage="storing", progress=90)
+        stored_graph = dependency_graph
+        base_repository_id = None
+        if previous is not None and previous.tree_sha:
+            depth = previous.dependency_graph.get("delta_depth", 0) + 1
+            if depth <= settings.repo_delta_max_chain:
+                base_entries = load_dependency_graph(db, previous)["entries"]
+                stored_graph = encode_delta(dependency_graph, base_entries, previous.id, depth)
+                base_repository_id = previous.id
+
+        repository = create_repository(
+            db,
+            job.project_id,
+            job.repo_url,
+            stored_graph,
+            dependency_graph.get("commits", []),
+            head_sha=dependency_graph.get("head_sha"),
+            tree_sha=dependency_graph.get("tree_sha"),
+            base_repository_id=base_repository_id,
+        )
+        get_tree_index(db, repository)
+        update_repo_job(db, job, status="completed", stage=None, progress=100, repository_id=repository.id)
+    except Exception:
+        logger.exception("Repository analysis job %s failed", job_id)
+        db.rollback()
+        job = get_repo_job(db, job_id)
+        if job is not None:
+            update_repo_job(db, job, status="failed", stage=None, error="Repository analysis failed")
+    finally:
+        db.close()
@@ -0,0 +1,150 @@
+import heapq
+from collections import Counter
+from typing import Any
+
+from app.services.repo_tree import encode_entries, node_paths
+
+LANGUAGES = {
+    "py": "Python",
+    "pyi": "Python",
+    "ipynb": "Jupyter Notebook",
+    "js": "JavaScript",
+    "jsx": "JavaScript",
+    "mjs": "JavaScript",
+    "cjs": "JavaScript",
+    "ts": "TypeScript",
+    "tsx": "TypeScript",
+    "java": "Java",
+    "kt": "Kotlin",
+    "scala": "Scala",
+    "go": "Go",
+    "rs": "Rust",
+    "c": "C",
+    "h": "C",
+    "cc": "C++",
+    "cpp": "C++",
+    "hpp": "C++",
+    "cs": "C#",
+    "rb": "Ruby",
+    "php": "PHP",
+    "swift": "Swift",
+    "m": "Objective-C",
+    "sh": "Shell",
+    "bash": "Shell",
+    "sql": "SQL",
+    "html": "HTML",
+    "css": "CSS",
+    "scss": "CSS",
+    "vue": "Vue",
+    "svelte": "Svelte",
+    "md": "Markdown",
+    "rst": "reStructuredText",
+    "json": "JSON",
+    "yml": "YAML",
+    "yaml": "YAML",
+    "toml": "TOML",
+    "xml": "XML",
+}
+
+# upper bounds (exclusive) of the size histogram buckets, in bytes
+SIZE_BUCKETS = [1024, 10 * 1024, 100 * 1024, 1024 * 1024, 10 * 1024 * 1024]
+SIZE_LABELS = ["<1KB", "1-10KB", "10-100KB", "100KB-1MB", "1-10MB", ">=10MB"]
+
+
+def _extension(name: str) -> str:
+    if "." not in name.lstrip("."):
+        return ""
+    return name.rsplit(".", 1)[1].lower()
+
+
+def _bucket(size: int) -> int:
+    for index, bound in enumerate(SIZE_BUCKETS):
+        if size < bound:
+            return index
+    return len(SIZE_BUCKETS)
+
+
+def compute_tree_stats(dependency_graph: dict[str, Any], top: int = 10) -> dict[str, Any]:
+    tree = dependency_graph.get("tree") or encode_entries(dependency_graph.get("entries", []))
+    names = tree["names"]
+    name_ids = tree["name_ids"]
+    parents = tree["parents"]
+    types = tree["types"]
+    sizes = tree["sizes"]
+
+    count = len(parents)
+    depths = [0] * count
+    top_level = [0] * count
+    ext_files: Counter = Counter()
+    ext_bytes: Counter = Counter()
+    lang_files: Counter = Counter()
+    lang_bytes: Counter = Counter()
+    top_bytes: Counter = Counter()
+    depth_counts: Counter = Counter()
+    histogram = [0] * len(SIZE_LABELS)
+    largest: list[tuple[int, int]] = []
+    files = 0
+    directories = 0
+    total_bytes = 0
+
+    for index in range(count):
+        parent = parents[index]
+        if parent < 0:
+            depths[index] = 1
+            top_level[index] = index
+        else:
+            depths[index] = depths[parent] + 1
+            top_level[index] = top_level[parent]
+
+        if types[index] == "t":
+            directories += 1
+            continue
+
+        size = sizes[index] or 0
+        files += 1
+        total_bytes += size
+        extension = _extension(names[name_ids[index]])
+        language = LANGUAGES.get(extension, "Other")
+        ext_files[extension] += 1
+        ext_bytes[extension] += size
+        lang_files[language] += 1
+        lang_bytes[language] += size
+        depth_counts[depths[index]] += 1
+        histogram[_bucket(size)] += 1
+        top_bytes[top_level[index] if parent >= 0 else -1] += size
+        if len(largest) < top:
+            heapq.heappush(largest, (size, index))
+        elif size > largest[0][0]:
+            heapq.heapreplace(largest, (size, index))
+
+    paths = node_paths(tree) if largest else []
+
+    def share(value: int) -> float:
+        return round(value / total_bytes, 4) if total_bytes else 0.0
+
+    return {
+        "files": files,
+        "directories": directories,
+        "total_bytes": total_bytes,
+        "extensions": [
+            {"extension": ext or "(none)", "files": ext_files[ext], "bytes": ext_bytes[ext]}
+            for ext, _ in ext_files.most_common(top)
+        ],
+        "languages": [
+            {"language": language, "files": lang_files[language], "bytes": bytes_, "share": share(bytes_)}
+            for language, bytes_ in lang_bytes.most_common()
+        ],
+        "size_histogram": [{"bucket": label, "files": histogram[i]} for i, label in enumerate(SIZE_LABELS)],
+        "largest_files": [
+            {"path": paths[index], "size": size} for size, index in sorted(largest, reverse=True)
+        ],
+        "depth_distribution": [{"depth": depth, "files": depth_counts[depth]} for depth in sorted(depth_counts)],
+        "top_level_share": [
+            {
+                "path": names[name_ids[index]] if index >= 0 else "(root)",
+                "bytes": bytes_,
+                "share": share(bytes_),
+            }
+            for index, bytes_ in top_bytes.most_common(top)
+        ],
+    }
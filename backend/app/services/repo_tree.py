@@ -0,0 +1,196 @@
+import fnmatch
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+TREE_FORMAT = "columnar-v1"
+
+TYPE_CODES = {"blob": "b", "tree": "t", "commit": "c"}
+CODE_TYPES = {code: name for name, code in TYPE_CODES.items()}
+TREE_KEYS = ("entries", "tree", "delta")
+
+# rough per-node cost of the index's lists, ints and string headers
+NODE_OVERHEAD_BYTES = 200
+
+
+class TreeBuilder:
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.name_ids: list[int] = []
+        self.parents: list[int] = []
+        self.types: list[str] = []
+        self.sizes: list[int] = []
+        self._name_index: dict[str, int] = {}
+        self._dirs: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    def _intern(self, name: str) -> int:
+        name_id = self._name_index.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self._name_index[name] = name_id
+        return name_id
+
+    def _append(self, parent: int, name: str, type_code: str, size: int) -> int:
+        self.name_ids.append(self._intern(name))
+        self.parents.append(parent)
+        self.types.append(type_code)
+        self.sizes.append(size)
+        return len(self.parents) - 1
+
+    def _directory(self, path: str) -> int:
+        if not path:
+            return -1
+        index = self._dirs.get(path)
+        if index is None:
+            parent_path, _, name = path.rpartition("/")
+            index = self._append(self._directory(parent_path), name, "t", 0)
+            self._dirs[path] = index
+        return index
+
+    def add(self, path: str, entry_type: str | None, size: int | None = 0) -> None:
+        type_code = TYPE_CODES.get(entry_type or "blob", "b")
+        if type_code == "t" and path in self._dirs:
+            self.sizes[self._dirs[path]] = size or 0
+            return
+        parent_path, _, name = path.rpartition("/")
+        index = self._append(self._directory(parent_path), name, type_code, size or 0)
+        if type_code == "t":
+            self._dirs[path] = index
+
+    def extend(self, entries: Iterable[dict[str, Any]]) -> "TreeBuilder":
+        for entry in entries:
+            self.add(entry["path"], entry.get("type"), entry.get("size"))
+        return self
+
+    def encode(self) -> dict[str, Any]:
+        return {
+            "format": TREE_FORMAT,
+            "names": self.names,
+            "name_ids": self.name_ids,
+            "parents": self.parents,
+            "types": "".join(self.types),
+            "sizes": self.sizes,
+        }
+
+
+def encode_entries(entries: Iterable[dict[str, Any]]) -> dict[str, Any]:
+    return TreeBuilder().extend(entries).encode()
+
+
+def node_paths(tree: dict[str, Any]) -> list[str]:
+    names = tree["names"]
+    paths: list[str] = []
+    for name_id, parent in zip(tree["name_ids"], tree["parents"]):
+        name = names[name_id]
+        paths.append(f"{paths[parent]}/{name}" if parent >= 0 else name)
+    return paths
+
+
+def iter_entries(tree: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    for path, type_code, size in zip(node_paths(tree), tree["types"], tree["sizes"]):
+        yield {"path": path, "type": CODE_TYPES.get(type_code, "blob"), "size": size}
+
+
+def decode_entries(tree: dict[str, Any]) -> list[dict[str, Any]]:
+    return list(iter_entries(tree))
+
+
+def graph_summary(dependency_graph: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in dependency_graph.items() if key not in TREE_KEYS}
+
+
+def graph_entries(dependency_graph: dict[str, Any]) -> list[dict[str, Any]]:
+    tree = dependency_graph.get("tree")
+    if tree:
+        return decode_entries(tree)
+    return dependency_graph.get("entries", [])
+
+
+class TreeIndex:
+    def __init__(self, tree: dict[str, Any]) -> None:
+        self.paths = node_paths(tree)
+        self.names = [tree["names"][name_id] for name_id in tree["name_ids"]]
+        self.types = tree["types"]
+        self.sizes = tree["sizes"]
+        count = len(self.paths)
+        self.children: list[list[int]] = [[] for _ in range(count)]
+        self.roots: list[int] = []
+        self.dirs: dict[str, int] = {}
+        self.total_sizes = [0] * count
+        self.file_counts = [0] * count
+
+        parents = tree["parents"]
+        for index, parent in enumerate(parents):
+            (self.children[parent] if parent >= 0 else self.roots).append(index)
+            if self.types[index] == "t":
+                self.dirs[self.paths[index]] = index
+            else:
+                self.total_sizes[index] = self.sizes[index]
+                self.file_counts[index] = 1
+
+        for index in range(count - 1, -1, -1):
+            parent = parents[index]
+            if parent >= 0:
+                self.total_sizes[parent] += self.total_sizes[index]
+                self.file_counts[parent] += self.file_counts[index]
+
+        self.nbytes = sum(map(len, self.paths)) + sum(map(len, self.names)) + count * NODE_OVERHEAD_BYTES
+
+    def node(self, index: int) -> dict[str, Any]:
+        return {
+            "path": self.paths[index],
+            "name": self.names[index],
+            "type": CODE_TYPES.get(self.types[index], "blob"),
+            "size": self.sizes[index],
+            "total_size": self.total_sizes[index],
+            "file_count": self.file_counts[index],
+        }
+
+    def summary(self, path: str) -> dict[str, int]:
+        if not path:
+            return {
+                "total_size": sum(self.total_sizes[index] for index in self.roots),
+                "file_count": sum(self.file_counts[index] for index in self.roots),
+            }
+        index = self.dirs[path]
+        return {"total_size": self.total_sizes[index], "file_count": self.file_counts[index]}
+
+    def query(
+        self,
+        path: str = "",
+        depth: int = 1,
+        pattern: str | None = None,
+        extensions: set[str] | None = None,
+        limit: int = 500,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        path = path.strip("/")
+        if path and path not in self.dirs:
+            raise KeyError(path)
+
+        filtered = bool(pattern or extensions)
+        start = self.children[self.dirs[path]] if path else self.roots
+        stack = [(index, 1) for index in reversed(start)]
+        nodes: list[dict[str, Any]] = []
+        while stack:
+            index, level = stack.pop()
+            is_dir = self.types[index] == "t"
+            if not filtered or (not is_dir and self._matches(index, pattern, extensions)):
+                if len(nodes) >= limit:
+                    return nodes, True
+                nodes.append(self.node(index))
+            if is_dir and level < depth:
+                stack.extend((child, level + 1) for child in reversed(self.children[index]))
+        return nodes, False
+
+    def _matches(self, index: int, pattern: str | None, extensions: set[str] | None) -> bool:
+        if extensions:
+            name = self.names[index]
+            extension = name.rsplit(".", 1)[1].lower() if "." in name else ""
+            if extension not in extensions:
+                return False
+        if pattern and not fnmatch.fnmatchcase(self.paths[index], pattern):
+            return False
+        return True
@@ -1,10 +1,13 @@
+import base64
 import json
 import re
+from collections.abc import AsyncIterator
 from typing import Any
 
 import httpx
 
 from app.core.config import settings
+from app.services.llm_client import discard_llm_response_async, post_llm_async, stream_llm
 
 
 DEFAULT_DIAGRAM = {
@@ -13,20 +16,6 @@ DEFAULT_DIAGRAM = {
 }
 
 
-def _fallback_uml(input_text: str) -> dict[str, Any]:
-    class_name = "Main"
-    if input_text.strip():
-        class_name = input_text.strip().split()[0].title()
-    return {
-        "classes": [
-            {
-                "name": class_name,
-                "attributes": [],
-                "methods": [],
-            }
-        ],
-        "relationships": [],
-    }
 def _fallback_uml(input_text: str, diagram_type: str) -> dict[str, Any]:
     diagram_type = diagram_type.lower().strip()
     text = input_text.strip()
@@ -146,14 +135,6 @@ def _parse_response(content: str) -> dict[str, Any] | None:
     return data
 
 
-def _build_prompt(input_text: str) -> str:
-    return (
-        "You are a UML generator. Return ONLY valid JSON with keys: classes, relationships. "
-        "Each class has name, attributes (list), methods (list). Relationships include from, to, type. "
-        f"User request: {input_text}"
-    )
-
-
 def _extract_json(content: str) -> dict[str, Any] | None:
     parsed = _parse_response(content)
     if parsed:
@@ -166,6 +147,70 @@ def _extract_json(content: str) -> dict[str, Any] | None:
     return _parse_response(match.group(0))
 
 
+class _IncrementalDiagramParser:
+    _TARGETS = {"classes": "class", "relationships": "relationship"}
+
+    def __init__(self) -> None:
+        self.buffer = ""
+        self._pos = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: str | None = None
+        self._pending_key: str | None = None
+        self._target: str | None = None
+        self._target_depth = 0
+        self._item_start: int | None = None
+
+    def feed(self, chunk: str) -> list[tuple[str, dict[str, Any]]]:
+        self.buffer += chunk
+        items: list[tuple[str, dict[str, Any]]] = []
+        text = self.buffer
+
+        while self._pos < len(text):
+            char = text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start : self._pos]
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos + 1
+            elif char == ":":
+                self._pending_key = self._last_string
+            elif char in "{[":
+                if char == "[" and self._target is None and len(self._stack) == 1 and self._pending_key in self._TARGETS:
+                    self._target = self._TARGETS[self._pending_key]
+                    self._target_depth = len(self._stack) + 1
+                elif char == "{" and self._target and len(self._stack) == self._target_depth:
+                    self._item_start = self._pos
+                self._stack.append(char)
+                self._pending_key = None
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+                if char == "}" and self._item_start is not None and len(self._stack) == self._target_depth:
+                    try:
+                        item = json.loads(text[self._item_start : self._pos + 1])
+                    except json.JSONDecodeError:
+                        item = None
+                    if isinstance(item, dict):
+                        items.append((self._target, item))
+                    self._item_start = None
+                elif char == "]" and self._target and len(self._stack) == self._target_depth - 1:
+                    self._target = None
+            elif char == ",":
+                self._pending_key = None
+            self._pos += 1
+
+        return items
+
+
 # -------------------- MERMAID --------------------
 def _to_mermaid(diagram: dict[str, Any]) -> str | None:
     diagram_type = (diagram.get("type") or "class").lower()
@@ -209,99 +254,120 @@ def _to_mermaid(diagram: dict[str, Any]) -> str | None:
 
 
 # -------------------- PROMPT --------------------
+SYSTEM_PROMPT = "You are an expert software architect. You output UML as strict JSON only."
+
+
 def _build_prompt(input_text: str, diagram_type: str) -> str:
     diagram_type = diagram_type.lower().strip()
 
     return (
-        "Return ONLY valid JSON with keys: type, mermaid, classes, relationships. "
-        "type must be 'class'. "
+        "Return ONLY valid JSON with keys: type, title, classes, relationships, mermaid. "
+        f"type must be '{diagram_type}'. "
+        "title is a short human readable diagram title. "
         "Each class has name, attributes (list), methods (list). "
-        "Relationships include from, to, type. "
+        "Relationships include from, to, type (has_many, belongs_to or assigned_to). "
+        "mermaid is valid Mermaid syntax for the same diagram. "
         "If text is brief, infer typical classes for the domain. "
         f"Text: {input_text}"
     )
 
 
-# -------------------- MAIN FUNCTION --------------------
-def generate_uml(input_text: str, diagram_type: str = "class") -> dict[str, Any]:
-    if not settings.llm_api_url:
-        fallback = _fallback_uml(input_text, diagram_type)
-
-        if "mermaid" not in fallback:
-            mermaid_code = _to_mermaid(fallback)
-            if mermaid_code:
-                fallback["mermaid"] = mermaid_code
-
-        return fallback
-
-    payload = {
+def _build_payload(input_text: str, diagram_type: str) -> dict[str, Any]:
+    return {
         "model": settings.llm_model,
         "messages": [
-            {"role": "system", "content": "You output UML as JSON."},
-            {"role": "user", "content": _build_prompt(input_text)},
-            {"role": "system", "content": "You output UML as JSON only."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": _build_prompt(input_text, diagram_type)},
         ],
         "temperature": 0,
     }
 
-    headers = {}
-    headers = {"Accept": "application/json"}
 
+def _build_headers() -> dict[str, str]:
+    headers = {"Accept": "application/json", "Content-Type": "application/json"}
     if settings.llm_api_key:
         headers["Authorization"] = f"Bearer {settings.llm_api_key}"
+    return headers
 
-    try:
-        with httpx.Client(timeout=settings.llm_timeout_seconds) as client:
-            response = client.post(settings.llm_api_url, json=payload, headers=headers)
 
-        response.raise_for_status()
+def _extract_content(data: Any) -> str | None:
+    if not isinstance(data, dict):
+        return None
 
-    except httpx.HTTPError:
-        return _fallback_uml(input_text)
-        fallback = _fallback_uml(input_text, diagram_type)
+    content = None
+    choices = data.get("choices")
+    if isinstance(choices, list) and choices:
+        message = choices[0].get("message", {})
+        content = message.get("content")
+    if content is None and "output" in data:
+        content = data.get("output")
+    return content
 
-        if "mermaid" not in fallback:
-            mermaid_code = _to_mermaid(fallback)
-            if mermaid_code:
-                fallback["mermaid"] = mermaid_code
 
-        return fallback
+def image_url(mermaid_code: str) -> str:
+    encoded = base64.urlsafe_b64encode(mermaid_code.encode("utf-8")).decode("utf-8")
+    return f"https://mermaid.ink/img/{encoded}"
 
-    data = response.json()
 
-    content = None
+def _finalize(diagram: dict[str, Any], diagram_type: str, title: str) -> dict[str, Any]:
+    diagram.setdefault("type", diagram_type)
+    if not diagram.get("title"):
+        diagram["title"] = title
 
-    if isinstance(data, dict):
-        choices = data.get("choices")
+    if not diagram.get("mermaid"):
+        mermaid_code = _to_mermaid(diagram)
+        if mermaid_code:
+            diagram["mermaid"] = mermaid_code
 
-        if isinstance(choices, list) and choices:
-            message = choices[0].get("message", {})
-            content = message.get("content")
-        if content is None and "output" in data:
-            content = data.get("output")
+    if diagram.get("mermaid"):
+        diagram["image_url"] = image_url(diagram["mermaid"])
 
-    if not content:
-        return _fallback_uml(input_text, diagram_type)
+    return diagram
 
-    parsed = _extract_json(content)
 
-    if not parsed:
-        fallback = _fallback_uml(input_text, diagram_type)
+def _fallback_diagram(input_text: str, diagram_type: str) -> dict[str, Any]:
+    return _finalize(_fallback_uml(input_text, diagram_type), diagram_type, "Fallback UML")
 
-        if "mermaid" not in fallback:
-            mermaid_code = _to_mermaid(fallback)
-            if mermaid_code:
-                fallback["mermaid"] = mermaid_code
 
-        return fallback
+# -------------------- MAIN FUNCTION --------------------
+async def generate_uml(input_text: str, diagram_type: str = "class") -> dict[str, Any]:
+    if not settings.llm_api_url:
+        return _fallback_diagram(input_text, diagram_type)
 
-    if "type" not in parsed:
-        parsed["type"] = diagram_type
+    payload = _build_payload(input_text, diagram_type)
+    try:
+        data = await post_llm_async(payload, _build_headers())
+    except (httpx.HTTPError, json.JSONDecodeError):
+        return _fallback_diagram(input_text, diagram_type)
 
-    if "mermaid" not in parsed:
-        mermaid_code = _to_mermaid(parsed)
-        if mermaid_code:
-            parsed["mermaid"] = mermaid_code
+    content = _extract_content(data)
+    parsed = _extract_json(content) if content else None
+    if not parsed:
+        await discard_llm_response_async(payload)
+        return _fallback_diagram(input_text, diagram_type)
+
+    return _finalize(parsed, diagram_type, "AI UML")
+
+
+async def stream_uml(input_text: str, diagram_type: str = "class") -> AsyncIterator[tuple[str, dict[str, Any]]]:
+    if not settings.llm_api_url:
+        diagram = _fallback_diagram(input_text, diagram_type)
+    else:
+        parser = _IncrementalDiagramParser()
+        payload = _build_payload(input_text, diagram_type)
+        try:
+            async for delta in stream_llm(payload, _build_headers()):
+                yield "progress", {"delta": delta, "received": len(parser.buffer) + len(delta)}
+                for kind, item in parser.feed(delta):
+                    yield kind, item
+        except httpx.HTTPError:
+            diagram = _fallback_diagram(input_text, diagram_type)
+        else:
+            parsed = _extract_json(parser.buffer) if parser.buffer else None
+            if parsed:
+                diagram = _finalize(parsed, diagram_type, "AI UML")
+            else:
+                await discard_llm_response_async(payload)
+                diagram = _fallback_diagram(input_text, diagram_type)
 
-    return parsed
+    yield "diagram", diagram
@@ -0,0 +1,160 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.models.user import User
+
+# credentials are never cached; they lazy-load if a route needs them
+SNAPSHOT_EXCLUDE = {"password_hash"}
+
+
+def snapshot_user(user: User) -> dict[str, Any]:
+    data = {}
+    for column in User.__table__.columns:
+        if column.key in SNAPSHOT_EXCLUDE:
+            continue
+        value = getattr(user, column.key)
+        if isinstance(value, uuid.UUID):
+            value = str(value)
+        elif isinstance(value, datetime):
+            value = value.isoformat()
+        data[column.key] = value
+    return data
+
+
+def _detached_user(data: dict[str, Any]) -> User:
+    values = dict(data)
+    values["id"] = uuid.UUID(values["id"])
+    if values.get("created_at"):
+        values["created_at"] = datetime.fromisoformat(values["created_at"])
+    user = User(**values)
+    make_transient_to_detached(user)
+    return user
+
+
+def restore_user(db: Session, data: dict[str, Any]) -> User:
+    return db.merge(_detached_user(data), load=False)
+
+
+async def restore_user_async(db: AsyncSession, data: dict[str, Any]) -> User:
+    return await db.merge(_detached_user(data), load=False)
+
+
+class UserCache:
+    def __init__(self, max_entries: int, ttl_seconds: int, path: str | None = None) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        if path:
+            # shared by every worker process; no local tier so invalidations are seen everywhere
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS user_cache (user_id TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @property
+    def shared(self) -> bool:
+        return self._db is not None
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return now - created_at > self.ttl_seconds
+
+    def get(self, user_id: str) -> dict[str, Any] | None:
+        now = time.time()
+        with self._lock:
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM user_cache WHERE user_id = ?", (user_id,)
+                ).fetchone()
+                entry = (row[1], json.loads(row[0])) if row else None
+            else:
+                entry = self._entries.get(user_id)
+            if entry is not None and not self._expired(entry[0], now):
+                if self._db is None:
+                    self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def set(self, user_id: str, value: dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO user_cache (user_id, value, created_at) VALUES (?, ?, ?)",
+                    (user_id, json.dumps(value), now),
+                )
+                self._db.execute("DELETE FROM user_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+                self._db.commit()
+                return
+            self._entries[user_id] = (now, value)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: str) -> None:
+        with self._lock:
+            self.invalidations += 1
+            if self._db is not None:
+                self._db.execute("DELETE FROM user_cache WHERE user_id = ?", (user_id,))
+                self._db.commit()
+            else:
+                self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM user_cache")
+                self._db.commit()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            if self._db is not None:
+                entries = self._db.execute("SELECT COUNT(*) FROM user_cache").fetchone()[0]
+            else:
+                entries = len(self._entries)
+            return {
+                "entries": entries,
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "shared": self._db is not None,
+            }
+
+
+user_cache = UserCache(
+    max_entries=settings.user_cache_max_entries,
+    ttl_seconds=settings.user_cache_ttl_seconds,
+    path=settings.user_cache_path,
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(_mapper, _connection, target: User) -> None:
+    user_cache.invalidate(str(target.id))
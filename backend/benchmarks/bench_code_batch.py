@@ -0,0 +1,82 @@
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.code_batch import (  # noqa: E402
+    analyze_files,
+    analyze_files_async,
+    batch_workers,
+    close_batch_pool,
+    open_batch_pool,
+    project_graph,
+)
+
+TEMPLATE = '''from .module_{previous} import step_{previous}
+
+
+class Worker{index}:
+    def run(self, items):
+        total = 0
+        for item in items:
+            if item % 3 == 0:
+                total += step_{previous}(item)
+            elif item % 5 == 0:
+                try:
+                    total -= item // 5
+                except ZeroDivisionError:
+                    total = 0
+            else:
+                total += sum(value * 2 for value in range(item) if value % 2)
+        return total
+
+
+def step_{index}(value):
+    worker = Worker{index}()
+    return worker.run(range(value % 50))
+'''
+
+
+def synthetic_files(count: int, functions: int) -> list[tuple[str, str]]:
+    files = []
+    for index in range(count):
+        body = TEMPLATE.format(index=index, previous=(index - 1) % count)
+        extra = "\n".join(f"\ndef helper_{index}_{n}(x):\n    return step_{index}(x + {n})\n" for n in range(functions))
+        files.append((f"pkg/module_{index}.py", body + extra))
+    return files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare serial and process-pool batch code analysis.")
+    parser.add_argument("--files", type=int, default=300)
+    parser.add_argument("--functions", type=int, default=40)
+    args = parser.parse_args()
+
+    files = synthetic_files(args.files, args.functions)
+
+    started = time.perf_counter()
+    serial = analyze_files(files)
+    serial_seconds = time.perf_counter() - started
+
+    open_batch_pool()
+    try:
+        # the first call pays for starting the workers
+        asyncio.run(analyze_files_async(files[:1]))
+        started = time.perf_counter()
+        pooled = asyncio.run(analyze_files_async(files))
+        pooled_seconds = time.perf_counter() - started
+    finally:
+        close_batch_pool()
+
+    assert [item["path"] for item in pooled] == [item["path"] for item in serial]
+    graph = project_graph(pooled)
+    print(f"files={args.files} workers={batch_workers()} cross-file edges={len(graph['edges'])}")
+    print(f"serial: {serial_seconds:.2f}s")
+    print(f"pool:   {pooled_seconds:.2f}s ({serial_seconds / pooled_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# anyio's default threadpool size, the ceiling for sync routes
+THREADPOOL_SIZE = 40
+CLIENT_CONNECTIONS = 10
+
+UML_CONTENT = json.dumps(
+    {
+        "type": "class",
+        "title": "Bench",
+        "classes": [{"name": "User", "attributes": ["id"], "methods": []}],
+        "relationships": [],
+        "mermaid": "classDiagram\n  class User",
+    }
+)
+
+
+def fake_llm(latency: float):
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        more_body = True
+        while more_body:
+            message = await receive()
+            more_body = message.get("more_body", False)
+        await asyncio.sleep(latency)
+        body = json.dumps({"choices": [{"message": {"content": UML_CONTENT}}]}).encode()
+        await send(
+            {"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]}
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve_llm(port: int, latency: float) -> None:
+    uvicorn.run(fake_llm(latency), host="127.0.0.1", port=port, log_level="warning")
+
+
+def wait_until_up(port: int, process: subprocess.Popen) -> None:
+    for _ in range(200):
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"nothing listening on port {port}")
+
+
+def start_app(port: int, env: dict[str, str]) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+    )
+    wait_until_up(port, process)
+    return process
+
+
+def start_llm(port: int, latency: float) -> subprocess.Popen:
+    # its own process so the load generator's CPU use does not delay replies
+    process = subprocess.Popen([sys.executable, __file__, "--serve-llm", str(port), "--latency", str(latency)])
+    wait_until_up(port, process)
+    return process
+
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    latencies: list[float] = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get("/")
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def burst(base_url: str, requests: int, run: int) -> dict:
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        email = f"bench{run}@example.com"
+        await client.post("/auth/register", json={"email": email, "password": "bench-password"})
+        token = (
+            await client.post("/auth/login", data={"username": email, "password": "bench-password"})
+        ).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        project_id = (
+            await client.post("/projects/create", headers=headers, json={"name": f"Bench {run}"})
+        ).json()["id"]
+
+        # httpcore scans its whole pool per request, so spread the load over small clients
+        senders = [
+            httpx.AsyncClient(base_url=base_url, timeout=120)
+            for _ in range(math.ceil(requests / CLIENT_CONNECTIONS))
+        ]
+
+        async def generate(index: int) -> int:
+            response = await senders[index // CLIENT_CONNECTIONS].post(
+                "/uml/generate",
+                headers=headers,
+                json={"project_id": project_id, "diagram_type": "class", "input_text": f"run {run} request {index}"},
+            )
+            return response.status_code
+
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, stop))
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(generate(index) for index in range(requests)))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        latencies = await probe_task
+        for sender in senders:
+            await sender.aclose()
+
+    assert all(code == 200 for code in statuses), statuses
+    return {
+        "elapsed": elapsed,
+        "probe_p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "probe_max_ms": max(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Concurrent /uml/generate requests against a fake LLM with fixed latency."
+    )
+    parser.add_argument("--requests", type=int, nargs="+", default=[10, 50, 100, 200])
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds the fake LLM takes per call")
+    parser.add_argument("--llm-connections", type=int, default=200, help="LLM_POOL_MAX_CONNECTIONS for the run")
+    parser.add_argument("--serve-llm", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve_llm:
+        serve_llm(args.serve_llm, args.latency)
+        return
+
+    llm_port, app_port = free_port(), free_port()
+    workdir = tempfile.mkdtemp(prefix="ndex-bench-")
+    env = {
+        "DATABASE_URL": f"sqlite:///{workdir}/bench.db",
+        "LLM_API_URL": f"http://127.0.0.1:{llm_port}/v1/chat/completions",
+        "LLM_API_KEY": "bench",
+        "LLM_CACHE_ENABLED": "false",
+        "LLM_POOL_MAX_CONNECTIONS": str(args.llm_connections),
+        "BCRYPT_ROUNDS": "4",
+    }
+
+    llm_process = start_llm(llm_port, args.latency)
+    app_process = start_app(app_port, env)
+    try:
+        rows = [
+            (requests, asyncio.run(burst(f"http://127.0.0.1:{app_port}", requests, run)))
+            for run, requests in enumerate(args.requests)
+        ]
+    finally:
+        for process in (app_process, llm_process):
+            process.terminate()
+            process.wait()
+
+    print(f"fake LLM latency {args.latency:.2f}s, {args.llm_connections} LLM connections")
+    print(
+        f"{'requests':>9}{'seconds':>10}{'sync bound':>12}{'req/s':>10}{'probe p50 ms':>15}{'probe max ms':>15}"
+    )
+    for requests, row in rows:
+        # a sync route holds one of THREADPOOL_SIZE threads for the whole LLM call
+        sync_bound = math.ceil(requests / THREADPOOL_SIZE) * args.latency
+        print(
+            f"{requests:>9}{row['elapsed']:>10.2f}{sync_bound:>12.2f}{requests / row['elapsed']:>10.1f}"
+            f"{row['probe_p50_ms']:>15.2f}{row['probe_max_ms']:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
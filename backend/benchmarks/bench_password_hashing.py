@@ -0,0 +1,87 @@
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.security import (  # noqa: E402
+    close_hash_pool,
+    get_password_hash,
+    open_hash_pool,
+    verify_and_update_password_async,
+    verify_password,
+)
+
+
+async def probe(threads: ThreadPoolExecutor, stop: asyncio.Event, interval: float) -> list[float]:
+    loop = asyncio.get_running_loop()
+    latencies: list[float] = []
+    while not stop.is_set():
+        started = time.perf_counter()
+        await loop.run_in_executor(threads, lambda: None)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def run(mode: str, logins: int, threads: int, password: str, hashed: str) -> dict:
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=threads)
+    stop = asyncio.Event()
+    probe_task = asyncio.create_task(probe(executor, stop, 0.01))
+
+    async def login() -> bool:
+        if mode == "inline":
+            return await loop.run_in_executor(executor, verify_password, password, hashed)
+        verified, _ = await verify_and_update_password_async(password, hashed)
+        return verified
+
+    started = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    latencies = await probe_task
+    executor.shutdown()
+    assert all(results)
+    return {
+        "elapsed": elapsed,
+        "throughput": logins / elapsed,
+        "probe_p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "probe_max_ms": max(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Login throughput and threadpool responsiveness with inline vs process-pool bcrypt."
+    )
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--threads", type=int, default=40, help="size of the simulated request threadpool")
+    args = parser.parse_args()
+
+    password = "correct horse battery staple"
+    hashed = get_password_hash(password)
+    open_hash_pool()
+    try:
+        rows = [
+            (mode, asyncio.run(run(mode, args.logins, args.threads, password, hashed)))
+            for mode in ("inline", "pool")
+        ]
+    finally:
+        close_hash_pool()
+
+    print(f"{args.logins} concurrent logins, {args.threads} request threads")
+    print(f"{'mode':<10}{'seconds':>10}{'logins/s':>12}{'probe p50 ms':>15}{'probe max ms':>15}")
+    for mode, row in rows:
+        print(
+            f"{mode:<10}{row['elapsed']:>10.2f}{row['throughput']:>12.1f}"
+            f"{row['probe_p50_ms']:>15.2f}{row['probe_max_ms']:>15.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
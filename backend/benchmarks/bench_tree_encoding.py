@@ -0,0 +1,83 @@
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.repo_tree import decode_entries, encode_entries  # noqa: E402
+
+
+def synthetic_entries(count: int, seed: int = 7) -> list[dict]:
+    rng = random.Random(seed)
+    top = ["src", "tests", "docs", "packages", "tools"]
+    names = ["index", "utils", "models", "views", "service", "__init__", "config", "helpers"]
+    exts = [".py", ".ts", ".js", ".md", ".json", ".css"]
+    entries: list[dict] = []
+    seen_dirs: set[str] = set()
+    while len(entries) < count:
+        depth = rng.randint(1, 6)
+        parts = [rng.choice(top)] + [f"module_{rng.randint(0, 40)}" for _ in range(depth - 1)]
+        for index in range(1, len(parts) + 1):
+            directory = "/".join(parts[:index])
+            if directory not in seen_dirs:
+                seen_dirs.add(directory)
+                entries.append({"path": directory, "type": "tree", "size": 0})
+        path = "/".join(parts + [rng.choice(names) + rng.choice(exts)])
+        entries.append({"path": path, "type": "blob", "size": rng.randint(0, 200_000)})
+    return entries[:count]
+
+
+def measure(build) -> tuple[object, int]:
+    tracemalloc.start()
+    value = build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return value, peak
+
+
+def timed(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare list-of-dicts and columnar tree encodings.")
+    parser.add_argument("--entries", type=int, default=100_000)
+    args = parser.parse_args()
+
+    entries = synthetic_entries(args.entries)
+    legacy_blob = json.dumps(entries)
+    compact = encode_entries(entries)
+    compact_blob = json.dumps(compact)
+    assert decode_entries(compact) == entries
+
+    _, legacy_loaded = measure(lambda: json.loads(legacy_blob))
+    _, compact_loaded = measure(lambda: json.loads(compact_blob))
+
+    rows = [
+        ("serialized bytes", len(legacy_blob), len(compact_blob)),
+        ("json.loads peak bytes", legacy_loaded, compact_loaded),
+        ("json.loads seconds", timed(lambda: json.loads(legacy_blob)), timed(lambda: json.loads(compact_blob))),
+        ("json.dumps seconds", timed(lambda: json.dumps(entries)), timed(lambda: json.dumps(compact))),
+    ]
+
+    print(f"{args.entries} entries")
+    print(f"{'metric':<24}{'entries list':>16}{'columnar':>16}{'ratio':>10}")
+    for name, legacy, columnar in rows:
+        ratio = columnar / legacy if legacy else 0
+        if isinstance(legacy, float):
+            print(f"{name:<24}{legacy:>16.4f}{columnar:>16.4f}{ratio:>10.2f}")
+        else:
+            print(f"{name:<24}{legacy:>16,}{columnar:>16,}{ratio:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,14 @@
+import io
+import time
+import zipfile
+
+from passlib.hash import bcrypt
+
+from app.core.config import settings
+from app.core.security import verify_password
+from app.db.session import SessionLocal
+from app.models.user import User
+
 
 def auth_headers(client):
     email = "demo@example.com"
@@ -70,6 +81,38 @@ def test_uml_and_code_flow(client):
         },
     )
     assert uml_response.status_code == 200
+    diagram_json = uml_response.json()["diagram_json"]
+    assert diagram_json["mermaid"].startswith("classDiagram")
+    assert diagram_json["image_url"].startswith("https://mermaid.ink/img/")
+
+    stream_response = client.post(
+        "/uml/generate/stream",
+        headers=headers,
+        json={
+            "project_id": project_id,
+            "input_text": "User has many Projects",
+            "diagram_type": "class",
+        },
+    )
+    assert stream_response.status_code == 200
+    assert stream_response.headers["content-type"].startswith("text/event-stream")
+    assert "event: done" in stream_response.text
+
+    first_page = client.get(f"/uml/list?project_id={project_id}&limit=1", headers=headers)
+    assert first_page.status_code == 200
+    assert len(first_page.json()) == 1
+    assert "diagram_json" not in first_page.json()[0]
+    cursor = first_page.headers["X-Next-Cursor"]
+    second_page = client.get(f"/uml/list?project_id={project_id}&limit=1&cursor={cursor}", headers=headers)
+    assert second_page.status_code == 200
+    assert "X-Next-Cursor" not in second_page.headers
+    listed_ids = {first_page.json()[0]["id"], second_page.json()[0]["id"]}
+    assert len(listed_ids) == 2
+    assert uml_response.json()["id"] in listed_ids
+
+    detail_response = client.get(f"/uml/{second_page.json()[0]['id']}", headers=headers)
+    assert detail_response.status_code == 200
+    assert detail_response.json()["diagram_json"]["mermaid"].startswith("classDiagram")
 
     code_response = client.post(
         "/code/analyze",
@@ -82,6 +125,89 @@ def test_uml_and_code_flow(client):
     )
     assert code_response.status_code == 200
     assert "steps" in code_response.json()["execution_graph"]
+    graph = code_response.json()["execution_graph"]
+    assert {"from": "f0b1", "to": "f1", "kind": "call"} in graph["edges"]
+    assert [item["name"] for item in graph["functions"]] == ["<module>", "add"]
+
+    cfg_response = client.post(
+        "/code/cfg",
+        headers=headers,
+        json={"code": "def pick(x):\n    if x:\n        return 1\n    return 2", "function": "pick"},
+    )
+    assert cfg_response.status_code == 200
+    kinds = {edge.get("kind") for edge in cfg_response.json()["edges"]}
+    assert {"true", "false", "return"} <= kinds
+
+    metrics = code_response.json()["execution_graph"]["ai_metrics"]
+    assert metrics["source"] == "ast"
+    assert 0 <= metrics["maintainability_index"] <= 100
+    assert metrics["functions"][0]["name"] == "add"
+    assert metrics["functions"][0]["complexity"] == 1
+
+    repeat_response = client.post(
+        "/code/analyze",
+        headers=headers,
+        json={
+            "project_id": project_id,
+            "language": "python",
+            "code": "def add(a,b):   \r\n    return a+b\r\nadd(1,2)\r\n\r\n",
+        },
+    )
+    assert repeat_response.status_code == 200
+    assert repeat_response.json()["id"] != code_response.json()["id"]
+    assert repeat_response.json()["execution_graph"] == graph
+
+    invalid_response = client.post(
+        "/code/analyze",
+        headers=headers,
+        json={"project_id": project_id, "language": "python", "code": "def broken(:"},
+    )
+    assert invalid_response.status_code == 400
+
+
+def test_code_batch_analysis(client):
+    headers = auth_headers(client)
+    files = [
+        {"path": "pkg/__init__.py", "code": ""},
+        {"path": "pkg/util.py", "code": "def helper(x):\n    return x * 2\n"},
+        {"path": "pkg/main.py", "code": "from .util import helper\n\ndef run():\n    return helper(1)\n"},
+        {"path": "pkg/broken.py", "code": "def broken(:"},
+    ]
+    batch_response = client.post("/code/analyze/batch", headers=headers, json={"files": files})
+    assert batch_response.status_code == 200
+    body = batch_response.json()
+    assert [item["path"] for item in body["files"]] == [item["path"] for item in files]
+    assert body["files"][3]["error"].startswith("Invalid python")
+    assert {"from": "pkg/main.py", "to": "pkg/util.py", "kind": "import"} in body["graph"]["edges"]
+    assert {"from": "pkg/main.py", "to": "pkg/util.py", "kind": "call", "names": ["helper"]} in body["graph"]["edges"]
+
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as bundle:
+        for item in files[:3]:
+            bundle.writestr(f"project-main/{item['path']}", item["code"])
+        bundle.writestr("project-main/README.md", "not python")
+    zip_response = client.post(
+        "/code/analyze/batch/zip",
+        headers=headers,
+        files={"archive": ("project.zip", archive.getvalue(), "application/zip")},
+    )
+    assert zip_response.status_code == 200
+    zipped = zip_response.json()
+    assert len(zipped["files"]) == 3
+    assert all(item["cached"] for item in zipped["files"])
+    assert {"from": "project-main/pkg/main.py", "to": "project-main/pkg/util.py", "kind": "import"} in zipped[
+        "graph"
+    ]["edges"]
+
+    corrupted = bytearray(archive.getvalue())
+    offset = corrupted.index(b"def helper")
+    corrupted[offset : offset + 10] = b"XXXXXXXXXX"
+    corrupted_response = client.post(
+        "/code/analyze/batch/zip",
+        headers=headers,
+        files={"archive": ("project.zip", bytes(corrupted), "application/zip")},
+    )
+    assert corrupted_response.status_code == 400
 
 
 def test_repo_analyze_with_mocked_github(client, monkeypatch):
@@ -89,8 +215,12 @@ def test_repo_analyze_with_mocked_github(client, monkeypatch):
     project_id = client.post("/projects/create", headers=headers, json={"name": "Repo Project"}).json()["id"]
 
     monkeypatch.setattr(
-        "app.api.routes.repo.fetch_repo_tree",
-        lambda _url: {
+        "app.services.repo_jobs.fetch_repo_head",
+        lambda _url: {"repo": "octocat/Hello-World", "branch": "main", "head_sha": "c1", "tree_sha": "t1"},
+    )
+    monkeypatch.setattr(
+        "app.services.repo_jobs.fetch_repo_tree",
+        lambda _url, _head=None, _previous=None: {
             "repo": "octocat/Hello-World",
             "branch": "main",
             "entries": [{"path": "README.md", "type": "blob"}],
@@ -100,7 +230,7 @@ def test_repo_analyze_with_mocked_github(client, monkeypatch):
         },
     )
     monkeypatch.setattr(
-        "app.api.routes.repo.build_repo_intelligence",
+        "app.services.repo_jobs.build_repo_intelligence",
         lambda _data: {
             "repository_health": "Good",
             "collaboration_patterns": "Low",
@@ -116,5 +246,54 @@ def test_repo_analyze_with_mocked_github(client, monkeypatch):
             "repo_url": "https://github.com/octocat/Hello-World",
         },
     )
-    assert repo_response.status_code == 200
-    assert repo_response.json()["dependency_graph"]["entries"][0]["path"] == "README.md"
+    assert repo_response.status_code == 202
+    job_id = repo_response.json()["id"]
+
+    job = repo_response.json()
+    for _ in range(50):
+        job = client.get(f"/repo/jobs/{job_id}", headers=headers).json()
+        if job["status"] in {"completed", "failed"}:
+            break
+        time.sleep(0.1)
+
+    assert job["status"] == "completed"
+    assert job["progress"] == 100
+    assert "entries" not in job["repository"]["dependency_graph"]
+    assert "tree" not in job["repository"]["dependency_graph"]
+    assert job["repository"]["dependency_graph"]["stats"]["files"] == 1
+
+    tree_response = client.get(f"/repo/{job['repository_id']}/tree", headers=headers)
+    assert tree_response.status_code == 200
+    assert tree_response.json()["file_count"] == 1
+    assert tree_response.json()["nodes"][0]["path"] == "README.md"
+
+
+def test_login_rehashes_passwords_with_other_bcrypt_rounds(client):
+    email = "rehash@example.com"
+    password = "rehash-pass-123"
+    client.post("/auth/register", json={"email": email, "password": password, "full_name": "Rehash User"})
+    rounds = 4 if settings.bcrypt_rounds != 4 else 5
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == email).one()
+        user.password_hash = bcrypt.using(rounds=rounds).hash(password)
+        db.commit()
+        old_hash = user.password_hash
+    finally:
+        db.close()
+
+    login_response = client.post(
+        "/auth/login",
+        data={"username": email, "password": password},
+        headers={"Content-Type": "application/x-www-form-urlencoded"},
+    )
+    assert login_response.status_code == 200
+
+    db = SessionLocal()
+    try:
+        new_hash = db.query(User.password_hash).filter(User.email == email).scalar()
+    finally:
+        db.close()
+    assert new_hash != old_hash
+    assert bcrypt.from_string(new_hash).rounds == settings.bcrypt_rounds
+    assert verify_password(password, new_hash)
@@ -0,0 +1,75 @@
+from app.services.code_analysis import analyze_code, function_cfg
+from app.services.code_metrics import HOTSPOT_COUNT, compute_code_metrics
+
+READ = """def read(path):
+    fh = open(path)
+    try:
+        return fh.read()
+    finally:
+        fh.close()
+"""
+
+LOOP = """def drain(items):
+    for item in items:
+        try:
+            if item:
+                continue
+            break
+        finally:
+            log(item)
+    return 1
+"""
+
+
+def _edges(graph):
+    labels = {node["id"]: node["label"] for node in graph["nodes"]}
+    return {(labels[edge["from"]], labels[edge["to"]], edge.get("kind")) for edge in graph["edges"]}
+
+
+def test_return_inside_try_runs_the_finally_clause():
+    edges = _edges(function_cfg(READ, "read"))
+    assert ("return fh.read()", "finally", "return") in edges
+    assert ("fh.close()", "exit read", "return") in edges
+    assert ("return fh.read()", "exit read", "return") not in edges
+
+
+def test_loop_jumps_pass_through_finally_before_reaching_the_loop():
+    edges = _edges(function_cfg(LOOP, "drain"))
+    assert ("continue", "finally", "continue") in edges
+    assert ("break", "finally", "break") in edges
+    assert ("log(item)", "for item in items", "continue") in edges
+    assert ("log(item)", "return 1", "break") in edges
+
+
+def test_overview_groups_functions_beyond_the_budget():
+    classes = [
+        f"class C{c}:\n" + "".join(f"    def m{c}_{n}(self):\n        return f{c}()\n" for n in range(4))
+        for c in range(20)
+    ]
+    helpers = [f"def f{c}():\n    return C{(c + 1) % 20}().m{(c + 1) % 20}_0()\n" for c in range(20)]
+    graph = analyze_code("\n".join(classes + helpers), node_budget=30)
+
+    assert len(graph["nodes"]) <= 30
+    assert not graph["truncated"]
+    groups = [node for node in graph["nodes"] if node.get("functions")]
+    assert sum(len(node["functions"]) for node in groups) == len(graph["functions"]) - 1
+    assert {function["node_id"] for function in graph["functions"][1:]} == {node["id"] for node in groups}
+    call_edges = [edge for edge in graph["edges"] if edge["kind"] == "call"]
+    assert call_edges
+    assert all(edge["from"] != edge["to"] for edge in call_edges)
+
+
+def test_hotspots_rank_small_functions_by_length_then_complexity():
+    code = "\n".join(
+        [
+            "def tiny():\n    return 1\n",
+            "def branchy(x):\n    if x:\n        return 1\n    return 2\n",
+            "def flat(x):\n    y = x\n    z = y\n    return z\n",
+        ]
+        + [f"def helper_{index}():\n    return {index}\n" for index in range(HOTSPOT_COUNT)]
+    )
+    hotspots = compute_code_metrics(code)["hotspots"]
+
+    assert len(hotspots) == HOTSPOT_COUNT
+    assert hotspots[0].startswith("branchy")
+    assert hotspots[1].startswith("flat")
@@ -0,0 +1,32 @@
+from test_api_flow import auth_headers
+
+from app.core.config import settings
+
+
+def _analyze(client, headers, project_id):
+    response = client.post(
+        "/code/analyze",
+        headers=headers,
+        json={"project_id": project_id, "language": "python", "code": "x = 1"},
+    )
+    assert response.status_code == 200
+
+
+def test_counters_stay_current_while_disabled(client, monkeypatch):
+    headers = auth_headers(client)
+    # the first read creates the counter row
+    before = client.get("/dashboard/summary", headers=headers).json()
+
+    monkeypatch.setattr(settings, "user_counters_enabled", False)
+    kept_id = client.post("/projects/create", headers=headers, json={"name": "Kept"}).json()["id"]
+    removed_id = client.post("/projects/create", headers=headers, json={"name": "Removed"}).json()["id"]
+    _analyze(client, headers, kept_id)
+    _analyze(client, headers, removed_id)
+    assert client.delete(f"/projects/{removed_id}", headers=headers).status_code == 204
+    aggregated = client.get("/dashboard/summary", headers=headers).json()
+
+    monkeypatch.setattr(settings, "user_counters_enabled", True)
+    counted = client.get("/dashboard/summary", headers=headers).json()
+    assert counted == aggregated
+    assert counted["total_projects"] == before["total_projects"] + 1
+    assert counted["total_code_sessions"] == before["total_code_sessions"] + 1
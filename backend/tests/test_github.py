@@ -0,0 +1,283 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import github
+
+
+def _commit(index, author_date, committer_date=None):
+    return {
+        "sha": f"sha{index}",
+        "commit": {
+            "author": {"name": f"dev{index % 3}", "date": author_date},
+            "committer": {"date": committer_date or author_date},
+        },
+    }
+
+
+def _github_commits(commits):
+    # newest first, filtered on committer date like the real API; since= is inclusive
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        since = request.url.params.get("since")
+        items = [item for item in commits if not since or item["commit"]["committer"]["date"] >= since]
+        page = int(request.url.params.get("page", 1))
+        per_page = int(request.url.params.get("per_page", 30))
+        last = max(1, -(-len(items) // per_page))
+        link = f'<{request.url.copy_merge_params({"page": last})}>; rel="last"'
+        return httpx.Response(200, json=items[(page - 1) * per_page : page * per_page], headers={"Link": link})
+
+    return handler, requests
+
+
+def _fetch_history(handler, previous=None):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await github._fetch_history(client, "octo", "repo", "main", previous)
+
+    return asyncio.run(run())
+
+
+def test_tree_fetch_is_shared_only_between_identical_states(monkeypatch):
+    calls = []
+    started = threading.Barrier(3)
+
+    async def fake_fetch(owner, repo, head, previous):
+        calls.append(previous)
+        await asyncio.sleep(0.2)
+        return {"history": {"total": len(calls)}, "stats": {}}
+
+    monkeypatch.setattr(github, "_fetch_repo_tree", fake_fetch)
+    head = {"head_sha": "h1", "tree_sha": "t1", "branch": "main"}
+    states = [None, None, {"history": {"cursor": {"sha": "c1"}}, "churn": {}}]
+    results = [None] * len(states)
+
+    def run(index):
+        started.wait()
+        results[index] = github.fetch_repo_tree("https://github.com/octo/repo", head, states[index])
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(len(states))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 2
+    assert results[0] == results[1]
+    assert results[0] is not results[1]
+    results[0]["stats"]["files"] = 1
+    assert results[1]["stats"] == {}
+
+
+def test_incremental_history_counts_each_commit_once(monkeypatch):
+    monkeypatch.setattr(settings, "github_history_days", 0)
+    monkeypatch.setattr(github, "http_cache", github.GitHubHTTPCache())
+    # eight commits share the head timestamp and a rebase left later committer dates on older ones
+    commits = [_commit(index, "2024-05-01T12:00:00Z") for index in range(250, 242, -1)]
+    commits += [
+        _commit(index, f"2024-04-{1 + index % 28:02d}T10:00:00Z", "2024-05-01T12:00:00Z")
+        for index in range(242, 0, -1)
+    ]
+    handler, _ = _github_commits(commits)
+    history, new_commits = _fetch_history(handler)
+    assert history["total"] == 250
+    assert history["cursor"]["sha"] == "sha250"
+    assert len(new_commits) == 250
+
+    commits.insert(0, _commit(251, "2024-05-01T12:00:00Z"))
+    handler, requests = _github_commits(commits)
+    history, new_commits = _fetch_history(handler, history)
+    assert history["incremental"]
+    assert history["total"] == 251
+    assert history["cursor"]["sha"] == "sha251"
+    assert new_commits == [("2024-05-01T12:00:00Z", "sha251")]
+    assert len(requests) == 1
+
+
+def test_history_rebuilds_when_the_cursor_is_gone(monkeypatch):
+    monkeypatch.setattr(settings, "github_history_days", 0)
+    monkeypatch.setattr(github, "http_cache", github.GitHubHTTPCache())
+    handler, _ = _github_commits([_commit(index, f"2024-05-0{index}T12:00:00Z") for index in (3, 2, 1)])
+    history, _ = _fetch_history(handler)
+
+    handler, _ = _github_commits([_commit(index, f"2024-05-0{index}T12:00:00Z") for index in (9, 8)])
+    history, new_commits = _fetch_history(handler, history)
+    assert not history["incremental"]
+    assert history["total"] == 2
+    assert history["cursor"]["sha"] == "sha9"
+
+
+def test_history_keeps_only_the_newest_commits_for_churn(monkeypatch):
+    monkeypatch.setattr(settings, "github_history_days", 0)
+    monkeypatch.setattr(settings, "github_churn_max_commits", 5)
+    monkeypatch.setattr(github, "http_cache", github.GitHubHTTPCache())
+    commits = [_commit(index, f"2024-01-01T00:{index // 60:02d}:{index % 60:02d}Z") for index in range(1200, 0, -1)]
+    handler, _ = _github_commits(commits)
+    history, new_commits = _fetch_history(handler)
+    assert history["total"] == 1200
+    newest = [(item["commit"]["author"]["date"], item["sha"]) for item in commits[:5]]
+    assert sorted(new_commits, reverse=True) == newest
+
+
+def test_host_limit_spans_job_threads(monkeypatch):
+    monkeypatch.setattr(settings, "github_max_concurrency", 2)
+    monkeypatch.setattr(github, "_host_slots", {})
+    monkeypatch.setattr(github, "http_cache", github.GitHubHTTPCache())
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+
+    async def handler(request):
+        with lock:
+            in_flight.append(request)
+            peak.append(len(in_flight))
+        await asyncio.sleep(0.05)
+        with lock:
+            in_flight.remove(request)
+        return httpx.Response(200, json={})
+
+    async def job(index):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            await asyncio.gather(
+                *(github._get(client, f"https://api.github.com/repos/o/r{index}/{n}", cache=False) for n in range(4))
+            )
+
+    # every repo job runs asyncio.run on its own worker thread
+    threads = [threading.Thread(target=asyncio.run, args=(job(index),)) for index in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(peak) == 12
+    assert max(peak) == 2
+
+
+def test_cancelled_host_limit_waiter_does_not_leak_its_slot(monkeypatch):
+    monkeypatch.setattr(settings, "github_max_concurrency", 1)
+    monkeypatch.setattr(github, "_host_slots", {})
+    url = "https://api.github.com/repos/o/r"
+
+    async def run():
+        async with github._host_limit(url):
+            waiting = asyncio.create_task(github._host_limit(url).__aenter__())
+            await asyncio.sleep(0.05)
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+        # the cancelled waiter's thread takes the slot once it is released and hands it straight back
+        await asyncio.sleep(0.05)
+
+    asyncio.run(run())
+    slot = github._host_slot(url)
+    assert slot.acquire(blocking=False)
+    slot.release()
+
+
+def test_truncated_tree_is_walked_per_subtree(monkeypatch):
+    monkeypatch.setattr(github, "http_cache", github.GitHubHTTPCache())
+    trees = {
+        "root": [{"path": "src", "type": "tree", "sha": "src"}, {"path": "README.md", "type": "blob", "size": 5}],
+        "src": [{"path": "app.py", "type": "blob", "size": 10}, {"path": "lib", "type": "tree", "sha": "lib"}],
+        "lib": [{"path": "util.py", "type": "blob", "size": 20}],
+    }
+    requests = []
+
+    def flatten(sha, prefix=""):
+        for item in trees[sha]:
+            yield {**item, "path": f"{prefix}{item['path']}"}
+            if item["type"] == "tree":
+                yield from flatten(item["sha"], f"{prefix}{item['path']}/")
+
+    def handler(request):
+        sha = request.url.path.rsplit("/", 1)[-1]
+        recursive = "recursive" in request.url.params
+        requests.append((sha, recursive))
+        if sha == "root" and recursive:
+            return httpx.Response(200, json={"sha": "root", "tree": trees["root"][:1], "truncated": True})
+        items = list(flatten(sha)) if recursive else trees[sha]
+        return httpx.Response(200, json={"sha": sha, "tree": items, "truncated": False})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return [item async for item in github._iter_entries(client, "octo", "repo", "root")]
+
+    entries = asyncio.run(run())
+    assert sorted(item["path"] for item in entries) == ["README.md", "src", "src/app.py", "src/lib", "src/lib/util.py"]
+    assert ("root", True) in requests and ("root", False) in requests
+
+
+def _get(handler, url="https://api.github.com/repos/octo/repo"):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await github._get(client, url)
+
+    return asyncio.run(run())
+
+
+def test_repeat_requests_revalidate_with_etag(monkeypatch):
+    monkeypatch.setattr(github, "http_cache", github.GitHubHTTPCache())
+    sent = []
+
+    def handler(request):
+        sent.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"X-RateLimit-Remaining": "59"})
+        return httpx.Response(200, json={"full_name": "octo/repo"}, headers={"ETag": '"v1"'})
+
+    assert _get(handler) == ({"full_name": "octo/repo"}, None)
+    assert _get(handler) == ({"full_name": "octo/repo"}, None)
+    assert sent == [None, '"v1"']
+    assert github.http_cache.revalidated == 1
+    assert github.http_cache.misses == 1
+
+
+def test_rate_limited_requests_back_off_and_retry(monkeypatch):
+    monkeypatch.setattr(github, "http_cache", github.GitHubHTTPCache())
+    monkeypatch.setattr(github, "rate_limit", github._RateLimit())
+    responses = [
+        httpx.Response(429, headers={"Retry-After": "0"}),
+        httpx.Response(403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(time.time()))}),
+        httpx.Response(200, json={"ok": True}, headers={"X-RateLimit-Remaining": "10"}),
+    ]
+    data, _ = _get(lambda request: responses.pop(0))
+    assert data == {"ok": True}
+    assert not responses
+    assert github.rate_limit.remaining == 10
+
+
+def test_rate_limit_beyond_the_backoff_budget_fails(monkeypatch):
+    monkeypatch.setattr(settings, "github_max_backoff_seconds", 5)
+    monkeypatch.setattr(github, "http_cache", github.GitHubHTTPCache())
+    monkeypatch.setattr(github, "rate_limit", github._RateLimit())
+    reset = str(int(time.time()) + 3600)
+
+    def handler(request):
+        return httpx.Response(403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})
+
+    with pytest.raises(github.GitHubRepoError):
+        _get(handler)
+
+
+def test_http_cache_evicts_least_recently_used_within_its_byte_budget():
+    cache = github.GitHubHTTPCache(max_bytes=250, max_entry_bytes=150)
+    cache.set("https://api.github.com/a", '"a"', None, "a" * 100)
+    cache.set_commit("c1", [{"filename": "x" * 60}])
+    assert cache.get("https://api.github.com/a") is not None
+    cache.set("https://api.github.com/b", '"b"', None, "b" * 100)
+
+    assert cache.get_commit("c1") is None
+    assert cache.get("https://api.github.com/a") is not None
+    assert cache.get("https://api.github.com/b") is not None
+
+    cache.set("https://api.github.com/tree", '"t"', None, "t" * 151)
+    assert cache.get("https://api.github.com/tree") is None
+    stats = cache.stats()
+    assert stats["bytes"] <= 250
+    assert stats["evictions"] == 1
+    assert stats["skipped"] == 1
@@ -0,0 +1,117 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services import ai_service, llm_client
+from app.services.llm_cache import LLMCache
+
+PAYLOAD = {"model": "test-model", "messages": [{"role": "user", "content": "hi"}], "temperature": 0}
+
+
+@pytest.fixture()
+def llm(monkeypatch):
+    monkeypatch.setattr(settings, "llm_api_url", "https://llm.example/v1/chat/completions")
+    monkeypatch.setattr(settings, "llm_cache_enabled", True)
+    monkeypatch.setattr(llm_client, "llm_cache", LLMCache(max_entries=8, ttl_seconds=60))
+    monkeypatch.setattr(llm_client, "_llm_flight", llm_client.SingleFlight())
+    requests = []
+
+    def use(handler):
+        async def record(request):
+            requests.append(json.loads(request.content))
+            return await handler(request)
+
+        monkeypatch.setattr(llm_client, "_async_client", httpx.AsyncClient(transport=httpx.MockTransport(record)))
+
+    return use, requests
+
+
+def test_concurrent_completions_share_one_request(llm):
+    use, requests = llm
+
+    async def handler(request):
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "hello"}}]})
+
+    async def run():
+        use(handler)
+        first = await asyncio.gather(*(llm_client.post_llm_async(PAYLOAD, {}) for _ in range(3)))
+        return first, await llm_client.post_llm_async(PAYLOAD, {})
+
+    first, repeated = asyncio.run(run())
+    assert len(requests) == 1
+    assert first == [repeated] * 3
+    assert llm_client.llm_cache.stats()["hits"] == 1
+
+
+def test_streamed_completion_is_cached_for_the_next_request(llm):
+    use, requests = llm
+    lines = [
+        'data: {"choices": [{"delta": {"content": "hel"}}]}',
+        "",
+        'data: {"choices": [{"delta": {"content": "lo"}}]}',
+        "data: [DONE]",
+    ]
+
+    async def handler(request):
+        return httpx.Response(200, text="\n".join(lines), headers={"Content-Type": "text/event-stream"})
+
+    async def run():
+        use(handler)
+        streamed = [delta async for delta in llm_client.stream_llm(PAYLOAD, {})]
+        cached = [delta async for delta in llm_client.stream_llm(PAYLOAD, {})]
+        return streamed, cached, await llm_client.post_llm_async(PAYLOAD, {})
+
+    streamed, cached, completion = asyncio.run(run())
+    assert streamed == ["hel", "lo"]
+    assert cached == ["hello"]
+    assert completion["choices"][0]["message"]["content"] == "hello"
+    assert len(requests) == 1
+    assert requests[0]["stream"] is True
+
+
+def test_unparseable_replies_are_not_replayed(llm, monkeypatch):
+    use, requests = llm
+    monkeypatch.setattr(settings, "llm_api_key", "key")
+    replies = ["not json", '{"summary": "ok"}']
+
+    async def handler(request):
+        return httpx.Response(200, json={"choices": [{"message": {"content": replies.pop(0)}}]})
+
+    async def run():
+        use(handler)
+        first = await ai_service._call_llm_json_async("system", "user", {"fallback": True})
+        return first, await ai_service._call_llm_json_async("system", "user", {"fallback": True})
+
+    assert asyncio.run(run()) == ({"fallback": True}, {"summary": "ok"})
+    assert len(requests) == 2
+
+
+def test_persistent_cache_is_used_off_the_event_loop(llm, monkeypatch, tmp_path):
+    use, _ = llm
+    cache = LLMCache(max_entries=8, ttl_seconds=60, path=str(tmp_path / "llm.db"))
+    monkeypatch.setattr(llm_client, "llm_cache", cache)
+    calls = []
+    for name in ("get", "set"):
+        original = getattr(cache, name)
+
+        def record(*args, _name=name, _original=original):
+            calls.append((_name, threading.current_thread() is threading.main_thread()))
+            return _original(*args)
+
+        monkeypatch.setattr(cache, name, record)
+
+    async def handler(request):
+        return httpx.Response(200, json={"choices": [{"message": {"content": "hello"}}]})
+
+    async def run():
+        use(handler)
+        await llm_client.post_llm_async(PAYLOAD, {})
+        await llm_client.post_llm_async(PAYLOAD, {})
+
+    asyncio.run(run())
+    assert calls == [("get", False), ("set", False), ("get", False)]
@@ -0,0 +1,37 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from test_api_flow import auth_headers
+
+from app.crud.repo_job import claim_repo_job, create_repo_job, heartbeat_repo_jobs, requeue_stale_repo_jobs
+from app.db.session import SessionLocal
+from app.models.user import User
+
+
+def test_only_jobs_with_a_lapsed_lease_are_requeued(client):
+    headers = auth_headers(client)
+    project_id = uuid.UUID(client.post("/projects/create", headers=headers, json={"name": "Jobs"}).json()["id"])
+
+    db = SessionLocal()
+    try:
+        user_id = db.query(User.id).filter(User.email == "demo@example.com").scalar()
+        live = create_repo_job(db, user_id, project_id, "https://github.com/o/live")
+        stale = create_repo_job(db, user_id, project_id, "https://github.com/o/stale")
+        assert claim_repo_job(db, live.id, "worker-a")
+        assert claim_repo_job(db, stale.id, "worker-b")
+        assert not claim_repo_job(db, live.id, "worker-b")
+
+        # worker-b stopped renewing its lease two minutes ago
+        stale.heartbeat_at = datetime.now(timezone.utc) - timedelta(minutes=2)
+        db.commit()
+        assert heartbeat_repo_jobs(db, "worker-a") >= 1
+
+        requeued = requeue_stale_repo_jobs(db, lease_seconds=60)
+        assert stale.id in requeued and live.id not in requeued
+        db.refresh(live)
+        db.refresh(stale)
+        assert (live.status, live.worker_id) == ("running", "worker-a")
+        assert (stale.status, stale.worker_id) == ("queued", None)
+        assert claim_repo_job(db, stale.id, "worker-a")
+    finally:
+        db.close()
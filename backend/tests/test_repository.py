@@ -0,0 +1,100 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from test_api_flow import auth_headers
+
+from app.crud.repository import (
+    BrokenDeltaChainError,
+    create_repository,
+    delta_chain_complete,
+    delta_chain_complete_async,
+    get_repository_async,
+    load_dependency_graph,
+)
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, SessionLocal, close_async_engine
+from app.services import repo_index
+from app.services.repo_delta import encode_delta
+from app.services.repo_tree import encode_entries
+
+
+def test_delta_without_base_is_not_materialized(client):
+    headers = auth_headers(client)
+    project_id = client.post("/projects/create", headers=headers, json={"name": "Delta Project"}).json()["id"]
+    base_entries = [{"path": "README.md", "type": "blob", "size": 1}]
+    graph = {"entries": base_entries + [{"path": "app.py", "type": "blob", "size": 2}]}
+
+    db = SessionLocal()
+    try:
+        base = create_repository(db, uuid.UUID(project_id), "https://github.com/o/r", {"entries": base_entries}, [])
+        delta = create_repository(
+            db,
+            uuid.UUID(project_id),
+            "https://github.com/o/r",
+            encode_delta(graph, base_entries, base.id, 1),
+            [],
+            base_repository_id=base.id,
+        )
+        assert delta_chain_complete(db, delta)
+        assert load_dependency_graph(db, delta)["entries"] == graph["entries"]
+
+        orphan = create_repository(
+            db,
+            uuid.UUID(project_id),
+            "https://github.com/o/r",
+            encode_delta(graph, base_entries, uuid.uuid4(), 1),
+            [],
+            base_repository_id=uuid.uuid4(),
+        )
+        assert not delta_chain_complete(db, orphan)
+        with pytest.raises(BrokenDeltaChainError):
+            load_dependency_graph(db, orphan)
+        delta_id, orphan_id = delta.id, orphan.id
+    finally:
+        db.close()
+
+    tree_response = client.get(f"/repo/{orphan_id}/tree", headers=headers)
+    assert tree_response.status_code == 409
+
+    if AsyncSessionLocal is not None:
+
+        async def check_async():
+            try:
+                async with AsyncSessionLocal() as session:
+                    delta_row = await get_repository_async(session, delta_id)
+                    orphan_row = await get_repository_async(session, orphan_id)
+                    return (
+                        await delta_chain_complete_async(session, delta_row),
+                        await delta_chain_complete_async(session, orphan_row),
+                    )
+            finally:
+                # pooled aiosqlite connections belong to this loop
+                await close_async_engine()
+
+        assert asyncio.run(check_async()) == (True, False)
+
+
+def test_tree_index_cache_is_bounded_by_bytes(monkeypatch):
+    def repository(count):
+        entries = [{"path": f"src/file_{index}.py", "type": "blob", "size": 1} for index in range(count)]
+        return SimpleNamespace(id=uuid.uuid4(), dependency_graph={"tree": encode_entries(entries)})
+
+    monkeypatch.setattr(settings, "repo_tree_index_cache_mb", 1)
+    monkeypatch.setattr(repo_index, "_indexes", repo_index.OrderedDict())
+    monkeypatch.setattr(repo_index, "_stats", dict.fromkeys(repo_index._stats, 0))
+
+    small = [repository(1000) for _ in range(8)]
+    for item in small:
+        repo_index.get_tree_index(None, item)
+    stats = repo_index.tree_index_stats()
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] > 0
+    assert small[-1].id in repo_index._indexes
+    assert small[0].id not in repo_index._indexes
+
+    huge = repository(10000)
+    assert repo_index.get_tree_index(None, huge).file_counts[0] == 10000
+    assert huge.id not in repo_index._indexes
+    assert repo_index.tree_index_stats()["skipped"] == 1
@@ -0,0 +1,51 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from app.api.deps import run_crud
+from app.db.session import AsyncSessionLocal, SessionLocal, async_database_url, close_async_engine
+
+
+def test_async_database_url_picks_async_drivers():
+    assert async_database_url("sqlite:///./ndex.db").drivername == "sqlite+aiosqlite"
+    url = async_database_url("postgresql://user:pass@db/ndex?sslmode=require")
+    assert url.drivername == "postgresql+asyncpg"
+    assert dict(url.query) == {"ssl": "require"}
+
+
+def _sync_query(db, value):
+    return threading.current_thread(), db.execute(text("SELECT :value"), {"value": value}).scalar()
+
+
+async def _async_query(db, value):
+    return threading.current_thread(), (await db.execute(text("SELECT :value"), {"value": value})).scalar()
+
+
+def test_run_crud_keeps_sync_sessions_off_the_event_loop():
+    async def run():
+        db = SessionLocal()
+        try:
+            return threading.current_thread(), await run_crud(db, _sync_query, _async_query, 1)
+        finally:
+            db.close()
+
+    loop_thread, (thread, value) = asyncio.run(run())
+    assert value == 1
+    assert thread is not loop_thread
+
+
+@pytest.mark.skipif(AsyncSessionLocal is None, reason="DATABASE_ASYNC is off")
+def test_run_crud_awaits_async_sessions_on_the_loop():
+    async def run():
+        try:
+            async with AsyncSessionLocal() as db:
+                return threading.current_thread(), await run_crud(db, _sync_query, _async_query, 2)
+        finally:
+            # pooled aiosqlite connections belong to this loop
+            await close_async_engine()
+
+    loop_thread, (thread, value) = asyncio.run(run())
+    assert value == 2
+    assert thread is loop_thread
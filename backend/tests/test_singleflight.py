@@ -0,0 +1,84 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    calls = []
+    started = threading.Barrier(4)
+    results = []
+
+    def work():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"value": len(calls)}
+
+    def run():
+        started.wait()
+        results.append(flight.do("key", work))
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{"value": 1}] * 4
+    assert flight.shared == 3
+    assert flight.in_flight() == 0
+
+
+def test_errors_reach_every_waiter_and_release_the_key():
+    flight = SingleFlight()
+    started = threading.Barrier(2)
+    errors = []
+
+    def fail():
+        time.sleep(0.2)
+        raise ValueError("boom")
+
+    def run():
+        started.wait()
+        try:
+            flight.do("key", fail)
+        except ValueError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 2
+    assert flight.do("key", lambda: "retried") == "retried"
+
+
+def test_async_calls_share_one_task_and_survive_a_cancelled_waiter():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return len(calls)
+
+    async def run():
+        first = asyncio.create_task(flight.do_async("key", work))
+        second = asyncio.create_task(flight.do_async("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, await flight.do_async("other", work)
+
+    shared, other = asyncio.run(run())
+    assert shared == 1
+    assert other == 2
+    assert flight.shared == 1
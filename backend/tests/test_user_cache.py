@@ -0,0 +1,96 @@
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+
+from test_api_flow import auth_headers
+
+from app.api import deps
+from app.api.routes import stats
+from app.db.session import SessionLocal
+from app.models.user import User
+from app.services import user_cache
+from app.services.user_cache import UserCache
+
+
+def _on_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def test_shared_user_cache_stays_off_the_event_loop(client, monkeypatch, tmp_path):
+    cache = UserCache(max_entries=8, ttl_seconds=60, path=str(tmp_path / "users.db"))
+    monkeypatch.setattr(deps, "user_cache", cache)
+    monkeypatch.setattr(stats, "user_cache", cache)
+    calls = []
+    for name in ("get", "set"):
+        original = getattr(cache, name)
+
+        def record(*args, _name=name, _original=original):
+            calls.append((_name, _on_event_loop()))
+            return _original(*args)
+
+        monkeypatch.setattr(cache, name, record)
+
+    headers = auth_headers(client)
+    for _ in range(2):
+        response = client.get("/stats/caches", headers=headers)
+        assert response.status_code == 200
+
+    assert calls == [("get", False), ("set", False), ("get", False)]
+    body = response.json()
+    assert body["user"]["shared"] is True
+    assert body["user"]["hits"] == 1
+    assert body["user"]["entries"] == 1
+    assert {"llm", "code_analysis"} <= body.keys()
+
+
+def test_memory_cache_evicts_least_recently_used(monkeypatch):
+    cache = UserCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", {"id": "a"})
+    cache.set("b", {"id": "b"})
+    assert cache.get("a") == {"id": "a"}
+    cache.set("c", {"id": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"id": "a"}
+    assert cache.stats()["evictions"] == 1
+
+    now = time.time()
+    monkeypatch.setattr(user_cache.time, "time", lambda: now + 61)
+    assert cache.get("a") is None
+
+
+def test_shared_cache_invalidation_is_seen_by_every_worker(tmp_path):
+    path = str(tmp_path / "users.db")
+    first = UserCache(max_entries=8, ttl_seconds=60, path=path)
+    second = UserCache(max_entries=8, ttl_seconds=60, path=path)
+    first.set("a", {"id": "a"})
+    assert second.get("a") == {"id": "a"}
+
+    second.invalidate("a")
+    assert first.get("a") is None
+
+
+def test_snapshot_round_trip_leaves_out_the_password_hash(client):
+    user = User(
+        id=uuid.uuid4(),
+        email="cached@example.com",
+        password_hash="secret",
+        created_at=datetime(2024, 1, 1),
+    )
+    data = user_cache.snapshot_user(user)
+    assert "password_hash" not in data
+    assert json.loads(json.dumps(data)) == data
+
+    db = SessionLocal()
+    try:
+        restored = user_cache.restore_user(db, data)
+        assert restored.id == user.id
+        assert restored.created_at == user.created_at
+    finally:
+        db.close()
@@ -6,6 +6,7 @@ import GraphView from "./components/GraphView.jsx";
 import RepoTree from "./components/RepoTree.jsx";
 import CommitList from "./components/CommitList.jsx";
 import ProfileCard from "./components/ProfileCard.jsx";
+import { analyzeRepo as runRepoAnalysis, getUmlHistory, listAllProjects } from "./lib/api.js";
 
 const API_BASE = import.meta.env.VITE_API_BASE || "http://127.0.0.1:8000";
 
@@ -21,11 +22,13 @@ const App = () => {
   const [diagramType, setDiagramType] = useState("class");
   const [umlDiagram, setUmlDiagram] = useState(null);
   const [diagramHistory, setDiagramHistory] = useState([]);
+  const [historyCursor, setHistoryCursor] = useState(null);
   const [codeText, setCodeText] = useState("def add(a, b):\n    return a + b\n\nresult = add(1, 2)");
   const [codeGraph, setCodeGraph] = useState(null);
+  const [codeOverview, setCodeOverview] = useState(null);
   const [steps, setSteps] = useState([]);
   const [repoUrl, setRepoUrl] = useState("https://github.com/octocat/Hello-World");
-  const [repoTree, setRepoTree] = useState([]);
+  const [repositoryId, setRepositoryId] = useState(null);
   const [repoCommits, setRepoCommits] = useState([]);
   const [status, setStatus] = useState("");
 
@@ -74,9 +77,7 @@ const App = () => {
 
   const fetchProjects = async () => {
     try {
-      const response = await fetch(`${API_BASE}/projects/list`, { headers });
-      if (!response.ok) throw new Error("Failed to load projects");
-      const json = await response.json();
+      const json = await listAllProjects(token);
       setProjects(json);
       if (json.length > 0 && !activeProject) setActiveProject(json[0].id);
     } catch (error) {
@@ -104,10 +105,31 @@ const App = () => {
   const loadDiagramHistory = async () => {
     if (!activeProject) return setError("Select a project first");
     try {
-      const response = await fetch(`${API_BASE}/uml/list?project_id=${activeProject}`, { headers });
-      if (!response.ok) throw new Error("Failed to load diagram history");
+      const { items, nextCursor } = await getUmlHistory(token, activeProject);
+      setDiagramHistory(items);
+      setHistoryCursor(nextCursor);
+    } catch (error) {
+      setError(error.message);
+    }
+  };
+
+  const loadMoreDiagramHistory = async () => {
+    try {
+      const { items, nextCursor } = await getUmlHistory(token, activeProject, historyCursor);
+      setDiagramHistory((prev) => [...prev, ...items]);
+      setHistoryCursor(nextCursor);
+    } catch (error) {
+      setError(error.message);
+    }
+  };
+
+  const selectDiagram = async (diagram) => {
+    if (diagram.diagram_json) return setUmlDiagram(diagram.diagram_json);
+    try {
+      const response = await fetch(`${API_BASE}/uml/${diagram.id}`, { headers });
+      if (!response.ok) throw new Error("Failed to load diagram");
       const json = await response.json();
-      setDiagramHistory(json);
+      setUmlDiagram(json.diagram_json);
     } catch (error) {
       setError(error.message);
     }
@@ -148,6 +170,7 @@ const App = () => {
       if (!response.ok) throw new Error("Code analysis failed");
       const json = await response.json();
       const executionGraph = json.execution_graph || {};
+      setCodeOverview(executionGraph);
       setCodeGraph(executionGraph);
       setSteps(executionGraph.steps || []);
     } catch (error) {
@@ -155,20 +178,38 @@ const App = () => {
     }
   };
 
-  const analyzeRepo = async () => {
+  const expandFunction = async (name) => {
     try {
-      const response = await fetch(`${API_BASE}/repo/analyze`, {
+      const response = await fetch(`${API_BASE}/code/cfg`, {
         method: "POST",
         headers,
-        body: JSON.stringify({
-          project_id: activeProject,
-          repo_url: repoUrl
-        })
+        body: JSON.stringify({ language: "python", code: codeText, function: name })
       });
-      if (!response.ok) throw new Error("Repo analysis failed");
+      if (!response.ok) throw new Error("Failed to load function graph");
       const json = await response.json();
-      setRepoTree(json.dependency_graph?.entries || []);
-      setRepoCommits(json.commits || json.dependency_graph?.commits || []);
+      setCodeGraph(json);
+      setSteps(json.steps || []);
+    } catch (error) {
+      setError(error.message);
+    }
+  };
+
+  const showOverview = () => {
+    setCodeGraph(codeOverview);
+    setSteps(codeOverview?.steps || []);
+  };
+
+  const analyzeRepo = async () => {
+    try {
+      setStatus("Analyzing repository...");
+      // /repo/analyze returns a job; runRepoAnalysis polls it until the repository is stored
+      const repository = await runRepoAnalysis(token, {
+        project_id: activeProject,
+        repo_url: repoUrl
+      });
+      setRepositoryId(repository.id);
+      setRepoCommits(repository.commits || repository.dependency_graph?.commits || []);
+      setStatus("");
     } catch (error) {
       setError(error.message);
     }
@@ -237,7 +278,11 @@ const App = () => {
               <button onClick={generateUml}>Generate UML</button>
               <button className="secondary" onClick={loadDiagramHistory}>Load History</button>
             </div>
-            <DiagramHistory items={diagramHistory} onSelect={setUmlDiagram} />
+            <DiagramHistory
+              items={diagramHistory}
+              onSelect={selectDiagram}
+              onLoadMore={historyCursor ? loadMoreDiagramHistory : null}
+            />
           </div>
           <DiagramView diagram={umlDiagram} />
         </div>
@@ -252,6 +297,11 @@ const App = () => {
           <div className="grid">
             <textarea value={codeText} onChange={(e) => setCodeText(e.target.value)} />
             <button onClick={analyzeCode}>Analyze Code</button>
+            {codeGraph?.function && (
+              <button className="secondary" onClick={showOverview}>
+                Back to overview ({codeGraph.function})
+              </button>
+            )}
             <div>
               <strong>Execution steps</strong>
               <ul className="list">
@@ -259,7 +309,7 @@ const App = () => {
               </ul>
             </div>
           </div>
-          <GraphView graph={codeGraph} />
+          <GraphView graph={codeGraph} onExpand={expandFunction} />
         </div>
       </section>
 
@@ -279,7 +329,7 @@ const App = () => {
             </div>
           </div>
           <div>
-            <RepoTree entries={repoTree} />
+            <RepoTree token={token} repositoryId={repositoryId} />
           </div>
         </div>
       </section>
@@ -1,4 +1,4 @@
-const DiagramHistory = ({ items, onSelect }) => {
+const DiagramHistory = ({ items, onSelect, onLoadMore }) => {
   if (!items?.length) {
     return <p className="small">No diagrams saved yet.</p>;
   }
@@ -7,11 +7,18 @@ const DiagramHistory = ({ items, onSelect }) => {
     <ul className="list">
       {items.map((diagram) => (
         <li key={diagram.id}>
-          <button className="link" type="button" onClick={() => onSelect(diagram.diagram_json)}>
+          <button className="link" type="button" onClick={() => onSelect(diagram)}>
             {diagram.type} — {new Date(diagram.created_at).toLocaleString()}
           </button>
         </li>
       ))}
+      {onLoadMore && (
+        <li>
+          <button className="link" type="button" onClick={onLoadMore}>
+            Load more
+          </button>
+        </li>
+      )}
     </ul>
   );
 };
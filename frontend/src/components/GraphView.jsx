@@ -1,7 +1,16 @@
 import { useEffect, useRef } from "react";
 import * as d3 from "d3";
 
-const GraphView = ({ graph }) => {
+const NODE_COLORS = {
+  function: "#2563eb",
+  collapsed: "#7c3aed",
+  branch: "#d97706",
+  loop: "#059669",
+  except: "#dc2626",
+  exit: "#475569"
+};
+
+const GraphView = ({ graph, onExpand }) => {
   const svgRef = useRef(null);
 
   useEffect(() => {
@@ -40,7 +49,8 @@ const GraphView = ({ graph }) => {
       .data(links)
       .enter()
       .append("line")
-      .attr("stroke-width", 1.5);
+      .attr("stroke-width", 1.5)
+      .attr("stroke-dasharray", (d) => (d.kind === "call" ? "4 3" : null));
 
     const node = svg
       .append("g")
@@ -51,8 +61,16 @@ const GraphView = ({ graph }) => {
 
     node
       .append("circle")
-      .attr("r", 18)
-      .attr("fill", "#2563eb");
+      .attr("r", (d) => (d.type === "collapsed" ? 22 : 18))
+      .attr("fill", (d) => NODE_COLORS[d.type] || "#0ea5e9")
+      .style("cursor", (d) => (d.expandable && onExpand ? "pointer" : null))
+      .on("click", (_event, d) => {
+        if (d.expandable && onExpand) {
+          onExpand(d.function);
+        }
+      });
+
+    node.append("title").text((d) => (d.lineno ? `${d.label} (line ${d.lineno})` : d.label));
 
     node
       .append("text")
@@ -73,7 +91,7 @@ const GraphView = ({ graph }) => {
     });
 
     return () => simulation.stop();
-  }, [graph]);
+  }, [graph, onExpand]);
 
   return <svg ref={svgRef} role="img" aria-label="Execution graph" className="diagram-canvas" />;
 };
@@ -1,5 +1,6 @@
 import { useEffect, useMemo, useRef, useState } from "react";
 import * as d3 from "d3";
+import { getRepoTree } from "../lib/api.js";
 
 const EXT_COLORS = {
   js: "#84cc16",
@@ -25,7 +26,8 @@ const buildHierarchy = (entries) => {
           name: part,
           path: currentPath,
           type: index === parts.length - 1 ? entry.type : "tree",
-          size: index === parts.length - 1 ? entry.size || 1 : 0,
+          // folders that are not expanded yet are sized by their rolled-up total
+          size: index === parts.length - 1 ? entry.total_size || entry.size || 1 : 0,
           children: new Map()
         });
       }
@@ -50,13 +52,16 @@ const flattenLeaves = (node, list = []) => {
   return list;
 };
 
-const RepoTree = ({ entries }) => {
+const RepoTree = ({ token, repositoryId }) => {
   const svgRef = useRef(null);
   const tooltipRef = useRef(null);
   const zoomNodeRef = useRef(null);
   const playbackRef = useRef(null);
   const rafRef = useRef(null);
 
+  const [entries, setEntries] = useState([]);
+  const [loadedPaths, setLoadedPaths] = useState(() => new Set());
+  const [truncated, setTruncated] = useState(false);
   const [activePath, setActivePath] = useState("");
   const [hoverInfo, setHoverInfo] = useState(null);
   const [playing, setPlaying] = useState(false);
@@ -64,6 +69,49 @@ const RepoTree = ({ entries }) => {
   const hierarchy = useMemo(() => buildHierarchy(entries || []), [entries]);
   const leaves = useMemo(() => flattenLeaves(hierarchy), [hierarchy]);
 
+  useEffect(() => {
+    setEntries([]);
+    setLoadedPaths(new Set());
+    setTruncated(false);
+    if (!repositoryId) {
+      return undefined;
+    }
+    let cancelled = false;
+    getRepoTree(token, repositoryId, { depth: 2 })
+      .then((data) => {
+        if (cancelled) return;
+        setEntries(data.nodes);
+        setTruncated(data.truncated);
+        setLoadedPaths(new Set([""]));
+      })
+      .catch(() => {
+        if (!cancelled) setEntries([]);
+      });
+    return () => {
+      cancelled = true;
+    };
+  }, [token, repositoryId]);
+
+  // the first request covers two levels, deeper folders are fetched one level at a time on click
+  const expandFolder = async (path) => {
+    if (loadedPaths.has(path)) return;
+    setLoadedPaths((current) => new Set(current).add(path));
+    try {
+      const data = await getRepoTree(token, repositoryId, { path });
+      setEntries((current) => {
+        const known = new Set(current.map((entry) => entry.path));
+        return [...current, ...data.nodes.filter((entry) => !known.has(entry.path))];
+      });
+      setTruncated((current) => current || data.truncated);
+    } catch {
+      setLoadedPaths((current) => {
+        const next = new Set(current);
+        next.delete(path);
+        return next;
+      });
+    }
+  };
+
   const stopPlayback = () => {
     if (playbackRef.current) {
       clearInterval(playbackRef.current);
@@ -96,7 +144,7 @@ const RepoTree = ({ entries }) => {
 
     const root = d3
       .hierarchy(hierarchy)
-      .sum((d) => (d.size && d.size > 0 ? d.size : 1))
+      .sum((d) => (d.children.length ? 0 : Math.max(1, d.size || 0)))
       .sort((a, b) => b.value - a.value);
 
     d3.pack().size([width, height]).padding(4)(root);
@@ -135,9 +183,12 @@ const RepoTree = ({ entries }) => {
       .on("click", (_, d) => {
         setActivePath(d.data.path);
         zoomToNode(d);
+        if (d.data.type === "tree" && !d.children) {
+          expandFolder(d.data.path);
+        }
       })
       .on("mouseenter", (_, d) => {
-        const isFolder = Boolean(d.children);
+        const isFolder = d.data.type === "tree";
         const size = d.value || 0;
         setHoverInfo({
           name: d.data.name,
@@ -156,14 +207,14 @@ const RepoTree = ({ entries }) => {
       .append("circle")
       .attr("r", 0)
       .attr("class", (d) => {
-        if (d.children) {
+        if (d.data.type === "tree") {
           return "pack-node folder";
         }
         const ext = d.data.name.split(".").pop()?.toLowerCase();
         return `pack-node file ext-${ext || "default"}`;
       })
       .attr("fill", (d) => {
-        if (d.children) {
+        if (d.data.type === "tree") {
           return "rgba(148, 163, 184, 0.2)";
         }
         const ext = d.data.name.split(".").pop()?.toLowerCase();
@@ -269,6 +320,7 @@ const RepoTree = ({ entries }) => {
           </p>
         </div>
       )}
+      {truncated && <p className="small">Large repository: only part of the tree is shown.</p>}
       <svg ref={svgRef} className="diagram-canvas pack-canvas" role="img" aria-label="Repo bubble pack" />
     </div>
   );
@@ -73,9 +73,24 @@ export async function getDashboard(token) {
   return parseResponse(response, "Failed to load dashboard");
 }
 
-export async function listProjects(token) {
-  const response = await fetch(`${API_BASE}/projects/list`, { headers: jsonHeaders(token) });
-  return parseResponse(response, "Failed to load projects");
+export async function listProjects(token, cursor) {
+  const params = new URLSearchParams();
+  if (cursor) params.set("cursor", cursor);
+  const response = await fetch(`${API_BASE}/projects/list?${params}`, { headers: jsonHeaders(token) });
+  const items = await parseResponse(response, "Failed to load projects");
+  return { items, nextCursor: response.headers.get("X-Next-Cursor") };
+}
+
+// the project picker needs every project, so follow the cursor to the last page
+export async function listAllProjects(token) {
+  const projects = [];
+  let cursor = null;
+  do {
+    const { items, nextCursor } = await listProjects(token, cursor);
+    projects.push(...items);
+    cursor = nextCursor;
+  } while (cursor);
+  return projects;
 }
 
 export async function createProject(token, payload) {
@@ -101,9 +116,17 @@ export async function generateUml(token, payload) {
   return parseResponse(response, "UML generation failed");
 }
 
-export async function getUmlHistory(token, projectId) {
-  const response = await fetch(`${API_BASE}/uml/list?project_id=${projectId}`, { headers: jsonHeaders(token) });
-  return parseResponse(response, "Failed to load UML history");
+export async function getUmlHistory(token, projectId, cursor) {
+  const params = new URLSearchParams({ project_id: projectId });
+  if (cursor) params.set("cursor", cursor);
+  const response = await fetch(`${API_BASE}/uml/list?${params}`, { headers: jsonHeaders(token) });
+  const items = await parseResponse(response, "Failed to load UML history");
+  return { items, nextCursor: response.headers.get("X-Next-Cursor") };
+}
+
+export async function getDiagram(token, diagramId) {
+  const response = await fetch(`${API_BASE}/uml/${diagramId}`, { headers: jsonHeaders(token) });
+  return parseResponse(response, "Failed to load diagram");
 }
 
 export async function analyzeCode(token, payload) {
@@ -115,11 +138,40 @@ export async function analyzeCode(token, payload) {
   return parseResponse(response, "Code analysis failed");
 }
 
-export async function analyzeRepo(token, payload) {
+export async function getFunctionCfg(token, payload) {
+  const response = await fetch(`${API_BASE}/code/cfg`, {
+    method: "POST",
+    headers: jsonHeaders(token),
+    body: JSON.stringify(payload)
+  });
+  return parseResponse(response, "Failed to load function graph");
+}
+
+export async function getRepoTree(token, repositoryId, { path = "", depth = 1 } = {}) {
+  const params = new URLSearchParams({ path, depth: String(depth) });
+  const response = await fetch(`${API_BASE}/repo/${repositoryId}/tree?${params}`, { headers: jsonHeaders(token) });
+  return parseResponse(response, "Failed to load repository tree");
+}
+
+export async function getRepoJob(token, jobId) {
+  const response = await fetch(`${API_BASE}/repo/jobs/${jobId}`, { headers: jsonHeaders(token) });
+  return parseResponse(response, "Failed to load repository analysis");
+}
+
+export async function analyzeRepo(token, payload, pollIntervalMs = 1500) {
   const response = await fetch(`${API_BASE}/repo/analyze`, {
     method: "POST",
     headers: jsonHeaders(token),
     body: JSON.stringify(payload)
   });
-  return parseResponse(response, "Repository analysis failed");
+  let job = await parseResponse(response, "Repository analysis failed");
+
+  while (job.status === "queued" || job.status === "running") {
+    await new Promise((resolve) => setTimeout(resolve, pollIntervalMs));
+    job = await getRepoJob(token, job.id);
+  }
+  if (job.status !== "completed") {
+    throw new Error(job.error || "Repository analysis failed");
+  }
+  return job.repository;
 }
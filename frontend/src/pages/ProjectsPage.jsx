@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 
-import { createProject, getProjectHistory, listProjects } from "../lib/api.js";
+import { createProject, getProjectHistory, listAllProjects } from "../lib/api.js";
 
 const ProjectsPage = ({ token, activeProject, setActiveProject }) => {
   const [projects, setProjects] = useState([]);
@@ -10,7 +10,7 @@ const ProjectsPage = ({ token, activeProject, setActiveProject }) => {
 
   const loadProjects = async () => {
     try {
-      const data = await listProjects(token);
+      const data = await listAllProjects(token);
       setProjects(data);
       if (!activeProject && data.length > 0) {
         setActiveProject(data[0].id);
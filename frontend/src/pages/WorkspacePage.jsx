@@ -5,20 +5,22 @@ import DiagramHistory from "../components/DiagramHistory.jsx";
 import DiagramView from "../components/DiagramView.jsx";
 import GraphView from "../components/GraphView.jsx";
 import RepoTree from "../components/RepoTree.jsx";
-import { analyzeCode, analyzeRepo, generateUml, getUmlHistory } from "../lib/api.js";
+import { analyzeCode, analyzeRepo, generateUml, getDiagram, getFunctionCfg, getUmlHistory } from "../lib/api.js";
 
 const WorkspacePage = ({ token, activeProject }) => {
   const [umlText, setUmlText] = useState("");
   const [umlDiagram, setUmlDiagram] = useState(null);
   const [diagramHistory, setDiagramHistory] = useState([]);
+  const [historyCursor, setHistoryCursor] = useState(null);
 
   const [codeText, setCodeText] = useState("def add(a, b):\n    return a + b\n\nresult = add(1, 2)");
   const [codeGraph, setCodeGraph] = useState(null);
+  const [codeOverview, setCodeOverview] = useState(null);
   const [steps, setSteps] = useState([]);
   const [metrics, setMetrics] = useState(null);
 
   const [repoUrl, setRepoUrl] = useState("https://github.com/octocat/Hello-World");
-  const [repoTree, setRepoTree] = useState([]);
+  const [repositoryId, setRepositoryId] = useState(null);
   const [repoCommits, setRepoCommits] = useState([]);
   const [repoInsights, setRepoInsights] = useState(null);
   const [status, setStatus] = useState("");
@@ -53,13 +55,34 @@ const WorkspacePage = ({ token, activeProject }) => {
   const onLoadUmlHistory = () =>
     withGuard(async () => {
       try {
-        const items = await getUmlHistory(token, activeProject);
+        const { items, nextCursor } = await getUmlHistory(token, activeProject);
         setDiagramHistory(items);
+        setHistoryCursor(nextCursor);
       } catch (error) {
         setStatus(error.message);
       }
     });
 
+  const onLoadMoreUmlHistory = () =>
+    withGuard(async () => {
+      try {
+        const { items, nextCursor } = await getUmlHistory(token, activeProject, historyCursor);
+        setDiagramHistory((prev) => [...prev, ...items]);
+        setHistoryCursor(nextCursor);
+      } catch (error) {
+        setStatus(error.message);
+      }
+    });
+
+  const onSelectDiagram = async (diagram) => {
+    try {
+      const data = diagram.diagram_json ? diagram : await getDiagram(token, diagram.id);
+      setUmlDiagram(data.diagram_json);
+    } catch (error) {
+      setStatus(error.message);
+    }
+  };
+
   const onAnalyzeCode = () =>
     withGuard(async () => {
       try {
@@ -68,6 +91,7 @@ const WorkspacePage = ({ token, activeProject }) => {
           language: "python",
           code: codeText
         });
+        setCodeOverview(data.execution_graph);
         setCodeGraph(data.execution_graph);
         setSteps(data.execution_graph.steps || []);
         setMetrics(data.execution_graph.ai_metrics || null);
@@ -76,6 +100,22 @@ const WorkspacePage = ({ token, activeProject }) => {
       }
     });
 
+  const onExpandFunction = (name) =>
+    withGuard(async () => {
+      try {
+        const data = await getFunctionCfg(token, { language: "python", code: codeText, function: name });
+        setCodeGraph(data);
+        setSteps(data.steps || []);
+      } catch (error) {
+        setStatus(error.message);
+      }
+    });
+
+  const onShowOverview = () => {
+    setCodeGraph(codeOverview);
+    setSteps(codeOverview?.steps || []);
+  };
+
   const onAnalyzeRepo = () =>
     withGuard(async () => {
       try {
@@ -83,7 +123,7 @@ const WorkspacePage = ({ token, activeProject }) => {
           project_id: activeProject,
           repo_url: repoUrl
         });
-        setRepoTree(data.dependency_graph.entries || []);
+        setRepositoryId(data.id);
         setRepoCommits(data.commits || []);
         setRepoInsights(data.dependency_graph.ai_insights || null);
       } catch (error) {
@@ -109,7 +149,11 @@ const WorkspacePage = ({ token, activeProject }) => {
                 Load History
               </button>
             </div>
-            <DiagramHistory items={diagramHistory} onSelect={setUmlDiagram} />
+            <DiagramHistory
+              items={diagramHistory}
+              onSelect={onSelectDiagram}
+              onLoadMore={historyCursor ? onLoadMoreUmlHistory : null}
+            />
           </div>
           <DiagramView diagram={umlDiagram} />
         </div>
@@ -120,6 +164,11 @@ const WorkspacePage = ({ token, activeProject }) => {
           <h2>Code Analyzer</h2>
           <textarea value={codeText} onChange={(event) => setCodeText(event.target.value)} />
           <button onClick={onAnalyzeCode}>Analyze Code</button>
+          {codeGraph?.function && (
+            <button className="secondary" onClick={onShowOverview}>
+              Back to overview ({codeGraph.function})
+            </button>
+          )}
           <ul className="list">
             {steps.map((step, index) => (
               <li key={`${step.node_id || "step"}-${index}`}>{step.description}</li>
@@ -136,7 +185,7 @@ const WorkspacePage = ({ token, activeProject }) => {
             </div>
           )}
         </div>
-        <GraphView graph={codeGraph} />
+        <GraphView graph={codeGraph} onExpand={onExpandFunction} />
       </section>
 
       <section className="card grid two">
@@ -152,7 +201,7 @@ const WorkspacePage = ({ token, activeProject }) => {
             </ul>
           )}
         </div>
-        <RepoTree entries={repoTree} />
+        <RepoTree token={token} repositoryId={repositoryId} />
       </section>
     </>
   );